@@ -0,0 +1,11 @@
+# python -m notes_app: línea de comandos sin interfaz gráfica.
+# Los módulos de la aplicación se importan por nombre, así que se añade su carpeta al path.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main
+
+sys.exit(main())
@@ -0,0 +1,346 @@
+# API HTTP/JSON local (asyncio) sobre NotesManager, para que otras herramientas lean y escriban el vault
+# mientras la aplicación está abierta. Las lecturas se ejecutan en paralelo y las escrituras en exclusiva
+# (bloqueo lectores/escritor); la E/S de archivos se hace en un pool de hilos para no bloquear el bucle.
+# Cada operación toma además el bloqueo de NotesManager, el mismo que usa la interfaz gráfica.
+#
+# Cada petición debe llevar "Authorization: Bearer <token>"; el token se genera al arrancar y se guarda en
+# .meta/api_token (sólo legible por el usuario). Las peticiones de otro origen (páginas web) se rechazan.
+#
+#   GET    /notes                          lista de notas
+#   GET    /notes/<titulo>                 contenido y roles
+#   PUT    /notes/<titulo>                 {"content": ..., "roles": {...}} (crea la nota si no existe)
+#   DELETE /notes/<titulo>
+#   GET    /search?q=texto
+#   GET    /classification?type=eisenhower&value=HACER_AHORA[&note=titulo]
+#   GET    /events[?date=YYYY-MM-DD]
+#   POST   /events                         {"note_title", "task_line", "start_datetime", "duration_minutes"}
+#   PATCH  /events/<id>                    {"start_datetime", "duration_minutes"}
+#   DELETE /events/<id>
+
+import os
+import re
+import hmac
+import json
+import asyncio
+import secrets
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs, unquote
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 16 * 1024 * 1024
+IDLE_TIMEOUT = 30
+TOKEN_FILE = "api_token"
+
+
+class AsyncRWLock:
+    """Bloqueo lectores/escritor para asyncio, con preferencia para los escritores."""
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._cond:
+            self._waiting_writers += 1
+            try:
+                await self._cond.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_body(body):
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "JSON inválido.")
+    if not isinstance(data, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Se esperaba un objeto JSON.")
+    return data
+
+
+def _result(ok, msg, status_error=HTTPStatus.BAD_REQUEST, **extra):
+    if not ok:
+        raise ApiError(status_error, msg)
+    return dict(message=msg, **extra)
+
+
+def write_token(meta_dir, token):
+    """Guarda el token de la API en meta_dir con permisos sólo para el usuario. Devuelve la ruta."""
+    os.makedirs(meta_dir, exist_ok=True)
+    path = os.path.join(meta_dir, TOKEN_FILE)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding="utf-8") as f:
+        f.write(token)
+    os.chmod(path, 0o600)
+    return path
+
+
+class NotesApiServer:
+    def __init__(self, notes_manager, host=DEFAULT_HOST, port=DEFAULT_PORT, max_workers=16, token=None):
+        self.notes_manager = notes_manager
+        self.host = host
+        self.port = port
+        self.token = token or secrets.token_urlsafe(32)
+        self.token_path = None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notes-api")
+        self.lock = None
+        self.server = None
+        # (método, patrón, función, escribe)
+        self.routes = [
+            ("GET", r"/notes", self.list_notes, False),
+            ("GET", r"/notes/(?P<title>.+)", self.get_note, False),
+            ("PUT", r"/notes/(?P<title>.+)", self.put_note, True),
+            ("DELETE", r"/notes/(?P<title>.+)", self.delete_note, True),
+            ("GET", r"/search", self.search, False),
+            ("GET", r"/classification", self.classification, False),
+            ("GET", r"/events", self.list_events, False),
+            ("POST", r"/events", self.add_event, True),
+            ("PATCH", r"/events/(?P<event_id>[^/]+)", self.update_event, True),
+            ("DELETE", r"/events/(?P<event_id>[^/]+)", self.delete_event, True),
+        ]
+        self.routes = [(m, re.compile(p + r"/?\Z"), f, w) for m, p, f, w in self.routes]
+
+    # --- Manejadores (se ejecutan en el pool de hilos) ---
+
+    def list_notes(self, query, body):
+        return {"notes": [title for title, _path in self.notes_manager.iter_notes()]}
+
+    def _check_title(self, title):
+        if not self.notes_manager.is_valid_title(title):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Título de nota no válido: '{title}'.")
+
+    def get_note(self, query, body, title):
+        self._check_title(title)
+        content, roles, msg = self.notes_manager.get_note_content(title)
+        if content is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, msg)
+        return {"title": title, "content": content, "roles": roles}
+
+    def put_note(self, query, body, title):
+        data = _json_body(body)
+        if not isinstance(data.get("content"), str):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Falta 'content'.")
+        roles = data.get("roles")
+        if roles is not None and not isinstance(roles, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'roles' debe ser un objeto.")
+        self._check_title(title)
+        ok, msg = self.notes_manager.create_note(title)
+        if not ok:
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, msg)
+        ok, msg = self.notes_manager.save_note_content(title, data["content"], roles=roles)
+        return _result(ok, msg, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def delete_note(self, query, body, title):
+        self._check_title(title)
+        ok, msg = self.notes_manager.delete_note(title)
+        return _result(ok, msg, HTTPStatus.NOT_FOUND)
+
+    def search(self, query, body):
+        text = query.get("q", [""])[0]
+        if not text:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Falta el parámetro 'q'.")
+        results = self.notes_manager.search_notes(text, regex=query.get("regex", ["0"])[0] == "1")
+        try:
+            return {"results": [{"note": t, "line": n, "text": l} for t, n, l in results]}
+        except re.error as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Expresión regular no válida: {e}.")
+
+    def classification(self, query, body):
+        kind = query.get("type", [""])[0]
+        value = query.get("value", [""])[0]
+        if kind not in ("role", "eisenhower", "task_type") or not value:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Parámetros 'type' y 'value' obligatorios.")
+        note = query.get("note", [None])[0]
+        if note:
+            lines, msg = self.notes_manager.filter_note_by_classification(note, kind, value)
+            return {"lines": [{"note": note, "text": line} for line, _tag in lines]}
+        from notes_exporter import NotesExporter
+        records = NotesExporter(self.notes_manager, workers=1).iter_records()
+        if kind == "role":
+            lines = [r for r in records if value in r["roles"]]
+        else:
+            lines = [r for r in records if r[kind] == value]
+        return {"lines": lines}
+
+    def list_events(self, query, body):
+        date = query.get("date", [None])[0]
+        if date:
+            events = self.notes_manager.get_events_for_date(date)
+        else:
+            events = self.notes_manager.iter_calendar_events()
+        return {"events": [event.to_dict() for event in events]}
+
+    def add_event(self, query, body):
+        data = _json_body(body)
+        try:
+            args = (data["note_title"], data["task_line"], data["start_datetime"], int(data["duration_minutes"]))
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           "Campos obligatorios: note_title, task_line, start_datetime, duration_minutes.")
+        ok, msg = self.notes_manager.add_calendar_event(*args)
+        return _result(ok, msg, HTTPStatus.CONFLICT)
+
+    def update_event(self, query, body, event_id):
+        data = _json_body(body)
+        duration = data.get("duration_minutes")
+        try:
+            duration = int(duration) if duration is not None else None
+        except (TypeError, ValueError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Duración inválida.")
+        ok, msg = self.notes_manager.update_calendar_event(
+            event_id, new_start_datetime_str=data.get("start_datetime"), new_duration_minutes=duration)
+        return _result(ok, msg, HTTPStatus.NOT_FOUND)
+
+    def delete_event(self, query, body, event_id):
+        ok, msg = self.notes_manager.delete_calendar_event(event_id)
+        return _result(ok, msg, HTTPStatus.NOT_FOUND)
+
+    # --- HTTP ---
+
+    def _reject(self, headers):
+        """Error (estado, mensaje) si la petición no está autorizada, o None."""
+        origin = headers.get("origin")
+        if origin is not None and origin not in (f"http://{self.host}:{self.port}", f"http://localhost:{self.port}"):
+            return HTTPStatus.FORBIDDEN, "Origen no permitido."
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.token.encode()):
+            return HTTPStatus.UNAUTHORIZED, "Falta el token de la API o no es válido."
+        return None
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = unquote(url.path)
+        query = parse_qs(url.query)
+        allowed = False
+        for route_method, pattern, handler, writes in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            lock = self.lock.write() if writes else self.lock.read()
+            loop = asyncio.get_running_loop()
+            async with lock:
+                try:
+                    payload = await loop.run_in_executor(
+                        self.executor, lambda: handler(query, body, **match.groupdict()))
+                except ApiError as e:
+                    return e.status, {"error": e.message}
+            return HTTPStatus.OK, payload
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Método no permitido."}
+        return HTTPStatus.NOT_FOUND, {"error": "Ruta no encontrada."}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Cuerpo demasiado grande."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                rejected = self._reject(headers)
+                if rejected is not None:
+                    status, payload = rejected[0], {"error": rejected[1]}
+                else:
+                    try:
+                        status, payload = await self.dispatch(method.upper(), target, body)
+                    except Exception as e:
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self):
+        self.lock = AsyncRWLock()
+        self.token_path = write_token(self.notes_manager.meta_dir, self.token)
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=512)
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+
+def serve(notes_manager, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+    """Arranca la API y bloquea hasta que se interrumpa."""
+    server = NotesApiServer(notes_manager, host, port, token=token)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
+
+
+def start_in_thread(notes_manager, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+    """Arranca la API en un hilo en segundo plano (p. ej. junto a la interfaz gráfica)."""
+    thread = threading.Thread(target=serve, args=(notes_manager, host, port, token), name="notes-api", daemon=True)
+    thread.start()
+    return thread
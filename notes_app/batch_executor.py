@@ -0,0 +1,37 @@
+# Reparto de trabajo por lotes entre procesos, con un número acotado de lotes en vuelo.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def map_batches(func, batches, workers, max_pending=8, min_batches_for_processes=0):
+    """
+    Aplica func a cada lote y genera sus resultados en orden.
+    Si hay menos de min_batches_for_processes lotes (o workers <= 1) se ejecuta en este mismo proceso.
+    func debe ser una función de módulo para poder enviarla a los procesos.
+    """
+    batches = iter(batches)
+    head = list(islice(batches, min_batches_for_processes))
+    pending = chain(head, batches)
+    if workers <= 1 or len(head) < min_batches_for_processes:
+        for batch in pending:
+            yield func(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for batch in pending:
+            in_flight.append(executor.submit(func, batch))
+            if len(in_flight) >= max_pending:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
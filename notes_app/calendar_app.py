@@ -1,7 +1,19 @@
+import queue
+import threading
 import tkinter as tk
 from tkcalendar import Calendar
 from datetime import datetime
-from tkinter import ttk, Toplevel, messagebox
+from calendar_event import parse_start
+from tkinter import ttk, Toplevel, messagebox, filedialog
+
+QUADRANT_LABELS = {
+    "HACER_AHORA": "Hacer Ahora", "PLANIFICAR": "Planificar", "DELEGAR": "Delegar", "ELIMINAR": "Eliminar"
+}
+# Agregados del resumen de tiempo: etiqueta -> valor de TimeAnalytics.aggregate
+SUMMARY_PERIODS = {"Semana": "week", "Mes": "month"}
+SUMMARY_DIMENSIONS = {"Rol": "role", "Cuadrante": "quadrant", "Tipo": "task_type"}
+# Color de fondo de los días según los minutos programados: (límite superior en minutos, color)
+HEAT_LEVELS = ((60, "#DCEFFF"), (180, "#9FD0FF"), (360, "#4DA3FF"), (None, "#0A6DD9"))
 
 class CalendarApp(ttk.Frame):
     def __init__(self, parent, notes_manager, *args, **kwargs):
@@ -9,13 +21,20 @@ class CalendarApp(ttk.Frame):
         self.notes_manager = notes_manager
         self.parent = parent
         self.selected_date = datetime.now().date()
+        self._shown_revision = None
+        self._time_analytics = None
         self._build_ui()
         self._refresh_events()
+        self._update_month_markers()
+        self.parent.bind("<FocusIn>", self._on_focus)
 
     def _build_ui(self):
         self.calendar = Calendar(self, selectmode='day', date_pattern='yyyy-mm-dd')
         self.calendar.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
         self.calendar.bind("<<CalendarSelected>>", self._on_date_selected)
+        self.calendar.bind("<<CalendarMonthChanged>>", self._update_month_markers)
+        for level, (_limit, color) in enumerate(HEAT_LEVELS):
+            self.calendar.tag_config(f"heat{level}", background=color, foreground="white" if level >= 2 else "black")
 
         self.events_frame = ttk.LabelFrame(self, text="Eventos para el día")
         self.events_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
@@ -27,6 +46,12 @@ class CalendarApp(ttk.Frame):
         self.edit_button.pack(side=tk.LEFT, padx=5, pady=5)
         self.delete_button = ttk.Button(self.events_frame, text="Eliminar Evento", command=self._delete_event)
         self.delete_button.pack(side=tk.LEFT, padx=5, pady=5)
+        self.export_button = ttk.Button(self.events_frame, text="Exportar .ics", command=self._export_ics)
+        self.export_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        self.import_button = ttk.Button(self.events_frame, text="Importar .ics", command=self._import_ics)
+        self.import_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        self.summary_button = ttk.Button(self.events_frame, text="Resumen de tiempo", command=self._show_time_summary)
+        self.summary_button.pack(side=tk.RIGHT, padx=5, pady=5)
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
@@ -42,9 +67,33 @@ class CalendarApp(ttk.Frame):
         events = self.notes_manager.get_events_for_date(date_str)
         self.current_events = events
         for event in events:
-            display = f"{event['start_datetime']} | {event['note_title']} | {event['task_line']} ({event['duration_minutes']} min)"
+            display = f"{event.start_datetime} | {event.note_title} | {event.task_line} ({event.duration_minutes} min)"
             self.events_listbox.insert(tk.END, display)
 
+    def _update_month_markers(self, event=None):
+        """
+        Marca los días con eventos del mes visible, coloreados según los minutos programados.
+        Usa los agregados por mes del gestor, así que el coste sólo depende de los días con eventos.
+        """
+        month, year = self.calendar.get_displayed_month()
+        self.calendar.calevent_remove('all')
+        for day, stats in self.notes_manager.get_month_summary(year, month).items():
+            level = next(i for i, (limit, _color) in enumerate(HEAT_LEVELS) if limit is None or stats.minutes < limit)
+            lines = [f"{stats.count} evento(s), {stats.minutes} min"]
+            for quadrant, label in QUADRANT_LABELS.items():
+                if stats.quadrant_minutes.get(quadrant):
+                    lines.append(f"{label}: {stats.quadrant_minutes[quadrant]} min")
+            self.calendar.calevent_create(day, "\n".join(lines), tags=[f"heat{level}"])
+        self._shown_revision = self.notes_manager.calendar_revision
+
+    def _on_focus(self, event=None):
+        # Recoge cambios hechos desde la CLI, la API u otro proceso
+        if event is None or event.widget is self.parent:
+            self.notes_manager.refresh_calendar()
+            if self.notes_manager.calendar_revision != self._shown_revision:
+                self._refresh_events()
+                self._update_month_markers()
+
     def _edit_event(self):
         selection = self.events_listbox.curselection()
         if not selection:
@@ -60,32 +109,32 @@ class CalendarApp(ttk.Frame):
         edit_win.geometry("350x200")
 
         ttk.Label(edit_win, text="Nueva Fecha y Hora (YYYY-MM-DD HH:MM):").pack(pady=5)
-        dt_var = tk.StringVar(value=event['start_datetime'])
+        dt_var = tk.StringVar(value=event.start_datetime)
         dt_entry = ttk.Entry(edit_win, textvariable=dt_var)
         dt_entry.pack(pady=5)
 
         ttk.Label(edit_win, text="Nueva Duración (minutos):").pack(pady=5)
-        dur_var = tk.IntVar(value=event['duration_minutes'])
+        dur_var = tk.IntVar(value=event.duration_minutes)
         dur_entry = ttk.Entry(edit_win, textvariable=dur_var)
         dur_entry.pack(pady=5)
 
         def save_changes():
-            new_dt = dt_var.get()
             try:
-                datetime.strptime(new_dt, "%Y-%m-%d %H:%M")
+                new_start = parse_start(dt_var.get())
             except ValueError:
                 messagebox.showerror("Error", "Formato de fecha y hora inválido.")
                 return
             try:
                 new_dur = int(dur_var.get())
-            except ValueError:
+            except (ValueError, tk.TclError):
                 messagebox.showerror("Error", "Duración inválida.")
                 return
-            ok, msg = self.notes_manager.update_calendar_event(event['id'], new_start_datetime_str=new_dt, new_duration_minutes=new_dur)
+            ok, msg = self.notes_manager.update_calendar_event(event.id, new_start=new_start, new_duration_minutes=new_dur)
             if ok:
                 messagebox.showinfo("Éxito", msg)
                 edit_win.destroy()
                 self._refresh_events()
+                self._update_month_markers()
             else:
                 messagebox.showerror("Error", msg)
 
@@ -100,9 +149,138 @@ class CalendarApp(ttk.Frame):
         event = self.current_events[idx]
         confirm = messagebox.askyesno("Confirmar", "¿Está seguro de eliminar este evento?")
         if confirm:
-            ok, msg = self.notes_manager.delete_calendar_event(event['id'])
+            ok, msg = self.notes_manager.delete_calendar_event(event.id)
             if ok:
                 messagebox.showinfo("Éxito", msg)
                 self._refresh_events()
+                self._update_month_markers()
+            else:
+                messagebox.showerror("Error", msg)
+
+    def _import_ics(self):
+        path = filedialog.askopenfilename(title="Importar calendario", filetypes=[("iCalendar", "*.ics"), ("Todos", "*.*")])
+        if not path:
+            return
+        from calendar_ics import import_ics
+        self.import_button.config(state="disabled")
+        def on_done(result):
+            self.import_button.config(state="normal")
+            ok, msg, _report = result
+            self._refresh_events()
+            self._update_month_markers()
+            if ok:
+                messagebox.showinfo("Importar", msg)
+            else:
+                messagebox.showerror("Error", msg)
+        def on_error(_error):
+            self.import_button.config(state="normal")
+            self._refresh_events()
+            self._update_month_markers()
+        self._run_in_background(lambda: import_ics(self.notes_manager, path), on_done, on_error)
+
+    def _export_ics(self):
+        path = filedialog.asksaveasfilename(title="Exportar calendario", defaultextension=".ics",
+                                            filetypes=[("iCalendar", "*.ics")])
+        if not path:
+            return
+        from calendar_ics import export_ics
+        self.export_button.config(state="disabled")
+        def on_done(result):
+            self.export_button.config(state="normal")
+            ok, msg = result
+            if ok:
+                messagebox.showinfo("Exportar", msg)
             else:
                 messagebox.showerror("Error", msg)
+        self._run_in_background(lambda: export_ics(self.notes_manager, path), on_done,
+                                on_error=lambda _e: self.export_button.config(state="normal"))
+
+    def _show_time_summary(self):
+        # Horas planificadas por semana o mes, repartidas por rol, cuadrante o tipo de tarea
+        from time_analytics import TimeAnalytics
+        if self._time_analytics is None:
+            self._time_analytics = TimeAnalytics(self.notes_manager)
+        analytics = self._time_analytics
+        self.summary_button.config(state="disabled")
+        def on_done(_rebuilt):
+            self.summary_button.config(state="normal")
+            self._open_summary_window(analytics)
+        # Pasar el calendario a columnas puede tardar; los agregados después son inmediatos
+        self._run_in_background(analytics.build, on_done,
+                                on_error=lambda _e: self.summary_button.config(state="normal"))
+
+    def _open_summary_window(self, analytics):
+        win = Toplevel(self)
+        win.title("Resumen de tiempo planificado")
+        win.geometry("700x400")
+        controls = ttk.Frame(win)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(controls, text="Periodo:").pack(side=tk.LEFT)
+        period_var = tk.StringVar(value="Semana")
+        ttk.Combobox(controls, textvariable=period_var, values=list(SUMMARY_PERIODS), state="readonly", width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="Agrupar por:").pack(side=tk.LEFT)
+        by_var = tk.StringVar(value="Rol")
+        ttk.Combobox(controls, textvariable=by_var, values=list(SUMMARY_DIMENSIONS), state="readonly", width=10).pack(side=tk.LEFT, padx=5)
+        total_var = tk.StringVar()
+        ttk.Label(controls, textvariable=total_var).pack(side=tk.RIGHT)
+
+        table_frame = ttk.Frame(win)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        tree = ttk.Treeview(table_frame, show="headings")
+        scroll_y = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
+        scroll_x = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=tree.xview)
+        tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        tree.pack(fill=tk.BOTH, expand=True)
+
+        def refresh(event=None):
+            period = SUMMARY_PERIODS[period_var.get()]
+            by = SUMMARY_DIMENSIONS[by_var.get()]
+            rows = analytics.aggregate(period, by)
+            totals = analytics.totals(by)
+            labels = list(totals)
+            tree.delete(*tree.get_children())
+            tree["columns"] = ["period"] + labels + ["total"]
+            tree.heading("period", text=period_var.get())
+            tree.column("period", width=90, anchor=tk.W)
+            for i, label in enumerate(labels):
+                tree.heading(f"#{i + 2}", text=QUADRANT_LABELS.get(label, label))
+                tree.column(f"#{i + 2}", width=90, anchor=tk.E)
+            tree.heading("total", text="Total")
+            tree.column("total", width=70, anchor=tk.E)
+            # Lo más reciente primero; las celdas en horas
+            for start, values in reversed(list(rows.items())):
+                label = start.strftime("%Y-%m-%d") if period == "week" else start.strftime("%Y-%m")
+                cells = [f"{values[l] / 60:.1f}" if values.get(l) else "" for l in labels]
+                tree.insert("", tk.END, values=[label] + cells + [f"{sum(values.values()) / 60:.1f}"])
+            # Un evento con varios roles cuenta en cada uno: el total general se calcula por evento
+            planned = sum(analytics.totals("quadrant").values())
+            total_var.set(f"{len(analytics)} eventos, {planned / 60:.1f} h en total")
+        period_var.trace_add("write", lambda *args: refresh())
+        by_var.trace_add("write", lambda *args: refresh())
+        refresh()
+
+    def _run_in_background(self, task, on_done, on_error=None):
+        # Ejecuta task en un hilo y entrega el resultado a on_done en el hilo de Tk; si falla, on_error(excepción)
+        # se llama antes de mostrar el error
+        results = queue.Queue()
+        def worker():
+            try:
+                results.put((True, task()))
+            except Exception as e:
+                results.put((False, e))
+        def poll():
+            try:
+                finished, value = results.get_nowait()
+            except queue.Empty:
+                self.after(100, poll)
+                return
+            if finished:
+                on_done(value)
+            else:
+                if on_error:
+                    on_error(value)
+                messagebox.showerror("Error", str(value))
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
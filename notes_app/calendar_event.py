@@ -0,0 +1,142 @@
+# Modelo de evento del calendario. La fecha de inicio se guarda como minutos desde 1970-01-01 (hora local,
+# sin zona) y sólo se convierte a texto "YYYY-MM-DD HH:MM" al leer/escribir el JSON y en la interfaz.
+
+import hashlib
+from datetime import date, datetime
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+DATE_FORMAT = "%Y-%m-%d"
+MINUTES_PER_DAY = 1440
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_JSON_FIELDS = ("id", "note_title", "task_line", "start_datetime", "duration_minutes", "note_id")
+
+
+def parse_day(date_str):
+    """'YYYY-MM-DD' -> días desde 1970-01-01. Lanza ValueError si el formato no es válido."""
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+        return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])).toordinal() - _EPOCH_ORDINAL
+    return datetime.strptime(date_str, DATE_FORMAT).toordinal() - _EPOCH_ORDINAL
+
+
+def parse_start(datetime_str):
+    """'YYYY-MM-DD HH:MM' -> minutos desde 1970-01-01. Lanza ValueError si el formato no es válido."""
+    s = datetime_str.strip()
+    if len(s) == 16 and s[10] == ' ' and s[13] == ':':
+        hour, minute = int(s[11:13]), int(s[14:16])
+        if 0 <= hour < 24 and 0 <= minute < 60:
+            return parse_day(s[:10]) * MINUTES_PER_DAY + hour * 60 + minute
+    return datetime_to_start(datetime.strptime(s, DATETIME_FORMAT))
+
+
+def datetime_to_start(dt):
+    """datetime (hora local, sin zona) -> minutos desde 1970-01-01; se descartan los segundos."""
+    return (dt.toordinal() - _EPOCH_ORDINAL) * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def event_id(note_title, task_line, start):
+    """Id de un evento: md5 de nota, línea e inicio (el mismo esquema que los eventos ya guardados)."""
+    return hashlib.md5(f"{note_title}-{task_line}-{format_start(start)}".encode()).hexdigest()
+
+
+def format_day(day):
+    d = date.fromordinal(day + _EPOCH_ORDINAL)
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+
+
+def format_start(start):
+    day, minutes = divmod(start, MINUTES_PER_DAY)
+    return f"{format_day(day)} {minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def day_to_date(day):
+    return date.fromordinal(day + _EPOCH_ORDINAL)
+
+
+def date_to_day(d):
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+class CalendarEvent:
+    __slots__ = ("id", "note_title", "task_line", "start", "duration_minutes", "extra", "note_id")
+
+    def __init__(self, id, note_title, task_line, start, duration_minutes, extra=None, note_id=None):
+        self.id = id
+        self.note_title = note_title
+        # Id estable de la nota (ver note_ids); note_title es el título que tenía al crear o renombrar
+        self.note_id = note_id
+        self.task_line = task_line
+        self.start = start
+        self.duration_minutes = duration_minutes
+        # Campos desconocidos del JSON, que se conservan al reescribir el archivo
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in _JSON_FIELDS} or None
+        return cls(data["id"], data["note_title"], data["task_line"], parse_start(data["start_datetime"]),
+                   int(data["duration_minutes"]), extra, data.get("note_id"))
+
+    def to_dict(self):
+        data = {
+            "id": self.id,
+            "note_title": self.note_title,
+            "task_line": self.task_line,
+            "start_datetime": format_start(self.start),
+            "duration_minutes": self.duration_minutes,
+        }
+        if self.note_id:
+            data["note_id"] = self.note_id
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self):
+        return CalendarEvent(self.id, self.note_title, self.task_line, self.start, self.duration_minutes,
+                             dict(self.extra) if self.extra else None, self.note_id)
+
+    @property
+    def start_datetime(self):
+        return format_start(self.start)
+
+    @property
+    def day(self):
+        return self.start // MINUTES_PER_DAY
+
+    @property
+    def end(self):
+        return self.start + self.duration_minutes
+
+    def _key(self):
+        return (self.id, self.note_title, self.task_line, self.start, self.duration_minutes, self.extra, self.note_id)
+
+    def __eq__(self, other):
+        if not isinstance(other, CalendarEvent):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"CalendarEvent({self.id!r}, {self.start_datetime!r}, {self.duration_minutes} min, {self.task_line!r})"
+
+
+class DayStats:
+    """Agregado de un día: número de eventos, minutos totales y minutos por cuadrante de Eisenhower."""
+    __slots__ = ("count", "minutes", "quadrant_minutes")
+
+    def __init__(self):
+        self.count = 0
+        self.minutes = 0
+        self.quadrant_minutes = {}
+
+    def add(self, duration_minutes, quadrant, sign=1):
+        self.count += sign
+        self.minutes += sign * duration_minutes
+        total = self.quadrant_minutes.get(quadrant, 0) + sign * duration_minutes
+        if total or sign > 0:
+            self.quadrant_minutes[quadrant] = total
+        else:
+            self.quadrant_minutes.pop(quadrant, None)
+
+    def __repr__(self):
+        return f"DayStats({self.count} eventos, {self.minutes} min, {self.quadrant_minutes!r})"
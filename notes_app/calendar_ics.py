@@ -0,0 +1,346 @@
+# Importación y exportación de eventos en formato iCalendar (.ics, RFC 5545).
+# El archivo se lee línea a línea (no se carga entero) y los eventos se añaden al calendario por lotes.
+# Al exportar se escriben las propiedades X-NOTES-APP-* con la nota y la línea de origen, de modo que
+# al volver a importar el archivo los eventos conservan el mismo id y no se duplican.
+
+import os
+import tempfile
+from datetime import date, datetime, timezone
+from calendar_event import CalendarEvent, MINUTES_PER_DAY, date_to_day, day_to_date, event_id
+from notes_manager import file_mode
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+NOTE_TITLE_PROPERTY = "X-NOTES-APP-NOTE-TITLE"
+TASK_LINE_PROPERTY = "X-NOTES-APP-TASK-LINE"
+PRODID = "-//notes_app//Gestor de Notas//ES"
+BATCH_SIZE = 50000
+MAX_LINE_OCTETS = 75
+# Duración (minutos) de los eventos con hora que no indican fin
+DEFAULT_DURATION_MINUTES = 30
+# Propiedades de VEVENT que se leen; el resto se ignora sin guardarlo en memoria
+_WANTED = {"SUMMARY", "DTSTART", "DTEND", "DURATION", NOTE_TITLE_PROPERTY, TASK_LINE_PROPERTY}
+# Clave con la que iter_vevents marca un VEVENT con alguna línea mal formada
+INVALID = "X-INVALID"
+
+
+# --- Lectura ---
+
+def iter_unfolded_lines(binary_file):
+    """
+    Líneas lógicas del archivo (une las líneas plegadas, que empiezan por espacio o tabulador).
+    Devuelve (línea, bytes_leídos) para poder informar del avance.
+    """
+    pending = None
+    read = 0
+    for raw in binary_file:
+        read += len(raw)
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield pending, read
+        pending = line
+    if pending:
+        yield pending, read
+
+
+def parse_content_line(line):
+    """'NOMBRE;PARAM=valor:VALOR' -> (NOMBRE, {PARAM: valor}, VALOR). Respeta ':' y ';' entre comillas."""
+    in_quotes = False
+    separators = []
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif not in_quotes and ch == ';':
+            separators.append(i)
+        elif not in_quotes and ch == ':':
+            separators.append(i)
+            break
+    else:
+        raise ValueError(f"Línea iCalendar inválida: {line[:40]!r}")
+    parts = []
+    start = 0
+    for i in separators:
+        parts.append(line[start:i])
+        start = i + 1
+    params = {}
+    for param in parts[1:]:
+        key, _, value = param.partition("=")
+        params[key.upper()] = value.strip('"')
+    return parts[0].upper(), params, line[start:]
+
+
+def unescape_text(value):
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def parse_ics_datetime(value, params):
+    """
+    DTSTART/DTEND -> (minutos desde 1970 en hora local, es_dia_completo).
+    Las horas en UTC ('Z') o con TZID se convierten a la hora local; las 'flotantes' se toman tal cual.
+    """
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        d = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        return date_to_day(d) * MINUTES_PER_DAY, True
+    dt = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    tz = None
+    if value.endswith("Z"):
+        tz = timezone.utc
+    elif "TZID" in params and ZoneInfo is not None:
+        try:
+            tz = ZoneInfo(params["TZID"])
+        except Exception:
+            tz = None  # zona desconocida: se trata como hora local
+    if tz is not None:
+        dt = dt.replace(tzinfo=tz).astimezone().replace(tzinfo=None)
+    return date_to_day(dt.date()) * MINUTES_PER_DAY + dt.hour * 60 + dt.minute, False
+
+
+def parse_ics_duration(value):
+    """'PT1H30M', 'P1D', 'P1W', '-PT15M' -> minutos."""
+    value = value.strip().upper()
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("+-")
+    if not value.startswith("P"):
+        raise ValueError(f"Duración inválida: {value!r}")
+    units = {"W": 7 * MINUTES_PER_DAY, "D": MINUTES_PER_DAY, "H": 60, "M": 1, "S": 1 / 60}
+    total = 0
+    number = ""
+    for ch in value[1:]:
+        if ch.isdigit():
+            number += ch
+        elif ch == "T":
+            continue
+        elif ch in units and number:
+            total += int(number) * units[ch]
+            number = ""
+        else:
+            raise ValueError(f"Duración inválida: {value!r}")
+    return sign * int(total)
+
+
+def iter_vevents(binary_file):
+    """
+    Recorre los VEVENT del archivo como dicts {propiedad: (parámetros, valor)}, sin cargar el archivo.
+    Los componentes anidados (VALARM...) se ignoran. Devuelve (vevent, bytes_leídos).
+    Un VEVENT con una línea mal formada se devuelve sólo con la clave INVALID (el mensaje de error), para
+    que se descarte ese evento y no toda la importación.
+    """
+    props = None
+    nested = 0
+    for line, read in iter_unfolded_lines(binary_file):
+        upper = line.upper()
+        if upper.startswith("BEGIN:"):
+            if upper == "BEGIN:VEVENT" and props is None:
+                props = {}
+            elif props is not None:
+                nested += 1
+            continue
+        if upper.startswith("END:"):
+            if props is not None:
+                if nested:
+                    nested -= 1
+                elif upper == "END:VEVENT":
+                    yield props, read
+                    props = None
+            continue
+        if props is None or nested:
+            continue
+        name = upper.split(";", 1)[0].split(":", 1)[0]
+        if name in _WANTED and INVALID not in props:
+            try:
+                name, params, value = parse_content_line(line)
+            except ValueError as e:
+                props = {INVALID: str(e)}
+                continue
+            props[name] = (params, value)
+
+
+def event_from_vevent(props, default_note_title):
+    """Convierte un VEVENT en CalendarEvent. Lanza ValueError si falta el inicio o es inválido."""
+    if INVALID in props:
+        raise ValueError(props[INVALID])
+    if "DTSTART" not in props:
+        raise ValueError("VEVENT sin DTSTART")
+    start, all_day = parse_ics_datetime(props["DTSTART"][1], props["DTSTART"][0])
+    duration = 0
+    if "DTEND" in props:
+        end, _ = parse_ics_datetime(props["DTEND"][1], props["DTEND"][0])
+        duration = end - start
+        if duration < 0:
+            raise ValueError("VEVENT con DTEND anterior a DTSTART")
+    elif "DURATION" in props:
+        duration = parse_ics_duration(props["DURATION"][1])
+        if duration < 0:
+            raise ValueError("VEVENT con DURATION negativa")
+    if not duration:
+        # Los eventos del calendario duran al menos un minuto: sin fin (o de duración nula) se usa la
+        # duración por defecto, o el día entero si es de día completo
+        duration = MINUTES_PER_DAY if all_day else DEFAULT_DURATION_MINUTES
+    if TASK_LINE_PROPERTY in props:
+        task_line = unescape_text(props[TASK_LINE_PROPERTY][1])
+    else:
+        task_line = unescape_text(props.get("SUMMARY", ({}, ""))[1]).replace("\n", " ").strip()
+    if not task_line:
+        task_line = "(sin título)"
+    if NOTE_TITLE_PROPERTY in props:
+        note_title = unescape_text(props[NOTE_TITLE_PROPERTY][1])
+    else:
+        note_title = default_note_title
+    return CalendarEvent(event_id(note_title, task_line, start), note_title, task_line, start, duration)
+
+
+class IcsImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.duplicates = 0
+        self.errors = []
+        self.cancelled = False
+
+    def summary(self):
+        text = f"{self.imported} eventos importados"
+        if self.duplicates:
+            text += f", {self.duplicates} ya existían"
+        text += "."
+        if self.errors:
+            text += f" {len(self.errors)} eventos no válidos omitidos."
+        if self.cancelled:
+            text += " Importación interrumpida."
+        return text
+
+
+def import_ics(notes_manager, path, note_title=None, progress=None, cancel_event=None, batch_size=BATCH_SIZE):
+    """
+    Importa los VEVENT de un .ics. Los eventos sin X-NOTES-APP-NOTE-TITLE se asocian a note_title
+    (por defecto, el nombre del archivo). Se guardan cada batch_size eventos; progress(bytes_leídos, total)
+    informa del avance y cancel_event detiene la importación tras el lote en curso.
+    Devuelve (ok, mensaje, IcsImportReport).
+    """
+    report = IcsImportReport()
+    default_title = note_title or os.path.splitext(os.path.basename(path))[0]
+    try:
+        total = os.path.getsize(path)
+        batch = []
+        batch_ids = set()
+        read = 0
+        with open(path, 'rb') as f:
+            for index, (props, read) in enumerate(iter_vevents(f)):
+                try:
+                    event = event_from_vevent(props, default_title)
+                except (ValueError, IndexError) as e:
+                    report.errors.append((index, str(e)))
+                    continue
+                if event.id in batch_ids:
+                    report.duplicates += 1
+                    continue
+                batch.append(event)
+                batch_ids.add(event.id)
+                if len(batch) >= batch_size:
+                    _commit_batch(notes_manager, batch, report)
+                    batch, batch_ids = [], set()
+                    if progress:
+                        progress(read, total)
+                    if cancel_event is not None and cancel_event.is_set():
+                        report.cancelled = True
+                        return True, report.summary(), report
+        _commit_batch(notes_manager, batch, report)
+        if progress:
+            progress(total, total)
+    except Exception as e:
+        return False, f"Error al importar el calendario: {e}", report
+    return True, report.summary(), report
+
+
+def _commit_batch(notes_manager, batch, report):
+    if batch:
+        added, duplicates = notes_manager.add_calendar_events(batch)
+        report.imported += added
+        report.duplicates += duplicates
+
+
+# --- Escritura ---
+
+def escape_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line):
+    """Pliega una línea a 75 octetos (sin partir caracteres UTF-8), como pide el RFC 5545."""
+    if len(line.encode("utf-8")) <= MAX_LINE_OCTETS:
+        return line + "\r\n"
+    chunks = []
+    current = []
+    size = 0
+    limit = MAX_LINE_OCTETS
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        if size + width > limit:
+            chunks.append("".join(current))
+            current, size, limit = [], 0, MAX_LINE_OCTETS - 1
+        current.append(ch)
+        size += width
+    chunks.append("".join(current))
+    return "\r\n ".join(chunks) + "\r\n"
+
+
+def _format_ics_start(start):
+    day, minutes = divmod(start, MINUTES_PER_DAY)
+    d = day_to_date(day)
+    return f"{d.year:04d}{d.month:02d}{d.day:02d}T{minutes // 60:02d}{minutes % 60:02d}00"
+
+
+def vevent_lines(event, stamp):
+    yield "BEGIN:VEVENT"
+    yield f"UID:{event.id}@notes-app"
+    yield f"DTSTAMP:{stamp}"
+    # Hora 'flotante' (sin zona), igual que en calendar_events.json
+    yield f"DTSTART:{_format_ics_start(event.start)}"
+    yield f"DURATION:PT{event.duration_minutes}M"
+    yield f"SUMMARY:{escape_text(event.task_line.strip())}"
+    yield f"DESCRIPTION:{escape_text('Nota: ' + event.note_title)}"
+    yield f"{NOTE_TITLE_PROPERTY}:{escape_text(event.note_title)}"
+    yield f"{TASK_LINE_PROPERTY}:{escape_text(event.task_line)}"
+    yield "END:VEVENT"
+
+
+def export_ics(notes_manager, path, progress=None):
+    """
+    Exporta todos los eventos a un .ics, en orden cronológico y escribiendo evento a evento.
+    El archivo se reemplaza de forma atómica al terminar. Devuelve (ok, mensaje).
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    dir_path = os.path.dirname(os.path.abspath(path))
+    mode = file_mode(path)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=".tmp-", suffix=".ics")
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', encoding="utf-8", newline="") as f:
+            f.write(fold_line("BEGIN:VCALENDAR") + fold_line("VERSION:2.0") + fold_line(f"PRODID:{PRODID}"))
+            for event in notes_manager.iter_calendar_events():
+                f.write("".join(fold_line(line) for line in vevent_lines(event, stamp)))
+                count += 1
+                if progress and count % 1000 == 0:
+                    progress(count)
+            f.write(fold_line("END:VCALENDAR"))
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False, f"Error al exportar el calendario: {e}"
+    return True, f"{count} eventos exportados a '{path}'."
@@ -0,0 +1,304 @@
+# Interfaz de línea de comandos sin interfaz gráfica: no importa tkinter, tkcalendar ni pydrive.
+# Uso: python -m notes_app <comando> ...   (ver python -m notes_app --help)
+
+import os
+import sys
+import json
+import argparse
+from notes_manager import NotesManager, classification_fields
+
+CLASSIFICATION_TYPES = ("role", "eisenhower", "task_type")
+
+
+def _print_json(data):
+    json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+def cmd_list(manager, args):
+    if args.tree:
+        hierarchy = manager.list_notes_hierarchy()
+        if args.json:
+            _print_json(hierarchy)
+            return 0
+        for folder in sorted(hierarchy):
+            print(f"{folder or '.'}/")
+            for note in sorted(hierarchy[folder]):
+                print(f"  {note}")
+        return 0
+    titles = [title for title, _path in manager.iter_notes()]
+    if args.json:
+        _print_json(titles)
+    else:
+        print("\n".join(titles))
+    return 0
+
+
+def cmd_show(manager, args):
+    content, roles, msg = manager.get_note_content(args.title)
+    if content is None:
+        print(msg, file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json({"title": args.title, "content": content, "roles": roles})
+        return 0
+    print(content.rstrip("\n"))
+    if args.roles and roles:
+        print("\n---ROLES---")
+        for role, color in roles.items():
+            print(f"{role}:{color}")
+    return 0
+
+
+def cmd_filter(manager, args):
+    if args.title:
+        lines, msg = manager.filter_note_by_classification(args.title, args.type, args.value)
+        if args.json:
+            _print_json([{"note": args.title, "text": line, "tag": tag} for line, tag in lines])
+        elif lines:
+            for line, _tag in lines:
+                print(line)
+        else:
+            print(msg, file=sys.stderr)
+        return 0
+    # Sin título: consulta en todo el vault
+    from notes_exporter import NotesExporter
+    matches = []
+    for record in NotesExporter(manager, workers=args.workers).iter_records():
+        if args.type == "role":
+            found = args.value in record["roles"]
+        else:
+            found = record[args.type] == args.value
+        if not found:
+            continue
+        if args.json:
+            matches.append(record)
+        else:
+            print(f"{record['note']}:{record['line']}: {record['text']}")
+    if args.json:
+        _print_json(matches)
+    return 0
+
+
+def cmd_search(manager, args):
+    results = manager.search_notes(args.query, ignore_case=not args.case_sensitive, regex=args.regex)
+    if args.json:
+        _print_json([{"note": t, "line": n, "text": l} for t, n, l in results])
+        return 0
+    for title, line_no, line in results:
+        print(f"{title}:{line_no}: {line.strip()}")
+    return 0
+
+
+def cmd_classify(manager, args):
+    # Los roles de la nota indicada o, si no hay, los del registro del vault
+    roles = None
+    if args.note:
+        content, roles, msg = manager.get_note_content(args.note)
+        if content is None:
+            print(msg, file=sys.stderr)
+            return 1
+    if roles is None:
+        roles = manager.default_role_colors()
+    roles, eisenhower, task_type = classification_fields(manager.get_line_classification(args.line, roles))
+    _print_json({"roles": roles, "eisenhower": eisenhower, "task_type": task_type})
+    return 0
+
+
+def cmd_events(manager, args):
+    if args.events_command == "add":
+        ok, msg = manager.add_calendar_event(args.note, args.line, args.start, args.duration)
+        print(msg, file=sys.stdout if ok else sys.stderr)
+        return 0 if ok else 1
+    if args.events_command == "import":
+        from calendar_ics import import_ics
+        ok, msg, _report = import_ics(manager, args.file, note_title=args.note_title)
+        print(msg, file=sys.stdout if ok else sys.stderr)
+        return 0 if ok else 1
+    if args.events_command == "export":
+        from calendar_ics import export_ics
+        ok, msg = export_ics(manager, args.file)
+        print(msg, file=sys.stdout if ok else sys.stderr)
+        return 0 if ok else 1
+    if args.date:
+        events = manager.get_events_for_date(args.date)
+    else:
+        events = sorted(manager.calendar_events, key=lambda e: e.start)
+    if args.json:
+        _print_json([event.to_dict() for event in events])
+        return 0
+    for event in events:
+        print(f"{event.start_datetime} | {event.note_title} | {event.task_line} ({event.duration_minutes} min) [{event.id}]")
+    return 0
+
+
+def cmd_export(manager, args):
+    from notes_exporter import NotesExporter
+    formats = tuple(args.format) if args.format else None
+    exporter = NotesExporter(manager, workers=args.workers)
+    ok, msg = exporter.export(args.out_dir, formats) if formats else exporter.export(args.out_dir)
+    print(msg, file=sys.stdout if ok else sys.stderr)
+    return 0 if ok else 1
+
+
+def cmd_links(manager, args):
+    graph = manager.link_graph
+    if args.links_command == "backlinks":
+        result = graph.backlinks(args.title)
+    elif args.links_command == "neighbours":
+        result = graph.neighbourhood(args.title, args.hops)
+    elif args.links_command == "orphans":
+        result = graph.orphans()
+    else:
+        result = [f"{source} -> {target}" for source, target in graph.broken_links()]
+    if args.json:
+        _print_json(result)
+    elif isinstance(result, dict):
+        for title, distance in sorted(result.items(), key=lambda item: (item[1], item[0])):
+            print(f"{distance} {title}")
+    else:
+        print("\n".join(result))
+    return 0
+
+
+def cmd_archive(manager, args):
+    if args.archive_command == "list":
+        titles = manager.list_archived_notes()
+        if args.json:
+            _print_json(titles)
+        elif titles:
+            print("\n".join(titles))
+        return 0
+    ok, msg, _count = manager.archive_notes(args.days, only_eliminar=args.eliminar)
+    print(msg, file=sys.stdout if ok else sys.stderr)
+    return 0 if ok else 1
+
+
+def cmd_roles(manager, args):
+    registry = manager.role_registry
+    if args.roles_command == "notes":
+        titles = manager.notes_with_role(args.name)
+        if args.json:
+            _print_json(titles)
+        elif titles:
+            print("\n".join(titles))
+        return 0
+    counts = registry.usage_counts()
+    roles = [{"id": registry.id_for(name), "name": name, "color": color, "notes": counts.get(name, 0)}
+             for name, color in registry.colors().items()]
+    if args.json:
+        _print_json(roles)
+        return 0
+    for role in roles:
+        print(f"{role['id']:>4}  {role['color']}  {role['name']} ({role['notes']} notas)")
+    return 0
+
+
+def cmd_serve(manager, args):
+    from api_server import serve, TOKEN_FILE
+    print(f"API escuchando en http://{args.host}:{args.port} "
+          f"(token en {os.path.join(manager.meta_dir, TOKEN_FILE)})", file=sys.stderr)
+    serve(manager, args.host, args.port)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m notes_app", description="Gestor de notas sin interfaz gráfica.")
+    parser.add_argument("--notes-dir", default="notes", help="Carpeta de notas (por defecto: notes)")
+    parser.add_argument("--calendar-file", default="calendar_events.json", help="Archivo de eventos del calendario")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="Lista las notas")
+    p.add_argument("--tree", action="store_true", help="Agrupa por carpetas")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("show", help="Muestra una nota")
+    p.add_argument("title")
+    p.add_argument("--roles", action="store_true", help="Incluye la sección de roles")
+    p.set_defaults(func=cmd_show)
+
+    p = sub.add_parser("filter", help="Líneas con una clasificación (en una nota o en todo el vault)")
+    p.add_argument("--type", choices=CLASSIFICATION_TYPES, required=True)
+    p.add_argument("--value", required=True, help="Rol, cuadrante (HACER_AHORA, PLANIFICAR...) o tipo (Idea, Tarea...)")
+    p.add_argument("--title", help="Limita la consulta a esta nota")
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_filter)
+
+    p = sub.add_parser("search", help="Busca texto en todas las notas")
+    p.add_argument("query")
+    p.add_argument("--regex", action="store_true")
+    p.add_argument("--case-sensitive", action="store_true")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("classify", help="Clasifica una línea suelta")
+    p.add_argument("line")
+    p.add_argument("--note", help="Usa los roles declarados en esta nota")
+    p.set_defaults(func=cmd_classify)
+
+    p = sub.add_parser("events", help="Eventos del calendario")
+    events_sub = p.add_subparsers(dest="events_command", required=True)
+    e = events_sub.add_parser("list", help="Lista eventos")
+    e.add_argument("--date", help="YYYY-MM-DD")
+    e = events_sub.add_parser("add", help="Programa una línea de una nota")
+    e.add_argument("note")
+    e.add_argument("line")
+    e.add_argument("start", help="YYYY-MM-DD HH:MM")
+    e.add_argument("duration", type=int, help="Minutos")
+    e = events_sub.add_parser("import", help="Importa eventos de un archivo .ics")
+    e.add_argument("file")
+    e.add_argument("--note-title", help="Nota para los eventos que no indican una (por defecto, el nombre del archivo)")
+    e = events_sub.add_parser("export", help="Exporta los eventos a un archivo .ics")
+    e.add_argument("file")
+    p.set_defaults(func=cmd_events)
+
+    p = sub.add_parser("export", help="Exporta el vault (NDJSON, HTML, matriz de Eisenhower)")
+    p.add_argument("out_dir")
+    p.add_argument("--format", action="append", choices=("ndjson", "html", "matrix"))
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("links", help="Consultas sobre el grafo de enlaces")
+    links_sub = p.add_subparsers(dest="links_command", required=True)
+    l = links_sub.add_parser("backlinks")
+    l.add_argument("title")
+    l = links_sub.add_parser("neighbours")
+    l.add_argument("title")
+    l.add_argument("--hops", type=int, default=1)
+    links_sub.add_parser("orphans")
+    links_sub.add_parser("broken")
+    p.set_defaults(func=cmd_links)
+
+    p = sub.add_parser("archive", help="Archivo en frío de notas inactivas")
+    archive_sub = p.add_subparsers(dest="archive_command", required=True)
+    a = archive_sub.add_parser("run", help="Archiva notas inactivas")
+    a.add_argument("--days", type=int, help="Notas sin modificar desde hace N días")
+    a.add_argument("--eliminar", action="store_true", help="Notas con todas sus líneas en el cuadrante ELIMINAR")
+    archive_sub.add_parser("list", help="Lista las notas archivadas")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("roles", help="Registro de roles del vault")
+    roles_sub = p.add_subparsers(dest="roles_command", required=True)
+    roles_sub.add_parser("list", help="Lista los roles con su color y el número de notas que los usan")
+    r = roles_sub.add_parser("notes", help="Notas que declaran un rol")
+    r.add_argument("name")
+    p.set_defaults(func=cmd_roles)
+
+    p = sub.add_parser("serve", help="Arranca la API HTTP/JSON local")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    manager = NotesManager(args.notes_dir, args.calendar_file)
+    try:
+        return args.func(manager, args)
+    except BrokenPipeError:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
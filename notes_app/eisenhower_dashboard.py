@@ -0,0 +1,104 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+from eisenhower_index import EisenhowerIndex
+from notes_manager import EISENHOWER_CATEGORIES
+
+QUADRANT_LAYOUT = {
+    "HACER_AHORA": (0, 0), "PLANIFICAR": (0, 1), "DELEGAR": (1, 0), "ELIMINAR": (1, 1)
+}
+QUADRANT_COLORS = {
+    "HACER_AHORA": "#FF3B30", "PLANIFICAR": "#FF9F0A", "DELEGAR": "#5856D6", "ELIMINAR": "#8E8E93"
+}
+QUADRANT_LABELS = {
+    "HACER_AHORA": "Hacer Ahora", "PLANIFICAR": "Planificar", "DELEGAR": "Delegar", "ELIMINAR": "Eliminar"
+}
+REFRESH_MS = 500
+
+
+class EisenhowerDashboard(ttk.Frame):
+    def __init__(self, parent, notes_manager, on_open_line=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.notes_manager = notes_manager
+        self.parent = parent
+        self.on_open_line = on_open_line  # on_open_line(titulo, num_linea)
+        self.index = EisenhowerIndex(notes_manager)
+        self._shown_versions = {}
+        self._current_entries = {}
+        self._syncing = False
+        self._build_ui()
+        self.index.attach()
+        self._start_sync(self.index.build)
+        self.parent.bind("<FocusIn>", self._on_focus)
+        self._poll()
+
+    def _build_ui(self):
+        self.parent.title("Matriz de Eisenhower")
+        self.status_var = tk.StringVar(value="Analizando notas…")
+        ttk.Label(self, textvariable=self.status_var).grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=(8, 0))
+        self.frames = {}
+        self.listboxes = {}
+        for quadrant, (row, col) in QUADRANT_LAYOUT.items():
+            frame = ttk.LabelFrame(self, text=QUADRANT_LABELS[quadrant])
+            frame.grid(row=row + 1, column=col, padx=10, pady=10, sticky="nsew")
+            listbox = tk.Listbox(frame, width=60, height=15, fg=QUADRANT_COLORS[quadrant], font=("San Francisco", 12))
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=listbox.yview)
+            listbox.configure(yscrollcommand=scrollbar.set)
+            listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            listbox.bind("<Double-Button-1>", lambda e, q=quadrant: self._open_selected(q))
+            listbox.bind("<Return>", lambda e, q=quadrant: self._open_selected(q))
+            self.frames[quadrant] = frame
+            self.listboxes[quadrant] = listbox
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=1)
+
+    def _start_sync(self, task):
+        # El análisis se hace en un hilo; _poll redibuja los cuadrantes que cambien
+        if self._syncing:
+            return
+        self._syncing = True
+        def worker():
+            try:
+                task()
+            finally:
+                self._syncing = False
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_focus(self, event=None):
+        if event is None or event.widget is self.parent:
+            self._start_sync(self.index.sync_with_disk)
+
+    def _poll(self):
+        if not self.winfo_exists():
+            return
+        for quadrant in EISENHOWER_CATEGORIES:
+            version = self.index.versions[quadrant]
+            if self._shown_versions.get(quadrant) != version:
+                self._shown_versions[quadrant] = version
+                self._refresh_quadrant(quadrant)
+        total = sum(self.index.counts.values())
+        self.status_var.set("Analizando notas…" if self._syncing else f"{total} líneas clasificadas en el vault")
+        self.after(REFRESH_MS, self._poll)
+
+    def _refresh_quadrant(self, quadrant):
+        entries = self.index.entries(quadrant)
+        self._current_entries[quadrant] = entries
+        self.frames[quadrant].config(text=f"{QUADRANT_LABELS[quadrant]} ({len(entries)})")
+        listbox = self.listboxes[quadrant]
+        listbox.delete(0, tk.END)
+        for title, line_no, text in entries:
+            listbox.insert(tk.END, f"{title}:{line_no}  {text}")
+
+    def _open_selected(self, quadrant):
+        selection = self.listboxes[quadrant].curselection()
+        if not selection or not self.on_open_line:
+            return
+        title, line_no, _text = self._current_entries[quadrant][selection[0]]
+        self.on_open_line(title, line_no)
+
+    def destroy(self):
+        self.index.detach()
+        super().destroy()
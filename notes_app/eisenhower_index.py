@@ -0,0 +1,149 @@
+# Índice de la matriz de Eisenhower de todo el vault.
+# Se construye una vez y después se mantiene con los cambios de cada nota (al guardar o al
+# detectar que el archivo cambió en disco), sin volver a recorrer todas las notas.
+
+import os
+import threading
+from batch_executor import batched, map_batches
+from notes_manager import split_note_text, eisenhower_quadrant, note_key, EISENHOWER_CATEGORIES
+
+BATCH_SIZE = 128
+MIN_BATCHES_FOR_PROCESSES = 32
+
+
+def quadrant_lines(content):
+    """Agrupa las líneas de la nota por cuadrante: {cuadrante: ((num_linea, texto), ...)}."""
+    by_quadrant = {}
+    for line_no, line in enumerate(content.split("\n"), 1):
+        quadrant = eisenhower_quadrant(line)
+        if quadrant:
+            by_quadrant.setdefault(quadrant, []).append((line_no, line.strip()))
+    return {q: tuple(lines) for q, lines in by_quadrant.items()}
+
+
+def scan_note_batch(batch):
+    results = []
+    for title, path in batch:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with open(path, 'r', encoding="utf-8") as f:
+                content, _roles = split_note_text(f.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+        results.append((title, mtime, quadrant_lines(content)))
+    return results
+
+
+class EisenhowerIndex:
+    def __init__(self, notes_manager, workers=None):
+        self.notes_manager = notes_manager
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._lock = threading.RLock()
+        # clave de nota -> (titulo, mtime_ns, {cuadrante: lineas})
+        self._notes = {}
+        # cuadrante -> {clave de nota: lineas}
+        self._quadrants = {q: {} for q in EISENHOWER_CATEGORIES}
+        self.counts = dict.fromkeys(EISENHOWER_CATEGORIES, 0)
+        # Se incrementa cada vez que cambia un cuadrante, para redibujar sólo lo necesario
+        self.versions = dict.fromkeys(EISENHOWER_CATEGORIES, 0)
+
+    def attach(self):
+        self.notes_manager.add_listener(self._on_note_event)
+
+    def detach(self):
+        self.notes_manager.remove_listener(self._on_note_event)
+
+    def build(self):
+        """Análisis inicial de todo el vault (en paralelo si hay muchas notas)."""
+        batches = batched(self.notes_manager.iter_notes(), BATCH_SIZE)
+        for results in map_batches(scan_note_batch, batches, self.workers,
+                                   min_batches_for_processes=MIN_BATCHES_FOR_PROCESSES):
+            with self._lock:
+                for title, mtime, by_quadrant in results:
+                    self._apply(note_key(title), title, mtime, by_quadrant)
+
+    def _apply(self, key, title, mtime, by_quadrant):
+        # Aplica el delta de una nota: sólo se tocan los cuadrantes cuyas líneas cambiaron
+        old = self._notes.get(key)
+        old_quadrants = old[2] if old else {}
+        for quadrant in EISENHOWER_CATEGORIES:
+            old_lines = old_quadrants.get(quadrant, ())
+            new_lines = by_quadrant.get(quadrant, ())
+            if old_lines == new_lines:
+                continue
+            bucket = self._quadrants[quadrant]
+            if new_lines:
+                bucket[key] = new_lines
+            else:
+                bucket.pop(key, None)
+            self.counts[quadrant] += len(new_lines) - len(old_lines)
+            self.versions[quadrant] += 1
+        self._notes[key] = (title, mtime, by_quadrant)
+
+    def update_note(self, title, content=None):
+        """Recalcula una nota; si no se pasa el contenido se lee del disco."""
+        path = self.notes_manager._get_note_path(title)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if content is None:
+                with open(path, 'r', encoding="utf-8") as f:
+                    content, _roles = split_note_text(f.read())
+        except (OSError, UnicodeDecodeError):
+            self.remove_note(title)
+            return
+        with self._lock:
+            self._apply(note_key(title), title, mtime, quadrant_lines(content))
+
+    def remove_note(self, title):
+        with self._lock:
+            key = note_key(title)
+            if key in self._notes:
+                self._apply(key, title, None, {})
+                self._notes.pop(key, None)
+
+    def _on_note_event(self, event, title, content=None, old_title=None, **info):
+        if event in ("deleted", "archived"):
+            self.remove_note(title)
+        elif event == "renamed":
+            self.remove_note(old_title)
+            self.update_note(title)
+        else:
+            self.update_note(title, content)
+
+    def sync_with_disk(self):
+        """
+        Detecta notas creadas, modificadas o eliminadas fuera de la aplicación (por mtime)
+        y sólo vuelve a analizar esas.
+        """
+        seen = set()
+        changed = []
+        for title, path in self.notes_manager.iter_notes():
+            key = note_key(title)
+            seen.add(key)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            known = self._notes.get(key)
+            if known is None or known[1] != mtime:
+                changed.append((title, path))
+        with self._lock:
+            removed = [self._notes[key][0] for key in self._notes if key not in seen]
+        for title in removed:
+            self.remove_note(title)
+        for results in map_batches(scan_note_batch, batched(changed, BATCH_SIZE), self.workers,
+                                   min_batches_for_processes=MIN_BATCHES_FOR_PROCESSES):
+            with self._lock:
+                for title, mtime, by_quadrant in results:
+                    self._apply(note_key(title), title, mtime, by_quadrant)
+        return len(changed) + len(removed)
+
+    def entries(self, quadrant):
+        """Líneas de un cuadrante en todo el vault: lista de (titulo, num_linea, texto) ordenada por nota."""
+        with self._lock:
+            bucket = self._quadrants[quadrant]
+            result = []
+            for key in sorted(bucket):
+                title = self._notes[key][0]
+                result.extend((title, line_no, text) for line_no, text in bucket[key])
+            return result
@@ -0,0 +1,238 @@
+# Grafo de enlaces entre notas ([[nota]] y enlaces Markdown relativos) con índice de backlinks.
+# Se persiste como un diario de cambios en .meta/links.jsonl que se compacta de vez en cuando,
+# de modo que cada guardado sólo añade una línea.
+
+import os
+import re
+import json
+import posixpath
+import threading
+from collections import deque
+from urllib.parse import unquote
+from notes_manager import split_note_text, note_key, write_file_atomic
+
+WIKI_LINK_RE = re.compile(r"\[\[([^\[\]|#]+)(?:#[^\[\]|]*)?(?:\|[^\[\]]*)?\]\]")
+MD_LINK_RE = re.compile(r"\[[^\[\]]*\]\(([^()\s]+\.md)(?:#[^()\s]*)?\)", re.IGNORECASE)
+# Cuando el diario tiene más entradas que notas * este factor se reescribe compactado
+COMPACT_FACTOR = 2
+
+
+def extract_links(source_key, content):
+    """
+    Devuelve las claves de las notas enlazadas desde el contenido, sin repetir y en orden de aparición.
+    [[Titulo]] se resuelve desde la raíz del vault; los enlaces Markdown, relativos a la carpeta de la nota.
+    """
+    targets = {}
+    for match in WIKI_LINK_RE.finditer(content):
+        target = match.group(1).strip()
+        if target:
+            targets[note_key(target)] = None
+    base_dir = posixpath.dirname(source_key)
+    for match in MD_LINK_RE.finditer(content):
+        href = unquote(match.group(1))
+        if "://" in href or href.startswith("mailto:"):
+            continue
+        if href.startswith("/"):
+            path = posixpath.normpath(href.lstrip("/"))
+        else:
+            path = posixpath.normpath(posixpath.join(base_dir, href))
+        if path.startswith(".."):
+            continue
+        targets[note_key(path[:-3])] = None
+    targets.pop(source_key, None)
+    return list(targets)
+
+
+class LinkGraph:
+    def __init__(self, notes_manager):
+        self.notes_manager = notes_manager
+        self.path = os.path.join(notes_manager.meta_dir, "links.jsonl")
+        self._lock = threading.RLock()
+        # clave -> (titulo, mtime_ns, [claves enlazadas])
+        self._notes = {}
+        # clave destino -> set(claves origen); incluye destinos que no existen (enlaces rotos)
+        self._backlinks = {}
+        self._journal_entries = 0
+
+    # --- Persistencia ---
+
+    def load(self):
+        """Reconstruye el grafo desde el diario y lo pone al día con los cambios hechos en disco."""
+        with self._lock:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # Línea incompleta
+                        self._journal_entries += 1
+                        if entry.get("deleted"):
+                            self._remove(entry["key"])
+                        else:
+                            self._set(entry["key"], entry["title"], entry["mtime"], entry["links"])
+            self.sync_with_disk()
+            if self._journal_entries > max(len(self._notes), 1) * COMPACT_FACTOR:
+                self.compact()
+
+    def _append(self, entries):
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal_entries += len(entries)
+
+    def compact(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            lines = [
+                json.dumps({"key": key, "title": title, "mtime": mtime, "links": links}, ensure_ascii=False) + "\n"
+                for key, (title, mtime, links) in sorted(self._notes.items())
+            ]
+            write_file_atomic(self.path, "".join(lines))
+            self._journal_entries = len(lines)
+
+    # --- Mantenimiento incremental ---
+
+    def _set(self, key, title, mtime, links):
+        old = self._notes.get(key)
+        if old:
+            for target in old[2]:
+                sources = self._backlinks.get(target)
+                if sources:
+                    sources.discard(key)
+                    if not sources:
+                        del self._backlinks[target]
+        for target in links:
+            self._backlinks.setdefault(target, set()).add(key)
+        self._notes[key] = (title, mtime, links)
+
+    def _remove(self, key):
+        if key in self._notes:
+            self._set(key, None, None, [])
+            del self._notes[key]
+
+    def update_note(self, title, content=None):
+        key = note_key(title)
+        path = self.notes_manager._get_note_path(title)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if content is None:
+                with open(path, 'r', encoding="utf-8") as f:
+                    content, _roles = split_note_text(f.read())
+        except (OSError, UnicodeDecodeError):
+            self.remove_note(title)
+            return
+        links = extract_links(key, content)
+        with self._lock:
+            self._set(key, title, mtime, links)
+            self._append([{"key": key, "title": title, "mtime": mtime, "links": links}])
+
+    def remove_note(self, title):
+        key = note_key(title)
+        with self._lock:
+            if key in self._notes:
+                self._remove(key)
+                self._append([{"key": key, "deleted": True}])
+
+    def sync_with_disk(self):
+        """Vuelve a analizar sólo las notas nuevas o modificadas (por mtime) y olvida las eliminadas."""
+        seen = set()
+        entries = []
+        with self._lock:
+            for title, path in self.notes_manager.iter_notes():
+                key = note_key(title)
+                seen.add(key)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                    known = self._notes.get(key)
+                    if known is not None and known[1] == mtime:
+                        continue
+                    with open(path, 'r', encoding="utf-8") as f:
+                        content, _roles = split_note_text(f.read())
+                except (OSError, UnicodeDecodeError):
+                    continue
+                links = extract_links(key, content)
+                self._set(key, title, mtime, links)
+                entries.append({"key": key, "title": title, "mtime": mtime, "links": links})
+            for key in [k for k in self._notes if k not in seen]:
+                self._remove(key)
+                entries.append({"key": key, "deleted": True})
+            self._append(entries)
+        return len(entries)
+
+    def _on_note_event(self, event, title, content=None, old_title=None, **info):
+        if event in ("deleted", "archived"):
+            self.remove_note(title)
+        elif event == "renamed":
+            self.remove_note(old_title)
+            self.update_note(title)
+        else:
+            self.update_note(title, content)
+
+    def attach(self):
+        self.notes_manager.add_listener(self._on_note_event)
+
+    def detach(self):
+        self.notes_manager.remove_listener(self._on_note_event)
+
+    # --- Consultas ---
+
+    def title_for(self, key):
+        note = self._notes.get(key)
+        return note[0] if note else key.replace('_', ' ')
+
+    def exists(self, title):
+        # Las notas archivadas siguen existiendo: se abren desde el archivo
+        return note_key(title) in self._notes or self.notes_manager.is_archived(title)
+
+    def links(self, title):
+        note = self._notes.get(note_key(title))
+        return [self.title_for(k) for k in note[2]] if note else []
+
+    def backlinks(self, title):
+        with self._lock:
+            sources = self._backlinks.get(note_key(title), ())
+            return sorted(self.title_for(k) for k in sources)
+
+    def orphans(self):
+        """Notas sin enlaces entrantes ni salientes."""
+        with self._lock:
+            return sorted(
+                title for key, (title, _mtime, links) in self._notes.items()
+                if not links and not self._backlinks.get(key)
+            )
+
+    def broken_links(self):
+        """Lista de (nota_origen, destino) cuyo destino no existe."""
+        with self._lock:
+            result = []
+            for target, sources in self._backlinks.items():
+                if target not in self._notes and not self.notes_manager.is_archived(target):
+                    result.extend((self.title_for(source), target.replace('_', ' ')) for source in sources)
+            return sorted(result)
+
+    def neighbourhood(self, title, hops=1):
+        """
+        Notas a como mucho `hops` saltos (en cualquier dirección).
+        Devuelve {titulo: distancia} sin incluir la nota de partida.
+        """
+        start = note_key(title)
+        with self._lock:
+            distances = {start: 0}
+            queue = deque([start])
+            while queue:
+                key = queue.popleft()
+                if distances[key] >= hops:
+                    continue
+                note = self._notes.get(key)
+                neighbours = list(note[2]) if note else []
+                neighbours.extend(self._backlinks.get(key, ()))
+                for other in neighbours:
+                    if other not in distances and other in self._notes:
+                        distances[other] = distances[key] + 1
+                        queue.append(other)
+            del distances[start]
+            return {self.title_for(k): d for k, d in distances.items()}
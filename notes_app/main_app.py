@@ -1,21 +1,48 @@
+import time
+_STARTED_AT = time.perf_counter()
+import argparse
 import tkinter as tk
+from contextlib import nullcontext
 from notes_manager import NotesManager
 from notes_app import NotesApp
-from calendar_app import CalendarApp
+_IMPORTS_DONE_AT = time.perf_counter()
 
 class MainApp:
-    def __init__(self, master):
+    def __init__(self, master, profiler=None):
         self.master = master
         master.title("Gestor de Notas Maestro")
         master.withdraw()  # Oculta la ventana principal, ya que usaremos Toplevels
-        self.notes_manager = NotesManager()  # Instancia única de NotesManager
+        self.profiler = profiler
+        with self._phase("inicialización del gestor"):
+            self.notes_manager = NotesManager()  # Instancia única de NotesManager
+        if profiler:
+            # El calendario se carga bajo demanda; al perfilar se mide aparte
+            with self._phase("carga del calendario"):
+                self.notes_manager.calendar_events
         self.calendar_app_instance = None
+        self.reminders = None
         self.open_notes_window()
+        # Los recordatorios cargan el calendario en segundo plano, después del primer pintado
+        master.after_idle(self._start_reminders)
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def _start_reminders(self):
+        from reminders import ReminderNotifier
+        self.reminders = ReminderNotifier(self.master, self.notes_manager, on_open_note=self._open_note_from_reminder)
+        self.reminders.start()
+
+    def _open_note_from_reminder(self, title):
+        if not (self.notes_app_instance and self.notes_app_instance.master.winfo_exists()):
+            self.open_notes_window()
+        self.notes_app_instance.master.lift()
+        self.notes_app_instance._open_note(title)
 
     def open_notes_window(self):
         notes_root = tk.Toplevel(self.master)
         notes_root.state('zoomed')
-        self.notes_app_instance = NotesApp(notes_root, self.notes_manager)
+        self.notes_app_instance = NotesApp(notes_root, self.notes_manager, profiler=self.profiler)
         self.notes_app_instance.pack(fill="both", expand=True)
         if self.calendar_app_instance:
             self.notes_app_instance.calendar_app_instance = self.calendar_app_instance
@@ -25,6 +52,8 @@ class MainApp:
         if self.calendar_app_instance and self.calendar_app_instance.master.winfo_exists():
             self.calendar_app_instance.master.lift()
         else:
+            # tkcalendar sólo se importa al abrir el calendario
+            from calendar_app import CalendarApp
             calendar_root = tk.Toplevel(self.master)
             self.calendar_app_instance = CalendarApp(calendar_root, self.notes_manager)
             if hasattr(self, 'notes_app_instance') and self.notes_app_instance:
@@ -33,6 +62,7 @@ class MainApp:
 
     def _on_notes_window_close(self):
         if self.notes_app_instance:
+            self.notes_app_instance.save_warm_start()
             self.notes_app_instance.master.destroy()
             self.notes_app_instance = None
         self._check_and_quit()
@@ -47,9 +77,31 @@ class MainApp:
         notes_open = (self.notes_app_instance and self.notes_app_instance.master.winfo_exists())
         calendar_open = (self.calendar_app_instance and self.calendar_app_instance.master.winfo_exists())
         if not (notes_open or calendar_open):
+            if self.reminders:
+                self.reminders.stop()
             self.master.quit()
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gestor de Notas Maestro")
+    parser.add_argument("--startup-profile", action="store_true", help="Mide y muestra las fases del arranque")
+    parser.add_argument("--api-port", type=int, help="Arranca también la API HTTP/JSON local en este puerto")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
+    profiler = None
+    if args.startup_profile:
+        from startup_profile import StartupProfiler
+        profiler = StartupProfiler(started_at=_STARTED_AT)
+        profiler.record("imports", _IMPORTS_DONE_AT - _STARTED_AT)
     root = tk.Tk()
-    app = MainApp(root)
+    app = MainApp(root, profiler=profiler)
+    if args.api_port is not None:
+        # API local sobre el mismo NotesManager que usa la interfaz (ambas usan su bloqueo)
+        from api_server import start_in_thread
+        start_in_thread(app.notes_manager, port=args.api_port)
+    if profiler:
+        with profiler.phase("primer pintado"):
+            root.update_idletasks()
+        root.after_idle(profiler.report)
     root.mainloop()
@@ -0,0 +1,171 @@
+# Archivo en frío de notas inactivas: las notas se sacan de notes_dir y se guardan comprimidas en un
+# único archivo de paquete (.meta/archive/notes-N.pack) con un índice JSON (clave -> posición en el paquete).
+# Siguen pudiendo leerse y buscarse, y vuelven a notes_dir al guardarlas (ver NotesManager).
+#
+# El paquete sólo crece por el final; al sacar notas queda espacio muerto que se recupera reescribiendo
+# el paquete con otro nombre cuando supera al espacio útil. Como el índice nombra el paquete que usa,
+# un lector con un índice antiguo lo detecta y vuelve a cargarlo.
+
+import os
+import json
+import zlib
+from notes_manager import note_key, write_file_atomic
+from vault_lock import FileLock
+
+# Se compacta cuando el espacio muerto supera al útil (y al menos estos bytes)
+MIN_COMPACT_BYTES = 1024 * 1024
+
+
+class NoteArchive:
+    def __init__(self, meta_dir):
+        self.root = os.path.join(meta_dir, "archive")
+        self.index_path = os.path.join(self.root, "index.json")
+        self._index = None
+        self._index_version = None
+
+    # --- Índice ---
+
+    def _empty_index(self):
+        return {"pack": "notes-1.pack", "dead": 0, "notes": {}}
+
+    def _load_index(self):
+        """Carga el índice si cambió en disco (sólo cuesta un stat si no cambió)."""
+        try:
+            st = os.stat(self.index_path)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        if self._index is not None and version == self._index_version:
+            return self._index
+        index = self._empty_index()
+        if version is not None:
+            try:
+                with open(self.index_path, 'r', encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                pass
+        self._index, self._index_version = index, version
+        return index
+
+    def _save_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        write_file_atomic(self.index_path, json.dumps(index, ensure_ascii=False))
+        self._index = index
+        st = os.stat(self.index_path)
+        self._index_version = (st.st_mtime_ns, st.st_size)
+
+    def _lock(self):
+        return FileLock(os.path.join(self.root, "archive.lock"))
+
+    # --- Lectura ---
+
+    def __contains__(self, title):
+        return note_key(title) in self._load_index()["notes"]
+
+    def __len__(self):
+        return len(self._load_index()["notes"])
+
+    def titles(self):
+        return sorted(entry[0] for entry in self._load_index()["notes"].values())
+
+    def entry(self, title):
+        """(titulo, desplazamiento, longitud, mtime_ns) de la nota archivada, o None."""
+        return self._load_index()["notes"].get(note_key(title))
+
+    def _read_entry(self, index, entry):
+        with open(os.path.join(self.root, index["pack"]), 'rb') as f:
+            f.seek(entry[1])
+            data = f.read(entry[2])
+        return zlib.decompress(data).decode("utf-8")
+
+    def read(self, title):
+        """Texto completo de la nota archivada, o None si no está archivada."""
+        for _attempt in range(2):
+            index = self._load_index()
+            entry = index["notes"].get(note_key(title))
+            if entry is None:
+                return None
+            try:
+                return self._read_entry(index, entry)
+            except (OSError, zlib.error):
+                # Otro proceso compactó el paquete: se vuelve a leer el índice
+                self._index_version = None
+        raise OSError(f"No se pudo leer la nota archivada '{title}'.")
+
+    def items(self):
+        """Genera (titulo, texto) de todas las notas archivadas, en el orden del paquete."""
+        index = self._load_index()
+        entries = sorted(index["notes"].values(), key=lambda e: e[1])
+        try:
+            f = open(os.path.join(self.root, index["pack"]), 'rb')
+        except OSError:
+            return
+        with f:
+            for title, offset, length, _mtime in entries:
+                f.seek(offset)
+                try:
+                    yield title, zlib.decompress(f.read(length)).decode("utf-8")
+                except zlib.error:
+                    continue
+
+    # --- Escritura ---
+
+    def add_many(self, notes):
+        """Archiva [(titulo, texto, mtime_ns)]. Una nota ya archivada se reemplaza."""
+        if not notes:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock():
+            self._index_version = None
+            index = self._load_index()
+            pack_path = os.path.join(self.root, index["pack"])
+            with open(pack_path, 'ab') as f:
+                offset = f.tell()
+                for title, text, mtime in notes:
+                    data = zlib.compress(text.encode("utf-8"), 6)
+                    f.write(data)
+                    old = index["notes"].get(note_key(title))
+                    if old is not None:
+                        index["dead"] += old[2]
+                    index["notes"][note_key(title)] = [title, offset, len(data), mtime]
+                    offset += len(data)
+                f.flush()
+                os.fsync(f.fileno())
+            # El índice se escribe después del paquete: si algo falla, como mucho quedan bytes sin usar
+            self._save_index(index)
+
+    def remove(self, title):
+        """Saca la nota del archivo (no toca notes_dir). Devuelve True si estaba archivada."""
+        if not os.path.exists(self.index_path):
+            return False
+        with self._lock():
+            self._index_version = None
+            index = self._load_index()
+            entry = index["notes"].pop(note_key(title), None)
+            if entry is None:
+                return False
+            index["dead"] += entry[2]
+            live = sum(e[2] for e in index["notes"].values())
+            old_pack = None
+            if index["dead"] > max(live, MIN_COMPACT_BYTES):
+                old_pack = os.path.join(self.root, index["pack"])
+                index = self._compact(index)
+            self._save_index(index)
+            # El paquete anterior se borra después de guardar el índice que apunta al nuevo
+            if old_pack is not None:
+                os.remove(old_pack)
+        return True
+
+    def _compact(self, index):
+        old_pack = os.path.join(self.root, index["pack"])
+        number = int(index["pack"].split("-")[1].split(".")[0]) + 1
+        new_name = f"notes-{number}.pack"
+        new_index = {"pack": new_name, "dead": 0, "notes": {}}
+        with open(old_pack, 'rb') as src, open(os.path.join(self.root, new_name), 'wb') as dst:
+            for key, (title, offset, length, mtime) in sorted(index["notes"].items(), key=lambda item: item[1][1]):
+                src.seek(offset)
+                new_index["notes"][key] = [title, dst.tell(), length, mtime]
+                dst.write(src.read(length))
+            dst.flush()
+            os.fsync(dst.fileno())
+        return new_index
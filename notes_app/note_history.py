@@ -0,0 +1,206 @@
+# Historial de versiones de las notas, en .meta/history/:
+#   objects/ab/abcdef...   contenido direccionado por su sha1 (un mismo texto se guarda una sola vez).
+#                          Cada objeto es el texto completo o un delta por líneas respecto a otro objeto,
+#                          opcionalmente comprimido con zlib.
+#   log/<md5>.jsonl        versiones de cada nota, de la más antigua a la más reciente.
+# El archivo .md sigue siendo la copia viva de la nota: leer la última versión no pasa por el historial.
+
+import os
+import json
+import time
+import zlib
+import difflib
+import hashlib
+import tempfile
+from notes_manager import note_key
+
+# Cada MAX_DELTA_DEPTH versiones se guarda el texto completo, para acotar lo que hay que leer al restaurar
+MAX_DELTA_DEPTH = 50
+# Los textos pequeños se guardan sin comprimir (zlib no compensa)
+MIN_COMPRESS_BYTES = 256
+_RAW = b"r"
+_ZLIB = b"z"
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def make_delta(base_text, text):
+    """
+    Delta por líneas: lista de [inicio, fin] (copiar esas líneas del texto base) y cadenas (texto nuevo).
+    """
+    base_lines = base_text.splitlines(True)
+    lines = text.splitlines(True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(lines[j1:j2]))
+    return ops
+
+
+def apply_delta(base_text, ops):
+    base_lines = base_text.splitlines(True)
+    return "".join("".join(base_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+class NoteHistory:
+    def __init__(self, meta_dir, compress=True):
+        self.root = os.path.join(meta_dir, "history")
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.log_dir = os.path.join(self.root, "log")
+        self.compress = compress
+
+    # --- Objetos ---
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _write_object(self, digest, payload):
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if self.compress and len(data) >= MIN_COMPRESS_BYTES:
+            data = _ZLIB + zlib.compress(data)
+        else:
+            data = _RAW + data
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_object(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            data = f.read()
+        if data[:1] == _ZLIB:
+            data = zlib.decompress(data[1:])
+        else:
+            data = data[1:]
+        return json.loads(data.decode("utf-8"))
+
+    def read(self, digest):
+        """Texto completo de una versión (reconstruye la cadena de deltas desde el último texto completo)."""
+        chain = []
+        payload = self._read_object(digest)
+        while "base" in payload:
+            chain.append(payload["ops"])
+            payload = self._read_object(payload["base"])
+        text = payload["text"]
+        for ops in reversed(chain):
+            text = apply_delta(text, ops)
+        return text
+
+    def _store(self, text, base=None):
+        """
+        Guarda text (como delta respecto a base=(hash, texto, profundidad) si compensa).
+        Devuelve (hash, profundidad de la cadena de deltas).
+        """
+        digest = content_hash(text)
+        if os.path.exists(self._object_path(digest)):
+            return digest, self._read_object(digest).get("depth", 0)
+        if base is not None and base[2] < MAX_DELTA_DEPTH and base[0] != digest:
+            ops = make_delta(base[1], text)
+            literal = sum(len(op) for op in ops if isinstance(op, str))
+            # Si casi todo el texto es nuevo, el delta no ahorra nada
+            if literal < len(text) * 0.8:
+                self._write_object(digest, {"base": base[0], "depth": base[2] + 1, "ops": ops})
+                return digest, base[2] + 1
+        self._write_object(digest, {"text": text})
+        return digest, 0
+
+    # --- Registro por nota ---
+
+    def _log_path(self, title):
+        name = hashlib.md5(note_key(title).encode("utf-8")).hexdigest()
+        return os.path.join(self.log_dir, f"{name}.jsonl")
+
+    def versions(self, title):
+        """Versiones de la nota, de la más reciente a la más antigua: dicts con hash, time, size y title."""
+        path = self._log_path(title)
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, 'r', encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # Línea incompleta
+        entries.reverse()
+        return entries
+
+    def _head(self, title):
+        path = self._log_path(title)
+        if not os.path.exists(path):
+            return None
+        # Sólo hace falta la última línea
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 4096, 0))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+        return None
+
+    def _append(self, title, digest, depth, text):
+        os.makedirs(self.log_dir, exist_ok=True)
+        entry = {"hash": digest, "time": time.time(), "size": len(text), "depth": depth, "title": title}
+        with open(self._log_path(title), 'a', encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def record(self, title, text, previous=None):
+        """
+        Añade text como nueva versión de la nota. previous es el contenido que había en disco antes de
+        guardar: si no coincide con la última versión registrada (nota nueva en el historial o modificada
+        fuera de la aplicación) se registra antes, para poder volver a él.
+        Debe llamarse con el bloqueo de la nota tomado. Devuelve el hash de la versión.
+        """
+        head = self._head(title)
+        base = None
+        if head is not None and previous is None:
+            base = (head["hash"], self.read(head["hash"]), head.get("depth", 0))
+        elif previous is not None:
+            previous_hash = content_hash(previous)
+            if head is not None and head["hash"] == previous_hash:
+                base = (previous_hash, previous, head.get("depth", 0))
+            elif previous:
+                digest, depth = self._store(previous)
+                self._append(title, digest, depth, previous)
+                base = (digest, previous, depth)
+        if base is not None and base[0] == content_hash(text):
+            return base[0]
+        digest, depth = self._store(text, base)
+        self._append(title, digest, depth, text)
+        return digest
+
+    def rename(self, old_title, new_title):
+        """Mueve el historial al nuevo título (se añade al historial que ya tuviera el destino)."""
+        old_path = self._log_path(old_title)
+        new_path = self._log_path(new_title)
+        if old_path == new_path or not os.path.exists(old_path):
+            return
+        if not os.path.exists(new_path):
+            os.replace(old_path, new_path)
+            return
+        with open(old_path, 'r', encoding="utf-8") as src, open(new_path, 'a', encoding="utf-8") as dst:
+            dst.write(src.read())
+        os.remove(old_path)
+
+    def diff(self, digest_a, digest_b, from_label=None, to_label=None):
+        """Diferencias entre dos versiones en formato unified diff (lista de líneas)."""
+        a = self.read(digest_a).splitlines(True)
+        b = self.read(digest_b).splitlines(True)
+        return list(difflib.unified_diff(a, b, from_label or digest_a[:10], to_label or digest_b[:10]))
@@ -0,0 +1,149 @@
+# Identidad estable de las notas (.meta/notes.json): cada nota recibe un id que no cambia al renombrarla.
+# La tabla id -> (título, ruta relativa) se resuelve en memoria en los dos sentidos (por id y por clave de
+# título/ruta). El título se guarda tal como se escribió ('TLP notes'), que el nombre del archivo
+# ('tlp_notes.md') no conserva.
+
+import os
+import json
+import uuid
+import threading
+from notes_manager import note_key, write_file_atomic
+from vault_lock import FileLock
+
+
+def note_relpath(title):
+    """Ruta del archivo de la nota relativa a notes_dir, con '/' como separador."""
+    return note_key(title) + ".md"
+
+
+class NoteIdMap:
+    def __init__(self, meta_dir):
+        self.meta_dir = meta_dir
+        self.path = os.path.join(meta_dir, "notes.json")
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._ids_by_key = {}
+        self._version = None
+        self._loaded = False
+        # Si ya se dieron ids a las notas anteriores a la tabla (ver backfill)
+        self._backfilled = False
+
+    def _load(self):
+        """Carga la tabla si cambió en disco (sólo cuesta un stat si no cambió)."""
+        try:
+            st = os.stat(self.path)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        if self._loaded and version == self._version:
+            return self._entries
+        entries = {}
+        backfilled = False
+        if version is not None:
+            try:
+                with open(self.path, 'r', encoding="utf-8") as f:
+                    data = json.load(f)
+                entries = data.get("notes", {})
+                backfilled = bool(data.get("backfilled"))
+            except (OSError, ValueError, AttributeError):
+                pass
+        self._entries, self._version, self._loaded = entries, version, True
+        self._backfilled = backfilled
+        self._ids_by_key = {entry[1][:-3]: note_id for note_id, entry in entries.items()}
+        return entries
+
+    def _modify(self, change):
+        """Aplica change(entries) sobre la última versión en disco y la guarda. Devuelve lo que devuelva change."""
+        os.makedirs(self.meta_dir, exist_ok=True)
+        with self._lock, FileLock(os.path.join(self.meta_dir, "notes.lock")):
+            self._loaded = False
+            entries = self._load()
+            result = change(entries)
+            data = {"notes": entries, "backfilled": self._backfilled}
+            write_file_atomic(self.path, json.dumps(data, ensure_ascii=False))
+            self._loaded = False
+            self._load()
+        return result
+
+    # --- Consulta ---
+
+    def id_for(self, title):
+        with self._lock:
+            self._load()
+            return self._ids_by_key.get(note_key(title))
+
+    def title_for(self, note_id):
+        with self._lock:
+            entry = self._load().get(note_id)
+            return entry[0] if entry else None
+
+    def path_for(self, note_id):
+        with self._lock:
+            entry = self._load().get(note_id)
+            return entry[1] if entry else None
+
+    def titles_by_key(self):
+        """{clave de nota: título tal como se escribió} de todas las notas con id."""
+        with self._lock:
+            entries = self._load()
+            return {key: entries[note_id][0] for key, note_id in self._ids_by_key.items()}
+
+    # --- Cambios ---
+
+    def assign(self, titles):
+        """
+        Da id a los títulos que aún no lo tienen (una sola escritura). Devuelve {título: id}.
+        Un título cuya clave ya tiene id conserva ese id y el título con que se registró.
+        """
+        with self._lock:
+            self._load()
+            if any(note_key(title) not in self._ids_by_key for title in titles):
+                def add(entries):
+                    known = {entry[1][:-3] for entry in entries.values()}
+                    for title in titles:
+                        key = note_key(title)
+                        if key not in known:
+                            entries[uuid.uuid4().hex] = [title, note_relpath(title)]
+                            known.add(key)
+                self._modify(add)
+            return {title: self._ids_by_key[note_key(title)] for title in titles}
+
+    def needs_backfill(self):
+        with self._lock:
+            self._load()
+            return not self._backfilled
+
+    def backfill(self, titles):
+        """Da id (una sola escritura) a las notas que existían antes de la tabla y marca el vault como migrado."""
+        def add(entries):
+            known = {entry[1][:-3] for entry in entries.values()}
+            for title in titles:
+                key = note_key(title)
+                if key not in known:
+                    entries[uuid.uuid4().hex] = [title, note_relpath(title)]
+                    known.add(key)
+            self._backfilled = True
+        self._modify(add)
+
+    def rename(self, old_title, new_title):
+        """Pasa el id de old_title a new_title (si old_title no tenía id se le da uno). Devuelve el id."""
+        def change(entries):
+            keys = {entry[1][:-3]: note_id for note_id, entry in entries.items()}
+            note_id = keys.get(note_key(old_title)) or uuid.uuid4().hex
+            replaced = keys.get(note_key(new_title))
+            if replaced is not None and replaced != note_id:
+                entries.pop(replaced)
+            entries[note_id] = [new_title, note_relpath(new_title)]
+            return note_id
+        return self._modify(change)
+
+    def remove(self, title):
+        with self._lock:
+            if self.id_for(title) is None:
+                return
+            key = note_key(title)
+
+            def change(entries):
+                for note_id in [i for i, entry in entries.items() if entry[1][:-3] == key]:
+                    del entries[note_id]
+            self._modify(change)
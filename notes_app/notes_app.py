@@ -1,6 +1,10 @@
+import queue
+import threading
+import time
 import tkinter as tk
+from contextlib import nullcontext
 from notes_manager import NotesManagerCloudMixin
-from tkinter import ttk, scrolledtext, messagebox, simpledialog, Toplevel
+from tkinter import ttk, scrolledtext, messagebox, simpledialog, filedialog, Toplevel
 
 class NotesApp(ttk.Frame):
 	def _upload_selected_note_to_drive(self):
@@ -39,6 +43,326 @@ class NotesApp(ttk.Frame):
 			messagebox.showinfo("Éxito", f"Nota '{title}' descargada de Drive.")
 		btn = ttk.Button(win, text="Descargar y abrir", command=on_select)
 		btn.pack(pady=5)
+	def _show_links(self):
+		if not self.selected_note:
+			messagebox.showinfo("Enlaces", "Seleccione una nota para ver sus enlaces.")
+			return
+		graph = self.notes_manager.link_graph
+		win = Toplevel(self)
+		win.title(f"Enlaces de '{self.selected_note}'")
+		win.geometry("420x420")
+		columns = (
+			("Enlaces entrantes", graph.backlinks(self.selected_note)),
+			("Enlaces salientes", graph.links(self.selected_note)),
+		)
+		for label, titles in columns:
+			frame = ttk.LabelFrame(win, text=f"{label} ({len(titles)})")
+			frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+			lb = tk.Listbox(frame, height=8)
+			lb.pack(fill=tk.BOTH, expand=True)
+			for title in titles:
+				lb.insert(tk.END, title if graph.exists(title) else f"{title} (no existe)")
+			def on_open(event, lb=lb, titles=titles):
+				idx = lb.curselection()
+				if idx and graph.exists(titles[idx[0]]):
+					self._open_note(titles[idx[0]])
+			lb.bind("<Double-Button-1>", on_open)
+
+	def _show_history(self):
+		if not self.selected_note:
+			messagebox.showinfo("Historial", "Seleccione una nota para ver su historial.")
+			return
+		title = self.selected_note
+		versions = self.notes_manager.list_note_versions(title)
+		if not versions:
+			messagebox.showinfo("Historial", f"La nota '{title}' no tiene versiones anteriores.")
+			return
+		win = Toplevel(self)
+		win.title(f"Historial de '{title}'")
+		win.geometry("760x520")
+		lb = tk.Listbox(win, height=10)
+		lb.pack(fill=tk.X, padx=10, pady=(10, 5))
+		for version in versions:
+			when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(version["time"]))
+			lb.insert(tk.END, f"{when}  ·  {version['size']} caracteres  ·  {version['hash'][:10]}")
+		diff_area = scrolledtext.ScrolledText(win, height=18, wrap=tk.NONE, font=("Menlo", 11))
+		diff_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+		diff_area.tag_configure("added", foreground="#34C759")
+		diff_area.tag_configure("removed", foreground="#FF3B30")
+		diff_area.tag_configure("hunk", foreground="#8E8E93")
+		def show_diff(event=None):
+			# Cambios de la versión seleccionada respecto a la anterior
+			idx = lb.curselection()
+			if not idx:
+				return
+			i = idx[0]
+			diff_area.delete("1.0", tk.END)
+			if i + 1 < len(versions):
+				lines = self.notes_manager.diff_note_versions(versions[i + 1]["hash"], versions[i]["hash"])
+			else:
+				lines = ["+" + line for line in self.notes_manager.get_note_version_text(versions[i]["hash"]).splitlines(True)]
+			for line in lines:
+				tag = "added" if line.startswith("+") else "removed" if line.startswith("-") else "hunk" if line.startswith("@@") else None
+				diff_area.insert(tk.END, line if line.endswith("\n") else line + "\n", tag)
+		def restore():
+			idx = lb.curselection()
+			if not idx:
+				messagebox.showinfo("Historial", "Seleccione una versión para restaurar.", parent=win)
+				return
+			if not messagebox.askyesno("Restaurar", "¿Restaurar esta versión? El contenido actual quedará en el historial.", parent=win):
+				return
+			ok, msg = self.notes_manager.restore_note_version(title, versions[idx[0]]["hash"])
+			if ok:
+				win.destroy()
+				self._open_note(title)
+			else:
+				messagebox.showerror("Error", msg, parent=win)
+		lb.bind("<<ListboxSelect>>", show_diff)
+		ttk.Button(win, text="Restaurar esta versión", command=restore).pack(pady=(0, 10))
+
+	def _open_archive(self):
+		win = Toplevel(self)
+		win.title("Archivo de notas")
+		win.geometry("420x460")
+		options = ttk.Frame(win)
+		options.pack(fill=tk.X, padx=10, pady=(10, 5))
+		ttk.Label(options, text="Sin modificar desde hace (días):").grid(row=0, column=0, sticky="w")
+		days_var = tk.StringVar(value="365")
+		ttk.Spinbox(options, from_=0, to=36500, width=7, textvariable=days_var).grid(row=0, column=1, padx=5)
+		eliminar_var = tk.BooleanVar(value=False)
+		ttk.Checkbutton(options, text="Sólo con líneas ELIMINAR (cualquier antigüedad)", variable=eliminar_var).grid(row=1, column=0, columnspan=2, sticky="w", pady=4)
+		frame = ttk.LabelFrame(win, text="Notas archivadas")
+		frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+		lb = tk.Listbox(frame)
+		lb.pack(fill=tk.BOTH, expand=True)
+		def refresh():
+			lb.delete(0, tk.END)
+			for title in self.notes_manager.list_archived_notes():
+				lb.insert(tk.END, title)
+			frame.config(text=f"Notas archivadas ({lb.size()})")
+		def on_open(event=None):
+			# Se abre desde el archivo; al guardarla vuelve a la carpeta de notas
+			idx = lb.curselection()
+			if idx:
+				self._open_note(lb.get(idx[0]))
+		def run():
+			if eliminar_var.get():
+				days = None
+			else:
+				try:
+					days = int(days_var.get())
+				except ValueError:
+					messagebox.showerror("Error", "Número de días inválido.", parent=win)
+					return
+			def on_done(result):
+				ok, msg, _count = result
+				self._refresh_notes_list()
+				if win.winfo_exists():
+					refresh()
+				if ok:
+					messagebox.showinfo("Archivar", msg)
+				else:
+					messagebox.showerror("Error", msg)
+			self._run_with_progress("Archivando notas",
+				lambda progress, cancel_event: self.notes_manager.archive_notes(days, only_eliminar=eliminar_var.get(), progress=progress, cancel_event=cancel_event),
+				on_done)
+		lb.bind("<Double-Button-1>", on_open)
+		ttk.Button(options, text="Archivar", command=run).grid(row=0, column=2, rowspan=2, padx=5)
+		refresh()
+
+	def _open_quick_open(self, event=None):
+		if self._title_index is None:
+			from title_index import TitleIndex
+			self._title_index = TitleIndex(self.notes_manager)
+			self._title_index.attach()
+			index_task = self._title_index.build
+		else:
+			index_task = self._title_index.sync_with_disk
+		win = Toplevel(self)
+		win.title("Abrir nota")
+		win.transient(self.parent)
+		win.geometry(f"520x360+{self.parent.winfo_rootx() + 80}+{self.parent.winfo_rooty() + 60}")
+		query_var = tk.StringVar()
+		entry = ttk.Entry(win, textvariable=query_var, font=("San Francisco", 14))
+		entry.pack(fill=tk.X, padx=10, pady=(10, 5))
+		status_var = tk.StringVar(value="Indexando títulos…")
+		ttk.Label(win, textvariable=status_var, foreground="#8E8E93").pack(anchor="w", padx=12)
+		lb = tk.Listbox(win, font=("San Francisco", 13), activestyle="none")
+		lb.pack(fill=tk.BOTH, expand=True, padx=10, pady=(5, 10))
+		results = []
+		def update(*_):
+			if not win.winfo_exists():
+				return
+			results[:] = self._title_index.search(query_var.get(), limit=50) if query_var.get().strip() else []
+			lb.delete(0, tk.END)
+			for title in results:
+				lb.insert(tk.END, title)
+			if results:
+				lb.selection_set(0)
+				lb.activate(0)
+		def move(step):
+			if not results:
+				return "break"
+			current = lb.curselection()
+			i = min(max((current[0] if current else -1) + step, 0), len(results) - 1)
+			lb.selection_clear(0, tk.END)
+			lb.selection_set(i)
+			lb.activate(i)
+			lb.see(i)
+			return "break"
+		def choose(event=None):
+			current = lb.curselection()
+			if current:
+				title = results[current[0]]
+				win.destroy()
+				self._open_note(title)
+			return "break"
+		def indexed(_result):
+			if win.winfo_exists():
+				status_var.set(f"{len(self._title_index)} notas")
+				update()
+		query_var.trace_add("write", update)
+		entry.bind("<Down>", lambda e: move(1))
+		entry.bind("<Up>", lambda e: move(-1))
+		entry.bind("<Return>", choose)
+		lb.bind("<Double-Button-1>", choose)
+		win.bind("<Escape>", lambda e: win.destroy())
+		entry.focus_set()
+		self._run_in_background(index_task, indexed)
+		return "break"
+
+	def _rename_note(self):
+		if not self.selected_note:
+			messagebox.showinfo("Renombrar Nota", "Seleccione una nota para renombrar.")
+			return
+		new_title = simpledialog.askstring("Renombrar Nota", "Nuevo título:", initialvalue=self.selected_note)
+		if not new_title or new_title == self.selected_note:
+			return
+		ok, msg = self.notes_manager.rename_note(self.selected_note, new_title)
+		if ok:
+			self.selected_note = new_title
+			self._refresh_notes_list()
+		else:
+			messagebox.showerror("Error", msg)
+
+	def _open_dashboard(self):
+		if getattr(self, '_dashboard', None) and self._dashboard.winfo_exists():
+			self._dashboard.parent.lift()
+			return
+		from eisenhower_dashboard import EisenhowerDashboard
+		win = Toplevel(self)
+		win.geometry("1000x650")
+		self._dashboard = EisenhowerDashboard(win, self.notes_manager, on_open_line=self._open_note_at_line)
+		self._dashboard.pack(fill="both", expand=True)
+
+	def _open_note_at_line(self, note_title, line_no):
+		self._open_note(note_title, line_no)
+		self.parent.lift()
+
+	def _export_vault(self):
+		out_dir = filedialog.askdirectory(title="Carpeta de exportación", mustexist=False)
+		if not out_dir:
+			return
+		self.export_button.config(state="disabled")
+		from notes_exporter import NotesExporter
+		exporter = NotesExporter(self.notes_manager)
+		def on_done(result):
+			self.export_button.config(state="normal")
+			ok, msg = result
+			if ok:
+				messagebox.showinfo("Exportar", msg)
+			else:
+				messagebox.showerror("Error", msg)
+		self._run_in_background(lambda: exporter.export(out_dir), on_done,
+			on_error=lambda _e: self.export_button.config(state="normal"))
+
+	def _import_notes(self):
+		from_folder = messagebox.askyesnocancel("Importar notas", "¿Importar una carpeta?\n(No: importar un archivo .zip)")
+		if from_folder is None:
+			return
+		if from_folder:
+			source = filedialog.askdirectory(title="Carpeta con notas Markdown")
+		else:
+			source = filedialog.askopenfilename(title="Archivo .zip con notas", filetypes=[("Zip", "*.zip")])
+		if not source:
+			return
+		from notes_importer import NotesImporter
+		importer = NotesImporter(self.notes_manager)
+		def on_done(result):
+			ok, msg, _report = result
+			self._refresh_notes_list()
+			if ok:
+				messagebox.showinfo("Importar", msg)
+			else:
+				messagebox.showerror("Error", msg)
+		self._run_with_progress("Importando notas",
+			lambda progress, cancel_event: importer.import_path(source, progress=progress, cancel_event=cancel_event),
+			on_done, on_error=lambda _e: self._refresh_notes_list())
+
+	def _run_with_progress(self, title, task, on_done, on_error=None):
+		# Como _run_in_background, pero con barra de progreso y botón para cancelar.
+		# task recibe progress(hechos, total) y un threading.Event de cancelación
+		progress_win = Toplevel(self)
+		progress_win.title(title)
+		progress_win.transient(self)
+		status_var = tk.StringVar(value="Preparando…")
+		ttk.Label(progress_win, textvariable=status_var).pack(padx=12, pady=(12, 4))
+		progress_bar = ttk.Progressbar(progress_win, length=280, mode="determinate")
+		progress_bar.pack(padx=12, pady=(0, 8))
+		cancel_event = threading.Event()
+		ttk.Button(progress_win, text="Cancelar", command=cancel_event.set).pack(pady=(0, 10))
+		updates = queue.Queue()
+		def report_progress(done, total):
+			updates.put((done, total))
+		def show_progress():
+			if not progress_win.winfo_exists():
+				return
+			try:
+				while True:
+					done, total = updates.get_nowait()
+					progress_bar["maximum"] = max(total, 1)
+					progress_bar["value"] = done
+					status_var.set(f"{done}/{total}")
+			except queue.Empty:
+				pass
+			progress_win.after(100, show_progress)
+		def finished(result):
+			if progress_win.winfo_exists():
+				progress_win.destroy()
+			on_done(result)
+		def failed(error):
+			if progress_win.winfo_exists():
+				progress_win.destroy()
+			if on_error:
+				on_error(error)
+		show_progress()
+		self._run_in_background(lambda: task(report_progress, cancel_event), finished, failed)
+
+	def _run_in_background(self, task, on_done, on_error=None):
+		# Ejecuta task en un hilo y entrega el resultado a on_done en el hilo de Tk.
+		# Si task lanza una excepción se muestra el error tras llamar a on_error(excepción), p. ej. para
+		# reactivar los botones que se desactivaron al empezar
+		results = queue.Queue()
+		def worker():
+			try:
+				results.put((True, task()))
+			except Exception as e:
+				results.put((False, e))
+		def poll():
+			try:
+				finished, value = results.get_nowait()
+			except queue.Empty:
+				self.after(100, poll)
+				return
+			if finished:
+				on_done(value)
+			else:
+				if on_error:
+					on_error(value)
+				messagebox.showerror("Error", str(value))
+		threading.Thread(target=worker, daemon=True).start()
+		poll()
+
 	def _filter_by_role(self, role):
 		if not self.selected_note:
 			messagebox.showinfo("Filtrar por Rol", "Seleccione una nota para filtrar.")
@@ -63,7 +387,7 @@ class NotesApp(ttk.Frame):
 		if content:
 			self._show_note_with_highlight_filter(content, "type", tipo, color_all=False)
 
-	def __init__(self, parent, notes_manager, *args, **kwargs):
+	def __init__(self, parent, notes_manager, *args, profiler=None, **kwargs):
 		super().__init__(parent, *args, **kwargs)
 		# Si notes_manager no tiene mixin, lo extendemos
 		if not hasattr(notes_manager, 'upload_note_to_drive'):
@@ -73,8 +397,30 @@ class NotesApp(ttk.Frame):
 		self.parent = parent
 		self.selected_note = None
 		self.role_colors = {}  # Ahora se cargan por nota
-		self._build_ui()
-		self._refresh_notes_list()
+		self._title_index = None  # Índice de títulos para Ctrl+P (se crea al usarlo por primera vez)
+		phase = profiler.phase if profiler else (lambda name: nullcontext())
+		with phase("instantánea de arranque"):
+			from warm_start import WarmStart
+			self._warm_start = WarmStart(notes_manager)
+			snapshot = self._warm_start.load()
+		with phase("construcción de la ventana"):
+			self._build_ui()
+		with phase("primer listado de notas"):
+			if "notes" in snapshot:
+				self._fill_notes_list(snapshot["notes"])
+			else:
+				self._refresh_notes_list()
+		with phase("última nota abierta"):
+			if "note" in snapshot:
+				self._paint_snapshot_note(snapshot["note"])
+			elif snapshot.get("last_title") and self.notes_manager.get_note_version(snapshot["last_title"]) is not None:
+				self._open_note(snapshot["last_title"])
+		if "notes" in snapshot:
+			# La lista salió de la instantánea: se comprueba contra el disco cuando la ventana ya está pintada
+			self.after_idle(self._reconcile_notes_list)
+		# Búsqueda rápida de notas por título; en el área de texto Ctrl+P movería el cursor
+		self.parent.bind("<Control-p>", self._open_quick_open)
+		self.text_area.bind("<Control-p>", self._open_quick_open)
 
 	def _build_ui(self):
 		# Inicializar modo
@@ -109,12 +455,32 @@ class NotesApp(ttk.Frame):
 		self.save_button.pack(side=tk.LEFT, padx=4)
 		self.delete_button = ttk.Button(self.action_buttons_frame, text="🗑", width=3, command=self._delete_note, style="TButton")
 		self.delete_button.pack(side=tk.LEFT, padx=4)
+		self.rename_button = ttk.Button(self.action_buttons_frame, text="✎", width=3, command=self._rename_note, style="TButton")
+		self.rename_button.pack(side=tk.LEFT, padx=4)
 		# Botón para cargar nota desde Drive
 		self.download_drive_button = ttk.Button(self.action_buttons_frame, text="⤓", width=5, command=self._list_and_download_drive_note, style="TButton")
 		self.download_drive_button.pack(side=tk.LEFT, padx=2)
 		# Botón para subir nota seleccionada a Drive
 		self.upload_drive_button = ttk.Button(self.action_buttons_frame, text="⤒", width=5, command=self._upload_selected_note_to_drive, style="TButton")
 		self.upload_drive_button.pack(side=tk.LEFT, padx=2)
+		# Botón para exportar todo el vault (NDJSON, HTML y matriz de Eisenhower)
+		self.export_button = ttk.Button(self.action_buttons_frame, text="⇪", width=3, command=self._export_vault, style="TButton")
+		self.export_button.pack(side=tk.LEFT, padx=4)
+		# Botón para importar una carpeta o un .zip de notas Markdown
+		self.import_button = ttk.Button(self.action_buttons_frame, text="⇩", width=3, command=self._import_notes, style="TButton")
+		self.import_button.pack(side=tk.LEFT, padx=4)
+		# Botón para la matriz de Eisenhower de todo el vault
+		self.dashboard_button = ttk.Button(self.action_buttons_frame, text="▦", width=3, command=self._open_dashboard, style="TButton")
+		self.dashboard_button.pack(side=tk.LEFT, padx=4)
+		# Botón para ver los enlaces y backlinks de la nota seleccionada
+		self.links_button = ttk.Button(self.action_buttons_frame, text="🔗", width=3, command=self._show_links, style="TButton")
+		self.links_button.pack(side=tk.LEFT, padx=4)
+		# Botón para ver y restaurar versiones anteriores de la nota
+		self.history_button = ttk.Button(self.action_buttons_frame, text="🕘", width=3, command=self._show_history, style="TButton")
+		self.history_button.pack(side=tk.LEFT, padx=4)
+		# Botón para archivar notas inactivas y ver las archivadas
+		self.archive_button = ttk.Button(self.action_buttons_frame, text="🗄", width=3, command=self._open_archive, style="TButton")
+		self.archive_button.pack(side=tk.LEFT, padx=4)
 		
 
 		# Frame para colorear todo por...
@@ -320,10 +686,37 @@ class NotesApp(ttk.Frame):
 
 
 	def _refresh_notes_list(self):
+		self._fill_notes_list(self.notes_manager.list_notes())
+
+	def _fill_notes_list(self, notes):
+		# Una sola llamada a Tk para toda la lista
+		self._listed_notes = list(notes)
 		self.notes_listbox.delete(0, tk.END)
-		notes = self.notes_manager.list_notes()
-		for note in notes:
-			self.notes_listbox.insert(tk.END, note)
+		if self._listed_notes:
+			self.notes_listbox.insert(tk.END, *self._listed_notes)
+
+	def _reconcile_notes_list(self):
+		def on_done(notes):
+			if notes != self._listed_notes:
+				self._fill_notes_list(notes)
+		self._run_in_background(self.notes_manager.list_notes, on_done)
+
+	def _paint_snapshot_note(self, note):
+		# Pinta la última nota abierta desde la instantánea, con las etiquetas de línea ya calculadas
+		self.selected_note = note["title"]
+		self._note_version = note["mtime"]
+		self.role_colors = dict(note["roles"])
+		self._refresh_roles_buttons()
+		self._refresh_color_tags()
+		self._show_note_with_highlight(note["content"], note.get("tags"))
+		self.text_area.edit_modified(False)
+
+	def save_warm_start(self):
+		"""Guarda la instantánea de arranque (lista de notas y nota abierta); se llama al cerrar la ventana."""
+		try:
+			self._warm_start.save(self.selected_note, self._get_line_tag)
+		except OSError:
+			pass  # Sin instantánea el próximo arranque es en frío, nada más
 
 	def _on_note_selected(self, event=None):
 		selection = self.notes_listbox.curselection()
@@ -331,30 +724,45 @@ class NotesApp(ttk.Frame):
 			return
 		idx = selection[0]
 		note_title = self.notes_listbox.get(idx)
+		self._open_note(note_title)
+
+	def _open_note(self, note_title, line_no=None):
 		self.selected_note = note_title
+		# Versión en disco al abrirla, para detectar al guardar cambios hechos por otro proceso
+		self._note_version = self.notes_manager.get_note_version(note_title)
 		content, roles, msg = self.notes_manager.get_note_content(note_title)
 		if roles is not None:
 			self.role_colors = roles.copy()
 		else:
-			# Si no hay roles en la nota, usar algunos por defecto
-			self.role_colors = {
-				"Programador": "#007AFF", "Social": "#34C759", "Tesista": "#AF52DE", "General": "#FF9500",
-				"Asistente": "#FF2D55", "Work-out": "#FFCC00", "Estudiante": "#5AC8FA", "Trabajo": "#5856D6",
-				"Diseñador": "#FF375F", "TLP": "#FF9F0A", "Ropa/Accesorios": "#FFD60A", "Cuidado": "#FFEE97"
-			}
+			# Si no hay roles en la nota, usar los del registro del vault
+			self.role_colors = self.notes_manager.default_role_colors()
 		if content is not None:
 			self._show_note_with_highlight(content)
+			# A partir de aquí cualquier cambio en el área de texto está sin guardar
+			self.text_area.edit_modified(False)
 		self._refresh_roles_buttons()
 		self._refresh_color_tags()
+		if content is not None and line_no:
+			# Lleva el cursor a la línea pedida y la resalta
+			self.text_area.tag_remove("goto_line", 1.0, tk.END)
+			self.text_area.tag_add("goto_line", f"{line_no}.0", f"{line_no}.end")
+			self.text_area.tag_config("goto_line", background="#FFF3B0")
+			self.text_area.mark_set(tk.INSERT, f"{line_no}.0")
+			self.text_area.see(f"{line_no}.0")
+			self.text_area.focus_set()
+
+	def _has_unsaved_changes(self):
+		return bool(self.selected_note) and bool(self.text_area.edit_modified())
 
-	def _show_note_with_highlight(self, content):
+	def _show_note_with_highlight(self, content, tags=None):
 		self.text_area.config(state="normal")
 		self.text_area.delete(1.0, tk.END)
 		lines = content.split("\n")
-		for i, line in enumerate(lines):
+		if tags is None or len(tags) != len(lines):
+			tags = [self._get_line_tag(line) for line in lines]
+		for i, (line, tag) in enumerate(zip(lines, tags)):
 			start = f"{i+1}.0"
 			end = f"{i+1}.end"
-			tag = self._get_line_tag(line)
 			self.text_area.insert(tk.END, line + "\n")
 			if tag:
 				self.text_area.tag_add(tag, start, end)
@@ -362,9 +770,9 @@ class NotesApp(ttk.Frame):
 				self.text_area.tag_add("default", start, end)
 		self.text_area.config(state="normal")
 
-	def _get_line_tag(self, line):
+	def _get_line_tag(self, line, roles=None):
 		# Detecta el tag principal de la línea
-		for role in self.role_colors:
+		for role in (self.role_colors if roles is None else roles):
 			if f"[{role}]" in line:
 				return f"role_{role}"
 		for key in self.eisenhower_colors:
@@ -453,8 +861,15 @@ class NotesApp(ttk.Frame):
 			messagebox.showinfo("Guardar Nota", "Seleccione una nota para guardar.")
 			return
 		content = self.text_area.get(1.0, tk.END)
-		ok, msg = self.notes_manager.save_note_content(self.selected_note, content, roles=self.role_colors)
+		ok, msg = self.notes_manager.save_note_content(self.selected_note, content, roles=self.role_colors,
+			expected_version=getattr(self, '_note_version', None))
+		if not ok and self.notes_manager.get_note_version(self.selected_note) != getattr(self, '_note_version', None):
+			if not messagebox.askyesno("Conflicto", f"{msg}\n¿Sobrescribir con su versión?"):
+				return
+			ok, msg = self.notes_manager.save_note_content(self.selected_note, content, roles=self.role_colors)
 		if ok:
+			self._note_version = self.notes_manager.get_note_version(self.selected_note)
+			self.text_area.edit_modified(False)
 			messagebox.showinfo("Éxito", msg)
 			self._refresh_notes_list()         # Refresca la lista de notas
 			self._refresh_roles_buttons()      # Refresca botones de roles
@@ -478,16 +893,14 @@ class NotesApp(ttk.Frame):
 			return
 		confirm = messagebox.askyesno("Confirmar", f"¿Está seguro de eliminar la nota '{self.selected_note}'?")
 		if confirm:
-			note_path = self.notes_manager._get_note_path(self.selected_note)
-			try:
-				import os
-				os.remove(note_path)
+			ok, msg = self.notes_manager.delete_note(self.selected_note)
+			if ok:
 				self._refresh_notes_list()
 				self.text_area.delete(1.0, tk.END)
 				self.selected_note = None
-				messagebox.showinfo("Éxito", "Nota eliminada.")
-			except Exception as e:
-				messagebox.showerror("Error", f"No se pudo eliminar la nota: {e}")
+				messagebox.showinfo("Éxito", msg)
+			else:
+				messagebox.showerror("Error", msg)
 
 	def _refresh_roles_buttons(self):
 		# Elimina todos los botones actuales de roles
@@ -661,8 +1074,77 @@ class NotesApp(ttk.Frame):
 		tk.Button(btns_frame, text="Editar", command=edit_role, bg=bg_panel, fg=text_main).pack(side=tk.LEFT, padx=4)
 		tk.Button(btns_frame, text="Eliminar", command=delete_role, bg=bg_panel, fg=text_main).pack(side=tk.LEFT, padx=4)
 
+		def apply_to_all_notes():
+			idx = roles_listbox.curselection()
+			if not idx:
+				messagebox.showinfo("Error", "Seleccione un rol para aplicar en todas las notas.", parent=win)
+				return
+			old_name = roles_listbox.get(idx[0])
+			new_name = name_var.get().strip() or old_name
+			# Sólo se cambia el color si el usuario eligió otro (al seleccionar el rol se muestra el actual)
+			new_color = color_var.get().strip() or None
+			if new_color == self.role_colors.get(old_name):
+				new_color = None
+			if new_name == old_name and new_color is None:
+				messagebox.showinfo("Roles", "Cambie el nombre o el color del rol para aplicarlo en todas las notas.", parent=win)
+				return
+			self._bulk_role_operation(win, old_name, new_name, new_color)
+		tk.Button(btns_frame, text="En todas las notas…", command=apply_to_all_notes, bg=bg_panel, fg=text_main).pack(side=tk.LEFT, padx=4)
+
         # Guardar referencia para actualizar tema si cambia
 		self._roles_win = win
+
+	def _bulk_role_operation(self, win, old_name, new_name, new_color):
+		# Renombra, fusiona o cambia el color de un rol en todo el vault (trailer y prefijos [Rol])
+		from role_bulk_editor import RoleBulkEditor
+		editor = RoleBulkEditor(self.notes_manager)
+		if new_name == old_name:
+			operation = lambda **kw: editor.recolor(old_name, new_color, **kw)
+			description = f"Cambiar el color de '{old_name}' a {new_color}"
+		elif self.notes_manager.role_registry.id_for(new_name) is not None:
+			operation = lambda **kw: editor.merge([old_name], new_name, color=new_color, **kw)
+			description = f"Fusionar '{old_name}' en '{new_name}'"
+		else:
+			operation = lambda **kw: editor.rename(old_name, new_name, color=new_color, **kw)
+			description = f"Renombrar '{old_name}' a '{new_name}'"
+		if self._has_unsaved_changes():
+			# La operación reescribe las notas en disco: la abierta se guarda antes para no perder lo editado
+			answer = messagebox.askyesnocancel(
+				"Cambios sin guardar", f"La nota '{self.selected_note}' tiene cambios sin guardar.\n¿Guardarlos antes de continuar?", parent=win)
+			if answer is None:
+				return
+			if answer:
+				self._save_note()
+				if self._has_unsaved_changes():
+					return
+
+		def run(dry_run):
+			return lambda progress, cancel_event: operation(dry_run=dry_run, progress=progress, cancel_event=cancel_event)
+
+		def confirm(report):
+			if report.cancelled:
+				return
+			if not report.changed:
+				messagebox.showinfo("Roles", report.summary(), parent=win)
+				return
+			details = "\n".join(report.details(limit=15))
+			if messagebox.askyesno("Confirmar", f"{description}.\n\n{report.summary()}\n\n{details}\n\n¿Aplicar los cambios?", parent=win):
+				self._run_with_progress("Roles en todas las notas", run(False), finish)
+
+		def finish(report):
+			messagebox.showinfo("Roles", report.summary(), parent=win if win.winfo_exists() else self)
+			if self.selected_note and not self._has_unsaved_changes():
+				# Recarga la nota abierta, que puede haber cambiado en disco (si se editó entretanto no se
+				# toca: al guardarla se avisará del conflicto)
+				self._open_note(self.selected_note)
+			if win.winfo_exists():
+				win.destroy()
+
+		# Primero un ensayo sin escritura para mostrar lo que cambiaría (la ventana de roles suelta el foco
+		# exclusivo para que el botón Cancelar del progreso responda)
+		win.grab_release()
+		self._run_with_progress("Roles en todas las notas", run(True), confirm)
+
 	def _update_roles_win_theme(self):
 			if not hasattr(self, '_roles_win') or not self._roles_win.winfo_exists():
 				return
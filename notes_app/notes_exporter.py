@@ -0,0 +1,207 @@
+# Exportación del vault a NDJSON, HTML estático e informe de la matriz de Eisenhower.
+# Se recorre el vault una sola vez y cada salida se escribe en streaming, nota a nota.
+
+import os
+import json
+import html
+import shutil
+import tempfile
+from datetime import datetime
+from batch_executor import batched, map_batches
+from notes_manager import (
+    split_note_text, classify_line, classification_fields, eisenhower_quadrant, EISENHOWER_CATEGORIES
+)
+
+EISENHOWER_COLORS = {
+    "HACER_AHORA": "#FF3B30", "PLANIFICAR": "#FF9F0A", "DELEGAR": "#5856D6", "ELIMINAR": "#8E8E93"
+}
+EISENHOWER_LABELS = {
+    "HACER_AHORA": "Hacer Ahora", "PLANIFICAR": "Planificar", "DELEGAR": "Delegar", "ELIMINAR": "Eliminar"
+}
+EXPORT_FORMATS = ("ndjson", "html", "matrix")
+
+# Notas por tarea enviada a cada proceso y tareas en vuelo (acota la memoria)
+BATCH_SIZE = 64
+MAX_PENDING_BATCHES = 8
+# Por debajo de este número de notas no compensa arrancar procesos
+MIN_NOTES_FOR_PROCESSES = 4096
+
+
+def parse_note_file(title, path, registry_roles=None):
+    """
+    Lee y clasifica una nota. Devuelve (titulo, roles, registros) donde cada registro es un dict
+    con la línea clasificada. Las líneas vacías se omiten.
+    Las líneas se clasifican con los roles del registro del vault (registry_roles) más los de la nota, como
+    en el resto de la aplicación, y el cuadrante no depende de que los roles estén declarados.
+    """
+    with open(path, 'r', encoding="utf-8") as f:
+        content, roles = split_note_text(f.read())
+    known_roles = {**(registry_roles or {}), **(roles or {})}
+    records = []
+    for line_no, line in enumerate(content.split("\n"), 1):
+        text = line.strip()
+        if not text:
+            continue
+        line_roles, _eisenhower, task_type = classification_fields(classify_line(text, known_roles))
+        eisenhower = eisenhower_quadrant(text)
+        records.append({
+            "note": title,
+            "line": line_no,
+            "text": text,
+            "roles": line_roles,
+            "eisenhower": eisenhower,
+            "task_type": task_type,
+        })
+    return title, roles or {}, records
+
+
+def parse_note_batch(args):
+    registry_roles, batch = args
+    results = []
+    for title, path in batch:
+        try:
+            results.append(parse_note_file(title, path, registry_roles))
+        except (OSError, UnicodeDecodeError):
+            continue
+    return results
+
+
+class NotesExporter:
+    def __init__(self, notes_manager, workers=None):
+        self.notes_manager = notes_manager
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def iter_parsed_notes(self):
+        """
+        Genera (titulo, roles, registros) para cada nota, en el orden del vault.
+        Con varios workers el análisis se reparte entre procesos, manteniendo acotado el número de lotes en vuelo.
+        """
+        registry_roles = self.notes_manager.role_registry.colors()
+        batches = ((registry_roles, batch) for batch in batched(self.notes_manager.iter_notes(), BATCH_SIZE))
+        for results in map_batches(parse_note_batch, batches, self.workers,
+                                   MAX_PENDING_BATCHES, MIN_NOTES_FOR_PROCESSES // BATCH_SIZE):
+            for title, roles, records in results:
+                # Los roles sin color propio toman el del registro del vault
+                if None in roles.values():
+                    roles = self.notes_manager.role_registry.resolve(roles)
+                yield title, roles, records
+
+    def iter_records(self):
+        for _title, _roles, records in self.iter_parsed_notes():
+            yield from records
+
+    def export(self, out_dir, formats=EXPORT_FORMATS, progress=None):
+        """
+        Exporta el vault a out_dir en los formatos pedidos, en una única pasada.
+        progress(notas_procesadas) se llama tras cada nota. Devuelve (ok, mensaje).
+        """
+        unknown = [f for f in formats if f not in EXPORT_FORMATS]
+        if unknown:
+            return False, f"Formato de exportación desconocido: {', '.join(unknown)}"
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            writers = []
+            if "ndjson" in formats:
+                writers.append(NdjsonWriter(os.path.join(out_dir, "notes.ndjson")))
+            if "html" in formats:
+                writers.append(HtmlWriter(os.path.join(out_dir, "notes.html")))
+            if "matrix" in formats:
+                writers.append(MatrixWriter(os.path.join(out_dir, "eisenhower.md")))
+            count = 0
+            try:
+                for title, roles, records in self.iter_parsed_notes():
+                    for writer in writers:
+                        writer.write_note(title, roles, records)
+                    count += 1
+                    if progress:
+                        progress(count)
+            finally:
+                for writer in writers:
+                    writer.close()
+            return True, f"{count} notas exportadas a '{out_dir}'."
+        except Exception as e:
+            return False, f"Error al exportar: {e}"
+
+
+class NdjsonWriter:
+    """Un objeto JSON por línea clasificada."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding="utf-8")
+
+    def write_note(self, title, roles, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False))
+            self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+class HtmlWriter:
+    """Página HTML estática con las notas coloreadas por rol y por cuadrante."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding="utf-8")
+        styles = "".join(
+            f".q-{key}{{border-left:4px solid {color};padding-left:6px}}"
+            for key, color in EISENHOWER_COLORS.items()
+        )
+        self.file.write(
+            "<!DOCTYPE html>\n<html lang=\"es\"><head><meta charset=\"utf-8\">"
+            "<title>Notas</title><style>"
+            "body{font-family:-apple-system,'San Francisco',sans-serif;background:#F5F5F7;color:#1C1C1E;margin:2em}"
+            "section{background:#fff;border-radius:8px;padding:1em 1.5em;margin-bottom:1em}"
+            "p{margin:.2em 0;white-space:pre-wrap}.tag{font-size:.8em;color:#636366;margin-left:.5em}"
+            f"{styles}</style></head><body>\n<h1>Notas</h1>\n"
+        )
+
+    def write_note(self, title, roles, records):
+        out = [f"<section><h2>{html.escape(title)}</h2>\n"]
+        for record in records:
+            quadrant = record["eisenhower"]
+            css_class = f" class=\"q-{quadrant}\"" if quadrant else ""
+            color = next((roles[r] for r in record["roles"] if r in roles), None)
+            style = f" style=\"color:{html.escape(color)}\"" if color else ""
+            tags = [EISENHOWER_LABELS[quadrant]] if quadrant else []
+            if record["task_type"]:
+                tags.append(record["task_type"])
+            tag_html = f"<span class=\"tag\">{html.escape(' · '.join(tags))}</span>" if tags else ""
+            out.append(f"<p{css_class}{style}>{html.escape(record['text'])}{tag_html}</p>\n")
+        out.append("</section>\n")
+        self.file.write("".join(out))
+
+    def close(self):
+        self.file.write(f"<footer>Exportado el {datetime.now():%Y-%m-%d %H:%M}</footer>\n</body></html>\n")
+        self.file.close()
+
+
+class MatrixWriter:
+    """
+    Informe en Markdown con los cuatro cuadrantes.
+    Las líneas de cada cuadrante se vuelcan a temporales y se concatenan al cerrar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.spills = {key: tempfile.TemporaryFile('w+', encoding="utf-8") for key in EISENHOWER_CATEGORIES}
+        self.counts = dict.fromkeys(EISENHOWER_CATEGORIES, 0)
+
+    def write_note(self, title, roles, records):
+        for record in records:
+            quadrant = record["eisenhower"]
+            if quadrant:
+                self.spills[quadrant].write(f"- {record['text']} — *{title}* (línea {record['line']})\n")
+                self.counts[quadrant] += 1
+
+    def close(self):
+        with open(self.path, 'w', encoding="utf-8") as f:
+            f.write("# Matriz de Eisenhower\n\n| Cuadrante | Líneas |\n|---|---|\n")
+            for key, description in EISENHOWER_CATEGORIES.items():
+                f.write(f"| {EISENHOWER_LABELS[key]} ({description}) | {self.counts[key]} |\n")
+            for key, description in EISENHOWER_CATEGORIES.items():
+                spill = self.spills[key]
+                f.write(f"\n## {EISENHOWER_LABELS[key]} — {description}\n\n")
+                spill.seek(0)
+                shutil.copyfileobj(spill, f)
+                spill.close()
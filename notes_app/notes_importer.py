@@ -0,0 +1,228 @@
+# Importación masiva de colecciones Markdown externas (carpeta o archivo .zip).
+# Los archivos se analizan en paralelo y las notas se escriben por lotes junto con un
+# diario de importación que permite reanudar una importación interrumpida.
+
+import os
+import json
+import posixpath
+import hashlib
+import zipfile
+from batch_executor import batched, map_batches
+from notes_manager import split_note_text, compose_note_text, split_role_prefixes, write_file_atomic
+
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+BATCH_SIZE = 200
+MAX_PENDING_BATCHES = 4
+MIN_FILES_FOR_PROCESSES = 2000
+
+
+def title_for_member(member):
+    """
+    Título de nota para una ruta relativa del origen ('Carpeta/Mi nota.md' -> 'Carpeta/Mi nota').
+    Lanza ValueError si la ruta es absoluta o sale del origen ('../x.md'), para no escribir fuera del vault.
+    """
+    member = member.replace("\\", "/")
+    path = posixpath.normpath(member)
+    if member.startswith("/") or ":" in path.split("/")[0] or path == "." or ".." in path.split("/"):
+        raise ValueError(f"Ruta no válida en el origen: '{member}'.")
+    base, _ext = posixpath.splitext(path)
+    return base
+
+
+def infer_roles(content):
+    """Roles usados como prefijo [Rol] en las líneas, en orden de aparición."""
+    found = {}
+    for line in content.split("\n"):
+        roles, _rest = split_role_prefixes(line)
+        for role in roles:
+            found.setdefault(role, None)
+    return list(found)
+
+
+def prepare_note_text(raw_text):
+    """
+    Devuelve el texto final de la nota importada: conserva la sección de roles si existe
+    y añade los roles inferidos de los prefijos que no estén declarados.
+    """
+    content, roles = split_note_text(raw_text)
+    inferred = infer_roles(content)
+    if roles is None and not inferred:
+        return raw_text, 0
+    roles = dict(roles or {})
+    added = 0
+    for role in inferred:
+        if role not in roles:
+            # Sin color propio: se usa el del registro del vault (o uno derivado del nombre si no está registrado)
+            roles[role] = None
+            added += 1
+    return compose_note_text(content, roles), added
+
+
+def read_source_batch(args):
+    """Lee y prepara un lote de archivos del origen. Se ejecuta en los procesos de trabajo."""
+    source, is_zip, members = args
+    results = []
+    archive = zipfile.ZipFile(source) if is_zip else None
+    try:
+        for member in members:
+            try:
+                title = title_for_member(member)
+                if archive is not None:
+                    raw = archive.read(member)
+                else:
+                    with open(os.path.join(source, member), 'rb') as f:
+                        raw = f.read()
+                text = raw.decode("utf-8-sig").replace("\r\n", "\n")
+                note_text, added = prepare_note_text(text)
+                results.append((member, title, note_text, added, None))
+            except (OSError, UnicodeDecodeError, KeyError, ValueError, zipfile.BadZipFile) as e:
+                results.append((member, None, None, 0, str(e)))
+    finally:
+        if archive is not None:
+            archive.close()
+    return results
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.resumed = 0
+        self.existing = 0
+        self.roles_inferred = 0
+        self.errors = []
+        self.cancelled = False
+
+    def summary(self):
+        text = f"{self.imported} notas importadas"
+        if self.resumed:
+            text += f", {self.resumed} ya importadas previamente"
+        if self.existing:
+            text += f", {self.existing} omitidas por existir"
+        if self.roles_inferred:
+            text += f", {self.roles_inferred} roles inferidos"
+        text += "."
+        if self.errors:
+            text += f" {len(self.errors)} archivos con errores."
+        if self.cancelled:
+            text += " Importación interrumpida (se puede reanudar)."
+        return text
+
+
+class NotesImporter:
+    def __init__(self, notes_manager, workers=None):
+        self.notes_manager = notes_manager
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def _journal_path(self, source):
+        key = hashlib.md5(os.path.abspath(source).encode("utf-8")).hexdigest()
+        return os.path.join(self.notes_manager.meta_dir, "imports", f"{key}.jsonl")
+
+    def _load_journal(self, journal_path):
+        done = set()
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line)["source"])
+                    except (ValueError, KeyError):
+                        continue  # Última línea a medio escribir
+        return done
+
+    def _list_members(self, source, is_zip):
+        if is_zip:
+            with zipfile.ZipFile(source) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and info.filename.lower().endswith(MARKDOWN_EXTENSIONS):
+                        yield info.filename
+            return
+        for root, dirs, files in os.walk(source):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for f in sorted(files):
+                if f.lower().endswith(MARKDOWN_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, f), source).replace(os.sep, "/")
+
+    def import_path(self, source, overwrite=False, progress=None, cancel_event=None):
+        """
+        Importa una carpeta o un .zip con notas Markdown.
+        progress(procesados, total) informa del avance; cancel_event detiene la importación al final del lote actual.
+        Devuelve (ok, mensaje, ImportReport).
+        """
+        report = ImportReport()
+        is_zip = os.path.isfile(source) and zipfile.is_zipfile(source)
+        if not is_zip and not os.path.isdir(source):
+            return False, f"Error: '{source}' no es una carpeta ni un archivo .zip.", report
+        journal_path = self._journal_path(source)
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        done = self._load_journal(journal_path)
+        members = list(self._list_members(source, is_zip))
+        report.resumed = sum(1 for m in members if m in done)
+        pending = [m for m in members if m not in done]
+        total = len(members)
+        processed = report.resumed
+        batches = ((source, is_zip, batch) for batch in batched(pending, BATCH_SIZE))
+        try:
+            with open(journal_path, 'a', encoding="utf-8") as journal:
+                for results in map_batches(read_source_batch, batches, self.workers,
+                                           MAX_PENDING_BATCHES, MIN_FILES_FOR_PROCESSES // BATCH_SIZE):
+                    entries = self._write_batch(results, overwrite, report)
+                    # El diario se actualiza después de escribir las notas del lote
+                    journal.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                    processed += len(results)
+                    if progress:
+                        progress(processed, total)
+                    if cancel_event is not None and cancel_event.is_set():
+                        report.cancelled = True
+                        break
+        except Exception as e:
+            return False, f"Error al importar: {e}", report
+        return True, report.summary(), report
+
+    def _write_batch(self, results, overwrite, report):
+        manager = self.notes_manager
+        entries = []
+        created, overwritten = [], []
+        for member, title, note_text, added, error in results:
+            if error is not None:
+                report.errors.append((member, error))
+                continue
+            try:
+                note_path = manager._get_note_path(title, create_dirs=True)
+            except ValueError as e:
+                report.errors.append((member, str(e)))
+                continue
+            if manager.is_archived(title):
+                # No se crea una copia viva junto a la archivada: se omite o, si se sobrescribe, se recupera antes
+                if not overwrite:
+                    report.existing += 1
+                    continue
+                manager._rehydrate(title)
+            with manager._note_lock(title):
+                if os.path.exists(note_path):
+                    with open(note_path, 'r', encoding="utf-8") as f:
+                        previous = f.read()
+                    if previous != note_text:
+                        if not overwrite:
+                            report.existing += 1
+                            continue
+                        # El contenido anterior queda en el historial, como al guardar
+                        if manager.keep_history:
+                            manager.history.record(title, note_text, previous)
+                        write_file_atomic(note_path, note_text)
+                        overwritten.append((title, note_text))
+                else:
+                    write_file_atomic(note_path, note_text)
+                    created.append(title)
+            report.imported += 1
+            report.roles_inferred += added
+            entries.append({"source": member, "note": title})
+        # Los títulos importados se conservan tal cual (mayúsculas, espacios) en la tabla de ids
+        manager.register_notes(entry["note"] for entry in entries)
+        # Los índices ya cargados (enlaces, títulos, Eisenhower, uso de roles) se enteran como de cualquier alta
+        for title in created:
+            manager._notify("created", title)
+        for title, note_text in overwritten:
+            content, roles = split_note_text(note_text)
+            manager._notify("saved", title, content=content, roles=roles)
+        return entries
@@ -1,83 +1,790 @@
 import os
+import re
 import json
-import hashlib
-from datetime import datetime
-from google_drive_helper import GoogleDriveHelper
+import stat
+import logging
+import time
+import tempfile
+import functools
+import threading
+from contextlib import ExitStack
+from vault_lock import FileLock, note_lock
+from calendar_event import CalendarEvent, DayStats, parse_day, parse_start, day_to_date, event_id
+
+ROLES_MARKER = "\n---ROLES---\n"
+# Notas que se archivan por cada escritura del paquete
+ARCHIVE_BATCH_SIZE = 200
+# Rutas de notas que se recuerdan (título -> ruta) antes de vaciar la caché
+MAX_CACHED_PATHS = 100000
+# umask del proceso (sólo se puede leer cambiándola), para dar a los archivos nuevos los permisos habituales
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+logger = logging.getLogger(__name__)
+
+EISENHOWER_CATEGORIES = {
+    "HACER_AHORA": "Urgente e Importante",
+    "PLANIFICAR": "Importante, no Urgente",
+    "DELEGAR": "Urgente, no Importante",
+    "ELIMINAR": "No Urgente, no Importante"
+}
+EISENHOWER_ABBREVIATIONS = {
+    "HA": "HACER_AHORA",
+    "P": "PLANIFICAR",
+    "D": "DELEGAR",
+    "E": "ELIMINAR"
+}
+EISENHOWER_PREFIXES_MAP = {f"[E:{k}]": v for k, v in EISENHOWER_ABBREVIATIONS.items()}
+TASK_TYPES = {
+    "IDEA": "Idea",
+    "PROYECTO": "Proyecto",
+    "TAREA": "Tarea"
+}
+TASK_TYPE_PREFIXES_MAP = {f"[T:{k}]": v for k, v in TASK_TYPES.items()}
+
+# Roles por defecto para notas sin sección de roles
+DEFAULT_ROLE_COLORS = {
+    "Programador": "#007AFF", "Social": "#34C759", "Tesista": "#AF52DE", "General": "#FF9500",
+    "Asistente": "#FF2D55", "Work-out": "#FFCC00", "Estudiante": "#5AC8FA", "Trabajo": "#5856D6",
+    "Diseñador": "#FF375F", "TLP": "#FF9F0A", "Ropa/Accesorios": "#FFD60A", "Cuidado": "#FFEE97"
+}
+
+# Prefijos al inicio de la línea: [Rol], [E:HA], [T:TAREA]... (no confundir con enlaces [texto](url))
+_LEADING_TAG_RE = re.compile(r"\s*\[([^\[\]]+)\](?!\()")
+
+
+def note_key(title):
+    """
+    Clave normalizada de una nota (ruta relativa sin extensión): 'Carpeta/Mi Nota' -> 'carpeta/mi_nota'.
+    Dos títulos con la misma clave apuntan al mismo archivo.
+    """
+    return "/".join(p.replace(' ', '_').lower() for p in title.split('/'))
+
+
+def split_note_text(full_content):
+    """
+    Separa el contenido de la nota de su sección de roles.
+    Devuelve (contenido, roles_dict); roles_dict es None si la nota no tiene sección de roles.
+    Los roles escritos sin color ('Nombre') usan el del registro del vault y quedan con color None.
+    """
+    if ROLES_MARKER not in full_content:
+        return full_content, None
+    content, roles_section = full_content.split(ROLES_MARKER, 1)
+    roles_dict = {}
+    for line in roles_section.strip().splitlines():
+        if ':' in line:
+            role, color = line.split(':', 1)
+            roles_dict[role.strip()] = color.strip()
+        elif line.strip():
+            roles_dict[line.strip()] = None
+    return content, roles_dict
+
+
+def compose_note_text(content, roles=None):
+    """
+    Construye el texto completo de la nota (contenido + sección de roles).
+    Los roles con color None se escriben sólo con el nombre (toman el color del registro).
+    """
+    parts = [content.rstrip("\n"), "\n\n---ROLES---\n"]
+    if roles is not None:
+        for role, color in roles.items():
+            parts.append(f"{role}:{color}\n" if color else f"{role}\n")
+    return "".join(parts)
+
+
+def classify_line(line_text, roles=None):
+    """
+    Clasifica la línea usando los roles dados (por nota).
+    Devuelve una lista de tuplas (tipo, nombre); [("general_text", None)] si la línea no tiene prefijos.
+    """
+    original_line = line_text.strip()
+    remaining_line = original_line
+    classifications = []
+    found_role = True
+    valid_roles = list(roles.keys()) if roles else []
+    while found_role:
+        found_role = False
+        for r in valid_roles:
+            role_prefix = f"[{r}]"
+            if remaining_line.startswith(role_prefix):
+                classifications.append(("role", r))
+                remaining_line = remaining_line[len(role_prefix):].strip()
+                found_role = True
+                break
+    for prefix, key in EISENHOWER_PREFIXES_MAP.items():
+        if remaining_line.startswith(prefix):
+            classifications.append(("eisenhower", key))
+            remaining_line = remaining_line[len(prefix):].strip()
+            break
+    for prefix, key in TASK_TYPE_PREFIXES_MAP.items():
+        if remaining_line.startswith(prefix):
+            classifications.append(("task_type", key))
+            remaining_line = remaining_line[len(prefix):].strip()
+            break
+    if not classifications and original_line:
+        return [("general_text", None)]
+    return classifications
+
+
+def classification_fields(classifications):
+    """
+    Resume una clasificación en (roles, eisenhower, task_type).
+    """
+    roles = []
+    eisenhower = task_type = None
+    for kind, name in classifications:
+        if kind == "role":
+            roles.append(name)
+        elif kind == "eisenhower":
+            eisenhower = name
+        elif kind == "task_type":
+            task_type = name
+    return roles, eisenhower, task_type
+
+
+def iter_leading_tags(line_text):
+    """
+    Recorre los prefijos [..] del inicio de la línea.
+    Genera tuplas (inicio, fin, nombre) con las posiciones de cada prefijo dentro de line_text.
+    """
+    pos = 0
+    while True:
+        match = _LEADING_TAG_RE.match(line_text, pos)
+        if not match:
+            return
+        yield match.start(), match.end(), match.group(1)
+        pos = match.end()
+
+
+def split_role_prefixes(line_text):
+    """
+    Devuelve (roles, resto) con los prefijos [Rol] del inicio de la línea,
+    sin necesidad de conocer los roles de la nota. Los prefijos [E:..] y [T:..] no son roles, ni lo son
+    las casillas '[x]', las notas al pie '[^1]' ni las definiciones de referencias '[ref]: url'.
+    """
+    roles = []
+    rest_start = 0
+    for _start, end, name in iter_leading_tags(line_text):
+        if name.startswith(("E:", "T:", "^")) or len(name.strip()) <= 1 or line_text.startswith(":", end):
+            break
+        roles.append(name)
+        rest_start = end
+    return roles, line_text[rest_start:].strip()
+
+
+def eisenhower_quadrant(line_text):
+    """
+    Cuadrante de Eisenhower de la línea (o None), sin depender de los roles declarados en la nota.
+    """
+    _roles, rest = split_role_prefixes(line_text)
+    if rest.startswith("[E:"):
+        for prefix, key in EISENHOWER_PREFIXES_MAP.items():
+            if rest.startswith(prefix):
+                return key
+    return None
+
+
+def merge_calendar_events(base, ours, theirs):
+    """
+    Fusión a tres bandas de listas de eventos (dicts con 'id').
+    base: eventos al cargar; ours: estado en memoria; theirs: estado actual en disco.
+    Un cambio de un solo lado se conserva; si ambos lados modifican el mismo evento se fusiona
+    campo a campo (prevalece el nuestro en el mismo campo), y una modificación gana a un borrado.
+    """
+    base_by_id = {e['id']: e for e in base}
+    ours_by_id = {e['id']: e for e in ours}
+    theirs_by_id = {e['id']: e for e in theirs}
+    order = [e['id'] for e in theirs] + [e['id'] for e in ours if e['id'] not in theirs_by_id]
+    merged = []
+    for event_id in order:
+        b = base_by_id.get(event_id)
+        o = ours_by_id.get(event_id)
+        t = theirs_by_id.get(event_id)
+        if o == b:
+            result = t
+        elif t == b:
+            result = o
+        elif o is None or t is None:
+            result = o if o is not None else t
+        else:
+            result = dict(t)
+            for field, value in o.items():
+                if b is None or b.get(field) != value:
+                    result[field] = value
+        if result is not None:
+            merged.append(result)
+    return merged
+
+
+def is_only_eliminar(content):
+    """True si todas las líneas con texto (sin contar los encabezados '#') son del cuadrante ELIMINAR."""
+    found = False
+    for line in content.split("\n"):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if eisenhower_quadrant(stripped) != "ELIMINAR":
+            return False
+        found = True
+    return found
+
+
+def _event_start(event):
+    return event.start
+
+
+def _parse_duration(value):
+    """Duración en minutos como entero positivo, o None si no es válida."""
+    try:
+        minutes = int(value)
+    except (TypeError, ValueError):
+        return None
+    return minutes if minutes > 0 else None
+
+
+def synchronized(method):
+    """Ejecuta el método con el bloqueo del gestor (self.lock)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def file_mode(path):
+    """Permisos para reescribir path: los que ya tiene o, si es nuevo, los de open() con la umask actual."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def write_file_atomic(path, text):
+    """
+    Escribe el archivo de forma atómica: primero en un temporal del mismo directorio y luego lo reemplaza.
+    El archivo conserva sus permisos (mkstemp crea el temporal sólo legible por el dueño).
+    """
+    dir_path = os.path.dirname(path) or "."
+    mode = file_mode(path)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=".tmp-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 class NotesManager:
     def __init__(self, notes_dir="notes", calendar_file="calendar_events.json"):
         self.notes_dir = notes_dir
         os.makedirs(self.notes_dir, exist_ok=True)
+        # Índices y datos internos del vault (no son notas)
+        self.meta_dir = os.path.join(self.notes_dir, ".meta")
         self.calendar_file = calendar_file
 
-    # Los roles son por nota, no globales
-        self.eisenhower_categories = {
-            "HACER_AHORA": "Urgente e Importante",
-            "PLANIFICAR": "Importante, no Urgente",
-            "DELEGAR": "Urgente, no Importante",
-            "ELIMINAR": "No Urgente, no Importante"
-        }
-        self.eisenhower_abbreviations = {
-            "HA": "HACER_AHORA",
-            "P": "PLANIFICAR",
-            "D": "DELEGAR",
-            "E": "ELIMINAR"
-        }
-        self.eisenhower_prefixes_map = {f"[E:{k}]": v for k, v in self.eisenhower_abbreviations.items()}
-        self.task_types = {
-            "IDEA": "Idea",
-            "PROYECTO": "Proyecto",
-            "TAREA": "Tarea"
-        }
-        self.task_type_prefixes_map = {f"[T:{k}]": v for k, v in self.task_types.items()}
-        self.calendar_events = self._load_calendar_events()
-
-    def _get_note_path(self, title):
-        parts = [p.replace(' ', '_').lower() for p in title.split('/')]
-        if len(parts) > 1:
-            dir_path = os.path.join(self.notes_dir, *parts[:-1])
-            os.makedirs(dir_path, exist_ok=True)
-        else:
-            dir_path = self.notes_dir
-        return os.path.join(dir_path, f"{parts[-1]}.md")
+    # Cada nota declara sus roles; los colores por defecto están en el registro del vault (role_registry)
+        self.eisenhower_categories = dict(EISENHOWER_CATEGORIES)
+        self.eisenhower_abbreviations = dict(EISENHOWER_ABBREVIATIONS)
+        self.eisenhower_prefixes_map = dict(EISENHOWER_PREFIXES_MAP)
+        self.task_types = dict(TASK_TYPES)
+        self.task_type_prefixes_map = dict(TASK_TYPE_PREFIXES_MAP)
+        # La interfaz, la API y los hilos en segundo plano comparten el gestor: las operaciones que cambian
+        # notas o leen y cambian el calendario en memoria (y los avisos que generan) toman este bloqueo
+        self.lock = threading.RLock()
+        self._listeners = []
+        self._calendar_listeners = []
+        self._link_graph = None
+        # Historial de versiones: se registra cada guardado (ver note_history)
+        self.keep_history = True
+        self._history = None
+        self._archive = None
+        self._role_registry = None
+        # Ids estables de las notas (ver note_ids) y rutas ya calculadas por título
+        self._note_ids = None
+        self._note_paths = {}
+        # El calendario se carga la primera vez que se usa
+        self._calendar_events = None
+        self._events_by_id = {}
+        self._events_by_day = {}
+        self._month_stats = {}
+        self._calendar_unparsed = []
+        # Aumenta con cada cambio del calendario en memoria (las vistas lo usan para saber si repintar)
+        self.calendar_revision = 0
+        # Versión (mtime, tamaño) del archivo cuando se leyó y copia de los eventos en ese momento,
+        # para detectar y fusionar cambios hechos por otros procesos
+        self._calendar_version = None
+        self._calendar_base = []
+        self._backfill_note_ids()
+
+    def _backfill_note_ids(self):
+        """
+        Da id, una sola vez por vault, a las notas anteriores a la tabla de ids, con el título que mostraba
+        la lista de notas ('tlp_notes.md' -> 'Tlp Notes'). Así los listados no escriben nada y el título de
+        una nota no cambia cuando recibe su id.
+        """
+        if not self.note_ids.needs_backfill():
+            return
+        titles = [title.title() if "/" not in title else title for title, _path in self._iter_note_files()]
+        if titles:
+            self.note_ids.backfill(titles)
+
+    @synchronized
+    def add_listener(self, callback):
+        """
+        Registra callback(evento, titulo, **datos), llamado tras crear ("created"), guardar ("saved"),
+        renombrar ("renamed", con old_title), eliminar ("deleted") o archivar ("archived") una nota.
+        Puede llamarse desde cualquier hilo.
+        """
+        self._listeners.append(callback)
 
+    @synchronized
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @synchronized
+    def add_calendar_listener(self, callback):
+        """
+        Registra callback(cambio, evento) para los cambios del calendario en memoria: "added" y "removed"
+        (una modificación llega como "removed" seguido de "added"), o "reloaded" con la lista de todos los eventos
+        cuando se vuelve a cargar entero. Se llama desde el hilo que hizo el cambio.
+        """
+        self._calendar_listeners.append(callback)
+
+    @synchronized
+    def remove_calendar_listener(self, callback):
+        if callback in self._calendar_listeners:
+            self._calendar_listeners.remove(callback)
+
+    def _notify_calendar(self, change, event):
+        for callback in list(self._calendar_listeners):
+            try:
+                callback(change, event)
+            except Exception:
+                logger.exception("Error en el aviso '%s' del calendario", change)
+
+    def _notify(self, event, title, **info):
+        # El cambio ya está en disco: un índice que falla no debe hacer fallar la operación
+        for callback in list(self._listeners):
+            try:
+                callback(event, title, **info)
+            except Exception:
+                logger.exception("Error en el aviso '%s' de la nota '%s'", event, title)
+
+    def _get_note_path(self, title, create_dirs=False):
+        """
+        Ruta del archivo de la nota. Sólo toca el disco con create_dirs (para escribir una nota en una
+        carpeta que aún no existe); las lecturas no crean carpetas.
+        Lanza ValueError si el título no es una ruta dentro de notes_dir ('..', rutas absolutas, vacío, oculta).
+        """
+        path = self._note_paths.get(title)
+        if path is None:
+            parts = note_key(title).split('/')
+            # Las carpetas y archivos ocultos ('.meta', '..') no son notas
+            if any(not part or part.startswith('.') for part in parts):
+                raise ValueError(f"Título de nota no válido: '{title}'.")
+            path = os.path.join(self.notes_dir, *parts[:-1], f"{parts[-1]}.md")
+            root = os.path.abspath(self.notes_dir)
+            if os.path.commonpath([root, os.path.abspath(path)]) != root:
+                raise ValueError(f"Título de nota no válido: '{title}'.")
+            if len(self._note_paths) >= MAX_CACHED_PATHS:
+                self._note_paths.clear()
+            self._note_paths[title] = path
+        if create_dirs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def is_valid_title(self, title):
+        """True si el título es una nota dentro de notes_dir (ver _get_note_path)."""
+        try:
+            self._get_note_path(title)
+        except ValueError:
+            return False
+        return True
+
+    def _note_lock(self, title):
+        return note_lock(self.meta_dir, note_key(title))
+
+    def get_note_version(self, title):
+        """
+        Versión actual de la nota en disco (mtime en ns), o None si no existe.
+        Sirve para detectar al guardar si otro proceso la modificó entretanto.
+        """
+        try:
+            return os.stat(self._get_note_path(title)).st_mtime_ns
+        except (OSError, ValueError):
+            return None
+
+    @synchronized
     def create_note(self, title):
-        note_path = self._get_note_path(title)
+        try:
+            note_path = self._get_note_path(title, create_dirs=True)
+        except ValueError as e:
+            return False, str(e)
+        if not os.path.exists(note_path) and self._rehydrate(title):
+            return True, f"La nota '{title}' ya existe (se recuperó del archivo)."
         if not os.path.exists(note_path):
             try:
-                with open(note_path, 'w', encoding="utf-8") as f:
+                # 'x' falla si otro proceso la creó entretanto
+                with open(note_path, 'x', encoding="utf-8") as f:
                     f.write(f"# {title}\n\n")
-                return True, f"Nota '{title}' creada."
+            except FileExistsError:
+                return True, f"La nota '{title}' ya existe."
             except Exception as e:
                 return False, f"Error al crear la nota: {e}"
+            self.note_ids.assign([title])
+            self._notify("created", title)
+            return True, f"Nota '{title}' creada."
         return True, f"La nota '{title}' ya existe."
 
-    def save_note_content(self, title, content, roles=None):
+    @synchronized
+    def save_note_content(self, title, content, roles=None, expected_version=None):
         """
         Guarda el contenido y los roles de la nota en el archivo, usando un marcador especial.
+        Si se indica expected_version (ver get_note_version) y la nota cambió en disco, no se guarda.
         """
-        note_path = self._get_note_path(title)
+        try:
+            note_path = self._get_note_path(title)
+        except ValueError as e:
+            return False, str(e)
+        if not os.path.exists(note_path):
+            self._rehydrate(title)
         if not os.path.exists(note_path):
             return False, f"Error: La nota '{title}' no existe para guardar."
         try:
-            with open(note_path, 'w', encoding="utf-8") as f:
-                # Escribe el contenido principal
-                f.write(content.rstrip("\n"))
-                f.write("\n\n---ROLES---\n")
-                if roles is not None:
-                    for role, color in roles.items():
-                        f.write(f"{role}:{color}\n")
-            return True, f"Nota '{title}' guardada exitosamente."
+            if roles:
+                # Los roles nuevos se registran antes de tomar el bloqueo de la nota
+                self.role_registry.intern(roles)
+            with self._note_lock(title):
+                if expected_version is not None and self.get_note_version(title) != expected_version:
+                    return False, f"La nota '{title}' fue modificada por otro proceso."
+                stored_roles = self.role_registry.compact(roles) if roles else roles
+                text = compose_note_text(content, stored_roles)
+                if self.keep_history:
+                    with open(note_path, 'r', encoding="utf-8") as f:
+                        previous = f.read()
+                    if previous != text:
+                        self.history.record(title, text, previous)
+                write_file_atomic(note_path, text)
         except Exception as e:
             return False, f"Error al guardar la nota: {e}"
+        self._notify("saved", title, content=content, roles=roles)
+        return True, f"Nota '{title}' guardada exitosamente."
+
+    @synchronized
+    def rewrite_note(self, title, rewrite):
+        """
+        Reescribe la nota a partir de su texto actual en disco: rewrite(texto) devuelve el texto nuevo o None
+        para dejarla como está. Se hace con el bloqueo de la nota, se guarda en el historial y se avisa con
+        "saved", como al guardar. Devuelve (ok, mensaje).
+        """
+        try:
+            note_path = self._get_note_path(title)
+        except ValueError as e:
+            return False, str(e)
+        try:
+            with self._note_lock(title):
+                with open(note_path, 'r', encoding="utf-8") as f:
+                    previous = f.read()
+                text = rewrite(previous)
+                if text is None or text == previous:
+                    return True, f"La nota '{title}' no cambió."
+                if self.keep_history:
+                    self.history.record(title, text, previous)
+                write_file_atomic(note_path, text)
+        except FileNotFoundError:
+            return False, f"Error: La nota '{title}' no existe."
+        except Exception as e:
+            return False, f"Error al guardar la nota: {e}"
+        content, roles = split_note_text(text)
+        self._notify("saved", title, content=content, roles=roles)
+        return True, f"Nota '{title}' guardada exitosamente."
+
+    @synchronized
+    def delete_note(self, title):
+        try:
+            note_path = self._get_note_path(title)
+        except ValueError as e:
+            return False, str(e)
+        if not os.path.exists(note_path):
+            if self._has_archive() and self.archive.remove(title):
+                self.note_ids.remove(title)
+                self._notify("deleted", title)
+                return True, "Nota eliminada."
+            return False, f"Error: La nota '{title}' no existe."
+        try:
+            with self._note_lock(title):
+                os.remove(note_path)
+        except Exception as e:
+            return False, f"No se pudo eliminar la nota: {e}"
+        self.note_ids.remove(title)
+        self._notify("deleted", title)
+        return True, "Nota eliminada."
+
+    @synchronized
+    def rename_note(self, old_title, new_title):
+        try:
+            old_path = self._get_note_path(old_title)
+            new_path = self._get_note_path(new_title, create_dirs=True)
+        except ValueError as e:
+            return False, str(e)
+        if not os.path.exists(old_path):
+            self._rehydrate(old_title)
+        if not os.path.exists(old_path):
+            return False, f"Error: La nota '{old_title}' no existe."
+        if os.path.exists(new_path) and os.path.normcase(new_path) != os.path.normcase(old_path):
+            return False, f"Error: Ya existe una nota '{new_title}'."
+        try:
+            # Una sola vez si las dos claves coinciden (cambio de mayúsculas) y, si no, en orden de clave,
+            # para que dos renombrados cruzados en procesos distintos no se bloqueen mutuamente
+            keys = sorted({note_key(old_title), note_key(new_title)})
+            with ExitStack() as locks:
+                for key in keys:
+                    locks.enter_context(note_lock(self.meta_dir, key))
+                os.replace(old_path, new_path)
+                if self.keep_history:
+                    self.history.rename(old_title, new_title)
+        except Exception as e:
+            return False, f"No se pudo renombrar la nota: {e}"
+        note_id = self.note_ids.rename(old_title, new_title)
+        self._rename_note_events(old_title, new_title, note_id)
+        self._notify("renamed", new_title, old_title=old_title)
+        return True, f"Nota '{old_title}' renombrada a '{new_title}'."
+
+    @property
+    @synchronized
+    def archive(self):
+        """Archivo en frío de notas inactivas (.meta/archive); se abre la primera vez que se usa."""
+        if self._archive is None:
+            from note_archive import NoteArchive
+            self._archive = NoteArchive(self.meta_dir)
+        return self._archive
+
+    def _has_archive(self):
+        # Evita importar y abrir el archivo en vaults que nunca lo usaron
+        return self._archive is not None or os.path.exists(os.path.join(self.meta_dir, "archive", "index.json"))
+
+    def is_archived(self, title):
+        return self._has_archive() and title in self.archive
+
+    def list_archived_notes(self):
+        return self.archive.titles() if self._has_archive() else []
+
+    @synchronized
+    def _rehydrate(self, title):
+        """Devuelve una nota archivada a notes_dir (con su fecha de modificación original)."""
+        if not self._has_archive():
+            return False
+        with self._note_lock(title):
+            entry = self.archive.entry(title)
+            if entry is None:
+                return False
+            note_path = self._get_note_path(title, create_dirs=True)
+            if not os.path.exists(note_path):
+                write_file_atomic(note_path, self.archive.read(title))
+                os.utime(note_path, ns=(entry[3], entry[3]))
+            self.archive.remove(title)
+        self._notify("created", title)
+        return True
+
+    def archive_notes(self, older_than_days=None, only_eliminar=False, progress=None, cancel_event=None):
+        """
+        Mueve al archivo las notas sin modificar desde hace older_than_days días y/o (only_eliminar) las que
+        sólo tienen líneas del cuadrante ELIMINAR. progress(procesadas, total); cancel_event detiene el proceso
+        al final del lote en curso. Devuelve (ok, mensaje, notas_archivadas).
+        """
+        if older_than_days is None and not only_eliminar:
+            return False, "Indique un número de días o el criterio ELIMINAR.", 0
+        cutoff = time.time_ns() - older_than_days * 86400 * 10**9 if older_than_days is not None else None
+        notes = list(self.iter_notes())
+        archived = 0
+        batch = []
+
+        def flush():
+            # Primero se escribe el paquete y después se borran los archivos: nunca se pierde una nota.
+            # Cada paquete se archiva con el bloqueo del gestor (no todo el proceso, que puede ser largo)
+            with self.lock:
+                self.archive.add_many([(title, text, mtime) for title, _path, text, mtime in batch])
+                moved = []
+                for title, path, _text, mtime in batch:
+                    with self._note_lock(title):
+                        try:
+                            unchanged = os.stat(path).st_mtime_ns == mtime
+                        except OSError:
+                            unchanged = False
+                        if unchanged:
+                            os.remove(path)
+                            moved.append(title)
+                        else:
+                            # Se modificó mientras se archivaba: se queda activa
+                            self.archive.remove(title)
+                for title in moved:
+                    self._notify("archived", title)
+            return len(moved)
+
+        try:
+            for done, (title, path) in enumerate(notes, 1):
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                    if cutoff is not None and mtime >= cutoff:
+                        continue
+                    with open(path, 'r', encoding="utf-8") as f:
+                        text = f.read()
+                except (OSError, UnicodeDecodeError):
+                    continue
+                if only_eliminar and not is_only_eliminar(split_note_text(text)[0]):
+                    continue
+                batch.append((title, path, text, mtime))
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    archived += flush()
+                    batch = []
+                    if progress:
+                        progress(done, len(notes))
+                    if cancel_event is not None and cancel_event.is_set():
+                        return True, f"{archived} notas archivadas (interrumpido).", archived
+            archived += flush()
+            if progress:
+                progress(len(notes), len(notes))
+        except Exception as e:
+            return False, f"Error al archivar: {e}", archived
+        return True, f"{archived} notas archivadas.", archived
+
+    @property
+    @synchronized
+    def note_ids(self):
+        """Tabla de ids estables de las notas (.meta/notes.json)."""
+        if self._note_ids is None:
+            from note_ids import NoteIdMap
+            self._note_ids = NoteIdMap(self.meta_dir)
+        return self._note_ids
+
+    def note_id(self, title):
+        """
+        Id estable de la nota (no cambia al renombrarla). Las notas creadas fuera de la aplicación reciben
+        uno la primera vez que se pide. None si la nota no existe.
+        """
+        return self.note_ids_for([title])[title]
+
+    def note_ids_for(self, titles):
+        """Como note_id para varios títulos, con una sola escritura de la tabla: {título: id o None}."""
+        ids = {title: self.note_ids.id_for(title) for title in titles}
+        missing = [title for title, note_id in ids.items()
+                   if note_id is None and (self.get_note_version(title) is not None or self.is_archived(title))]
+        if missing:
+            ids.update(self.note_ids.assign(missing))
+        return ids
+
+    def register_notes(self, titles):
+        """Da id a notas escritas directamente en notes_dir (importaciones); conserva su título."""
+        self.note_ids.assign(list(titles))
+
+    @property
+    @synchronized
+    def role_registry(self):
+        """Registro de roles del vault (.meta/roles.json); se abre la primera vez que se usa."""
+        if self._role_registry is None:
+            from role_registry import RoleRegistry
+            registry = RoleRegistry(self)
+            registry.attach()
+            self._role_registry = registry
+        return self._role_registry
+
+    def default_role_colors(self):
+        """Roles para una nota sin sección de roles: todos los del registro."""
+        return self.role_registry.colors()
+
+    def notes_with_role(self, role):
+        """Títulos de las notas que declaran el rol (el índice se construye la primera vez)."""
+        return self.role_registry.notes_with_role(role)
+
+    @property
+    @synchronized
+    def history(self):
+        """Historial de versiones de las notas (.meta/history); se crea la primera vez que se usa."""
+        if self._history is None:
+            from note_history import NoteHistory
+            self._history = NoteHistory(self.meta_dir)
+        return self._history
+
+    def list_note_versions(self, title):
+        """Versiones guardadas de la nota, de la más reciente a la más antigua."""
+        return self.history.versions(title)
+
+    def get_note_version_text(self, version_hash):
+        """Texto completo (contenido y roles) de una versión guardada."""
+        return self.history.read(version_hash)
+
+    def diff_note_versions(self, old_hash, new_hash):
+        """Diferencias entre dos versiones (unified diff, lista de líneas)."""
+        return self.history.diff(old_hash, new_hash)
+
+    def restore_note_version(self, title, version_hash):
+        """
+        Vuelve a una versión anterior guardándola como una versión nueva (no se pierde nada del historial).
+        """
+        try:
+            text = self.history.read(version_hash)
+        except (OSError, ValueError, KeyError) as e:
+            return False, f"No se pudo leer la versión: {e}"
+        if self.get_note_version(title) is None:
+            ok, msg = self.create_note(title)
+            if not ok:
+                return False, msg
+        content, roles = split_note_text(text)
+        ok, msg = self.save_note_content(title, content, roles=roles)
+        if not ok:
+            return False, msg
+        return True, f"Nota '{title}' restaurada."
+
+    @property
+    @synchronized
+    def link_graph(self):
+        """Grafo de enlaces entre notas; se carga la primera vez que se usa."""
+        if self._link_graph is None:
+            from link_graph import LinkGraph
+            graph = LinkGraph(self)
+            graph.load()
+            graph.attach()
+            self._link_graph = graph
+        return self._link_graph
 
     def list_notes(self):
-        notes = [f.replace('.md', '') for f in os.listdir(self.notes_dir) if f.endswith('.md')]
-        return [note.replace('_', ' ').title() for note in notes]
+        """
+        Títulos de las notas de la carpeta raíz, tal como se escribieron al crearlas (las notas sin id, creadas
+        fuera de la aplicación, con el nombre del archivo, igual que iter_notes). No escribe nada.
+        """
+        titles = self.note_ids.titles_by_key()
+        notes = [f[:-3].replace('_', ' ') for f in os.listdir(self.notes_dir) if f.endswith('.md')]
+        return [titles.get(note_key(note), note) for note in notes]
+
+    def iter_notes(self):
+        """
+        Recorre todas las notas del vault (incluidas las subcarpetas).
+        Genera tuplas (titulo, ruta) en orden estable; el título usa '/' como separador de carpetas.
+        Las notas con id usan el título con que se crearon; las demás, el nombre del archivo.
+        """
+        titles = self.note_ids.titles_by_key()
+        for title, path in self._iter_note_files():
+            yield titles.get(note_key(title), title), path
+
+    def _iter_note_files(self):
+        """(título derivado del nombre del archivo, ruta) de cada nota, en orden estable."""
+        for root, dirs, files in os.walk(self.notes_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            parent = os.path.relpath(root, self.notes_dir)
+            for f in sorted(files):
+                if not f.endswith('.md') or f.startswith('.'):
+                    continue
+                rel = f[:-3] if parent == "." else os.path.join(parent, f[:-3])
+                yield rel.replace(os.sep, '/').replace('_', ' '), os.path.join(root, f)
 
     def list_notes_hierarchy(self):
         hierarchy = {}
         for root, dirs, files in os.walk(self.notes_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
             parent = os.path.relpath(root, self.notes_dir)
             if parent == ".":
                 parent = ""
@@ -92,61 +799,65 @@ class NotesManager:
         Devuelve una tupla (contenido, roles_dict, mensaje).
         Si no hay sección de roles, roles_dict será None.
         """
-        note_path = self._get_note_path(title)
-        if not os.path.exists(note_path):
-            return None, None, f"Error: La nota '{title}' no existe."
         try:
-            with open(note_path, 'r', encoding="utf-8") as f:
-                full_content = f.read()
-            if '\n---ROLES---\n' in full_content:
-                content, roles_section = full_content.split('\n---ROLES---\n', 1)
-                roles_dict = {}
-                for line in roles_section.strip().splitlines():
-                    if ':' in line:
-                        role, color = line.split(':', 1)
-                        roles_dict[role.strip()] = color.strip()
+            note_path = self._get_note_path(title)
+            if os.path.exists(note_path):
+                with open(note_path, 'r', encoding="utf-8") as f:
+                    full_content = f.read()
+            else:
+                # Las notas archivadas se leen del paquete sin devolverlas a notes_dir
+                full_content = self.archive.read(title) if self._has_archive() else None
+                if full_content is None:
+                    return None, None, f"Error: La nota '{title}' no existe."
+            content, roles_dict = split_note_text(full_content)
+            if roles_dict is not None:
+                if None in roles_dict.values():
+                    roles_dict = self.role_registry.resolve(roles_dict)
                 return content, roles_dict, "Contenido y roles cargados."
             else:
                 return full_content, None, "Contenido cargado (sin roles)."
         except Exception as e:
             return None, None, f"Error al leer la nota: {e}"
 
+    def search_notes(self, query, ignore_case=True, regex=False, include_archived=True):
+        """
+        Busca texto en todas las notas (también en las archivadas). Genera tuplas (titulo, num_linea, linea).
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        for title, path in self.iter_notes():
+            try:
+                with open(path, 'r', encoding="utf-8") as f:
+                    content, _roles = split_note_text(f.read())
+            except (OSError, UnicodeDecodeError):
+                continue
+            if not pattern.search(content):
+                continue
+            for line_no, line in enumerate(content.split("\n"), 1):
+                if pattern.search(line):
+                    yield title, line_no, line
+        if not include_archived or not self._has_archive():
+            return
+        for title, text in self.archive.items():
+            content, _roles = split_note_text(text)
+            if not pattern.search(content):
+                continue
+            for line_no, line in enumerate(content.split("\n"), 1):
+                if pattern.search(line):
+                    yield title, line_no, line
+
     def get_line_classification(self, line_text, roles=None):
         """
         Clasifica la línea usando los roles dados (por nota).
         """
-        original_line = line_text.strip()
-        remaining_line = original_line
-        classifications = []
-        found_role = True
-        valid_roles = list(roles.keys()) if roles else []
-        while found_role:
-            found_role = False
-            for r in valid_roles:
-                role_prefix = f"[{r}]"
-                if remaining_line.startswith(role_prefix):
-                    classifications.append(("role", r))
-                    remaining_line = remaining_line[len(role_prefix):].strip()
-                    found_role = True
-                    break
-        for prefix, key in self.eisenhower_prefixes_map.items():
-            if remaining_line.startswith(prefix):
-                classifications.append(("eisenhower", key))
-                remaining_line = remaining_line[len(prefix):].strip()
-                break
-        for prefix, key in self.task_type_prefixes_map.items():
-            if remaining_line.startswith(prefix):
-                classifications.append(("task_type", key))
-                remaining_line = remaining_line[len(prefix):].strip()
-                break
-        if not classifications and original_line:
-            return [("general_text", None)]
-        return classifications
+        return classify_line(line_text, roles)
 
     def filter_note_by_classification(self, title, classification_type, classification_name):
         content, roles, msg = self.get_note_content(title)
         if content is None:
             return [], msg
+        # Como en la exportación: los roles del registro del vault más los de la nota
+        roles = {**self.default_role_colors(), **(roles or {})}
         filtered_lines_with_tags = []
         lines = content.split('\n')
         for line in lines:
@@ -175,63 +886,264 @@ class NotesManager:
             return [], f"No se encontraron líneas para '{classification_name}' en esta nota."
         return filtered_lines_with_tags, "Filtrado exitoso."
 
-    def _load_calendar_events(self):
+    @property
+    @synchronized
+    def calendar_events(self):
+        if self._calendar_events is None:
+            self.calendar_events = self._load_calendar_events()
+        return self._calendar_events
+
+    @calendar_events.setter
+    @synchronized
+    def calendar_events(self, events):
+        self._calendar_events = events
+        self._reindex_calendar()
+
+    def _reindex_calendar(self):
+        # Índices en memoria: por id, por día (cada día ordenado por hora de inicio) y agregados por mes
+        self._events_by_id = {}
+        self._events_by_day = {}
+        self._month_stats = {}
+        for event in self._calendar_events or ():
+            self._events_by_id[event.id] = event
+            self._events_by_day.setdefault(event.day, []).append(event)
+            self._count_event(event, 1)
+        for day_events in self._events_by_day.values():
+            day_events.sort(key=_event_start)
+        self.calendar_revision += 1
+        if self._calendar_listeners:
+            self._notify_calendar("reloaded", list(self._calendar_events or ()))
+
+    def _count_event(self, event, sign):
+        day = event.day
+        d = day_to_date(day)
+        month = self._month_stats.setdefault((d.year, d.month), {})
+        stats = month.get(day)
+        if stats is None:
+            stats = month[day] = DayStats()
+        stats.add(event.duration_minutes, eisenhower_quadrant(event.task_line), sign)
+        if not stats.count:
+            del month[day]
+            if not month:
+                del self._month_stats[(d.year, d.month)]
+
+    def _index_event(self, event, keep_sorted=True):
+        self._events_by_id[event.id] = event
+        day_events = self._events_by_day.setdefault(event.day, [])
+        day_events.append(event)
+        if keep_sorted:
+            day_events.sort(key=_event_start)
+        self._count_event(event, 1)
+        self.calendar_revision += 1
+        self._notify_calendar("added", event)
+
+    def _unindex_event(self, event):
+        self._events_by_id.pop(event.id, None)
+        day_events = self._events_by_day.get(event.day, [])
+        if event in day_events:
+            day_events.remove(event)
+            self._count_event(event, -1)
+        if not day_events:
+            self._events_by_day.pop(event.day, None)
+        self.calendar_revision += 1
+        self._notify_calendar("removed", event)
+
+    def _calendar_file_version(self):
+        try:
+            st = os.stat(self.calendar_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _calendar_lock(self):
+        return FileLock(self.calendar_file + ".lock")
+
+    def _read_calendar_file(self):
+        """
+        Lee el JSON del calendario y devuelve objetos CalendarEvent. Las entradas incompletas o con
+        fechas inválidas no se cargan, pero se guardan aparte para no perderlas al reescribir el archivo.
+        """
+        self._calendar_unparsed = []
         if os.path.exists(self.calendar_file):
             with open(self.calendar_file, 'r', encoding="utf-8") as f:
                 try:
-                    return json.load(f)
+                    data = json.load(f)
                 except json.JSONDecodeError:
                     return []
+            events = []
+            for item in data if isinstance(data, list) else ():
+                try:
+                    events.append(CalendarEvent.from_dict(item))
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    self._calendar_unparsed.append(item)
+            return events
         return []
 
+    def _load_calendar_events(self):
+        self._calendar_version = self._calendar_file_version()
+        events = self._read_calendar_file()
+        self._calendar_base = [e.copy() for e in events]
+        return events
+
+    def _ensure_calendar(self):
+        # Carga el calendario si aún no se usó; si ya estaba cargado, recoge cambios de otros procesos
+        if self._calendar_events is None:
+            self.calendar_events
+        else:
+            self.refresh_calendar()
+
+    @synchronized
+    def refresh_calendar(self):
+        """Vuelve a leer el calendario si otro proceso lo modificó (sólo cuesta un stat si no cambió)."""
+        if self._calendar_events is not None and self._calendar_file_version() != self._calendar_version:
+            self.calendar_events = self._load_calendar_events()
+
     def _save_calendar_events(self):
-        with open(self.calendar_file, 'w', encoding="utf-8") as f:
-            json.dump(self.calendar_events, f, indent=4)
+        # Concurrencia optimista: los cambios se hacen en memoria y, al guardar, si el archivo cambió
+        # desde que se leyó se fusiona con lo que hay en disco. El bloqueo sólo cubre comprobar y escribir.
+        with self._calendar_lock():
+            if self._calendar_file_version() != self._calendar_version:
+                theirs = self._read_calendar_file()
+                merged = merge_calendar_events([e.to_dict() for e in self._calendar_base],
+                                               [e.to_dict() for e in self.calendar_events],
+                                               [e.to_dict() for e in theirs])
+                self.calendar_events = [CalendarEvent.from_dict(e) for e in merged]
+            data = [e.to_dict() for e in self.calendar_events] + self._calendar_unparsed
+            write_file_atomic(self.calendar_file, json.dumps(data, indent=4))
+            self._calendar_version = self._calendar_file_version()
+        self._calendar_base = [e.copy() for e in self.calendar_events]
 
+    @synchronized
     def add_calendar_event(self, note_title, line_text, start_datetime_str, duration_minutes):
-        event_id = hashlib.md5(f"{note_title}-{line_text}-{start_datetime_str}".encode()).hexdigest()
-        for event in self.calendar_events:
-            if event['id'] == event_id:
-                return False, "Esta tarea ya está programada con la misma fecha y hora."
-        event = {
-            "id": event_id,
-            "note_title": note_title,
-            "task_line": line_text,
-            "start_datetime": start_datetime_str,
-            "duration_minutes": duration_minutes
-        }
+        try:
+            start = parse_start(start_datetime_str)
+        except ValueError:
+            return False, "Formato de fecha y hora inválido."
+        duration_minutes = _parse_duration(duration_minutes)
+        if duration_minutes is None:
+            return False, "Duración inválida."
+        new_id = event_id(note_title, line_text, start)
+        self._ensure_calendar()
+        if new_id in self._events_by_id:
+            return False, "Esta tarea ya está programada con la misma fecha y hora."
+        event = CalendarEvent(new_id, note_title, line_text, start, duration_minutes,
+                              note_id=self.note_id(note_title))
         self.calendar_events.append(event)
+        self._index_event(event)
         self._save_calendar_events()
         return True, "Evento añadido al calendario."
 
-    def get_events_for_date(self, target_date_str):
-        events_for_date = []
-        for event in self.calendar_events:
-            event_date_str = event['start_datetime'].split(' ')[0]
-            if event_date_str == target_date_str:
-                events_for_date.append(event)
-        events_for_date.sort(key=lambda x: datetime.strptime(x['start_datetime'], "%Y-%m-%d %H:%M"))
-        return events_for_date
+    @synchronized
+    def add_calendar_events(self, events):
+        """
+        Añade varios CalendarEvent con una sola escritura del archivo. Los que ya existen (mismo id)
+        se omiten. Devuelve (añadidos, duplicados).
+        """
+        self._ensure_calendar()
+        added = duplicates = 0
+        touched_days = set()
+        events = list(events)
+        note_ids = self.note_ids_for({event.note_title for event in events
+                                      if event.note_id is None and event.id not in self._events_by_id})
+        for event in events:
+            if event.id in self._events_by_id:
+                duplicates += 1
+                continue
+            if event.note_id is None:
+                event.note_id = note_ids[event.note_title]
+            self._calendar_events.append(event)
+            # Cada día se ordena una sola vez al final del lote
+            self._index_event(event, keep_sorted=False)
+            touched_days.add(event.day)
+            added += 1
+        for day in touched_days:
+            self._events_by_day[day].sort(key=_event_start)
+        if added:
+            self._save_calendar_events()
+        return added, duplicates
 
-    def update_calendar_event(self, event_id, new_start_datetime_str=None, new_duration_minutes=None):
+    def _rename_note_events(self, old_title, new_title, note_id):
+        # Los eventos siguen a la nota: por su id o, si son anteriores a los ids, por el título
+        self._ensure_calendar()
+        old_key = note_key(old_title)
+        changed = False
         for event in self.calendar_events:
-            if event['id'] == event_id:
-                if new_start_datetime_str:
-                    event['start_datetime'] = new_start_datetime_str
-                if new_duration_minutes is not None:
-                    event['duration_minutes'] = new_duration_minutes
-                self._save_calendar_events()
-                return True, "Evento actualizado."
-        return False, "Evento no encontrado."
+            if event.note_id == note_id or (event.note_id is None and note_key(event.note_title) == old_key):
+                if event.note_title != new_title or event.note_id != note_id:
+                    event.note_title = new_title
+                    event.note_id = note_id
+                    changed = True
+        if changed:
+            self.calendar_revision += 1
+            self._save_calendar_events()
+
+    def iter_calendar_events(self):
+        """
+        Recorre los eventos en orden cronológico usando el índice por día. Recorre una copia tomada con
+        el bloqueo, así que los cambios posteriores no la alteran.
+        """
+        with self.lock:
+            self._ensure_calendar()
+            events = [event for day in sorted(self._events_by_day) for event in self._events_by_day[day]]
+        return iter(events)
 
+    @synchronized
+    def get_events_for_date(self, target_date_str):
+        """Eventos del día 'YYYY-MM-DD', ordenados por hora de inicio."""
+        self._ensure_calendar()
+        try:
+            day = parse_day(target_date_str)
+        except ValueError:
+            return []
+        return list(self._events_by_day.get(day, ()))
+
+    @synchronized
+    def get_month_summary(self, year, month):
+        """
+        Agregados del mes: {date: DayStats} sólo con los días que tienen eventos. Se mantienen al
+        añadir, modificar o borrar eventos, así que consultar un mes no recorre el calendario.
+        """
+        self._ensure_calendar()
+        return {day_to_date(day): stats for day, stats in self._month_stats.get((year, month), {}).items()}
+
+    @synchronized
+    def update_calendar_event(self, event_id, new_start_datetime_str=None, new_duration_minutes=None, new_start=None):
+        """
+        Cambia el inicio (texto 'YYYY-MM-DD HH:MM' o new_start en minutos desde 1970) y/o la duración.
+        """
+        if new_start_datetime_str:
+            try:
+                new_start = parse_start(new_start_datetime_str)
+            except ValueError:
+                return False, "Formato de fecha y hora inválido."
+        if new_duration_minutes is not None:
+            new_duration_minutes = _parse_duration(new_duration_minutes)
+            if new_duration_minutes is None:
+                return False, "Duración inválida."
+        self._ensure_calendar()
+        event = self._events_by_id.get(event_id)
+        if event is None:
+            return False, "Evento no encontrado."
+        self._unindex_event(event)
+        if new_start is not None:
+            event.start = new_start
+        if new_duration_minutes is not None:
+            event.duration_minutes = new_duration_minutes
+        self._index_event(event)
+        self._save_calendar_events()
+        return True, "Evento actualizado."
+
+    @synchronized
     def delete_calendar_event(self, event_id):
-        initial_len = len(self.calendar_events)
-        self.calendar_events = [event for event in self.calendar_events if event['id'] != event_id]
-        if len(self.calendar_events) < initial_len:
-            self._save_calendar_events()
-            return True, "Evento eliminado."
-        return False, "Evento no encontrado."
-        
+        self._ensure_calendar()
+        event = self._events_by_id.get(event_id)
+        if event is None:
+            return False, "Evento no encontrado."
+        self._calendar_events.remove(event)
+        self._unindex_event(event)
+        self._save_calendar_events()
+        return True, "Evento eliminado."
+
     def is_note_empty(self, title):
         content, _ = self.get_note_content(title)
         if not content or content.strip() == f"# {title}\n" or content.strip() == f"# {title}":
@@ -241,7 +1153,15 @@ class NotesManager:
 # Mixin para integración con Google Drive
 class NotesManagerCloudMixin:
     def __init__(self):
-        self.drive_helper = GoogleDriveHelper()
+        self._drive_helper = None
+
+    @property
+    def drive_helper(self):
+        # pydrive y la autenticación con Google sólo se cargan la primera vez que se usa Drive
+        if getattr(self, '_drive_helper', None) is None:
+            from google_drive_helper import GoogleDriveHelper
+            self._drive_helper = GoogleDriveHelper()
+        return self._drive_helper
 
     def upload_note_to_drive(self, title):
         content, msg = self.get_note_content(title)
@@ -256,6 +1176,6 @@ class NotesManagerCloudMixin:
     def download_note_from_drive(self, file_id):
         title, content = self.drive_helper.download_note(file_id)
         # Guarda localmente
-        with open(self._get_note_path(title.replace('.md','')), 'w', encoding='utf-8') as f:
+        with open(self._get_note_path(title.replace('.md',''), create_dirs=True), 'w', encoding='utf-8') as f:
             f.write(content)
         return title, content
\ No newline at end of file
@@ -0,0 +1,194 @@
+# Recordatorios de los eventos del calendario.
+#
+# ReminderScheduler guarda en un montículo (heapq) los avisos pendientes, uno por evento y antelación.
+# Se actualiza con cada cambio del calendario (ver NotesManager.add_calendar_listener) sin recorrerlo: al
+# modificar o borrar un evento sus avisos quedan caducados y se descartan cuando llegan a la cima.
+# ReminderNotifier programa un único after() de Tk para el próximo aviso.
+
+import heapq
+import threading
+import tkinter as tk
+from datetime import datetime
+from tkinter import Toplevel, ttk
+from calendar_event import datetime_to_start
+
+# Minutos de antelación de los avisos (0 = a la hora de inicio)
+DEFAULT_LEAD_MINUTES = (10, 0)
+# Espera máxima del temporizador: acota lo que se tarda en ver cambios hechos desde otros hilos o procesos
+MAX_TIMER_MS = 60 * 1000
+# Se limpian los avisos caducados cuando son más de la mitad del montículo (y al menos estos)
+MIN_STALE_TO_COMPACT = 64
+
+
+def now_minutes():
+    """Minuto actual en la escala de CalendarEvent.start y segundos transcurridos dentro de ese minuto."""
+    now = datetime.now()
+    return datetime_to_start(now), now.second + now.microsecond / 1e6
+
+
+class ReminderScheduler:
+    def __init__(self, lead_minutes=DEFAULT_LEAD_MINUTES):
+        self.lead_minutes = tuple(sorted(set(lead_minutes), reverse=True))
+        self._lock = threading.Lock()
+        # (minuto del aviso, generación, antelación, id del evento)
+        self._heap = []
+        # id del evento -> [generación, evento, avisos en el montículo]; un aviso con otra generación caducó
+        self._events = {}
+        self._generation = 0
+        self._stale = 0
+
+    def __len__(self):
+        """Avisos pendientes (sin contar los caducados)."""
+        return len(self._heap) - self._stale
+
+    def _queue(self, event, now):
+        self._generation += 1
+        entries = [(event.start - lead, self._generation, lead, event.id)
+                   for lead in self.lead_minutes if event.start - lead >= now]
+        self._events[event.id] = [self._generation, event, len(entries)]
+        return entries
+
+    def rebuild(self, events, now):
+        """Vuelve a crear el montículo con los avisos que aún no han pasado (O(n))."""
+        with self._lock:
+            self._heap, self._events, self._stale = [], {}, 0
+            for event in events:
+                self._heap.extend(self._queue(event, now))
+            heapq.heapify(self._heap)
+
+    def add(self, event, now):
+        """Añade (o reprograma, si ya estaba) los avisos del evento: O(log n)."""
+        with self._lock:
+            self._remove(event.id)
+            for entry in self._queue(event, now):
+                heapq.heappush(self._heap, entry)
+
+    def remove(self, event_id):
+        with self._lock:
+            self._remove(event_id)
+
+    def _remove(self, event_id):
+        current = self._events.pop(event_id, None)
+        if current is None:
+            return
+        self._stale += current[2]
+        if self._stale > max(len(self._heap) // 2, MIN_STALE_TO_COMPACT):
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _is_live(self, entry):
+        current = self._events.get(entry[3])
+        return current is not None and current[0] == entry[1]
+
+    def _drop_stale_head(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+            self._stale -= 1
+
+    def next_due(self):
+        """Minuto del próximo aviso, o None si no hay ninguno."""
+        with self._lock:
+            self._drop_stale_head()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Saca los avisos con minuto <= now: lista de (evento, antelación en minutos)."""
+        due = []
+        with self._lock:
+            self._drop_stale_head()
+            while self._heap and self._heap[0][0] <= now:
+                _minute, _generation, lead, event_id = heapq.heappop(self._heap)
+                current = self._events[event_id]
+                current[2] -= 1
+                due.append((current[1], lead))
+                self._drop_stale_head()
+        return due
+
+
+class ReminderNotifier:
+    """Muestra los avisos en ventanas emergentes desde el bucle de Tk de widget."""
+
+    def __init__(self, widget, notes_manager, lead_minutes=DEFAULT_LEAD_MINUTES, on_open_note=None):
+        self.widget = widget
+        self.notes_manager = notes_manager
+        self.scheduler = ReminderScheduler(lead_minutes)
+        self.on_open_note = on_open_note
+        self._after_id = None
+        self._armed_for = None
+        self._tk_thread = threading.current_thread()
+        self._reloaded = False
+
+    def start(self):
+        """Carga el calendario en segundo plano y empieza a vigilar sus cambios."""
+        self._reloaded = False
+        self.notes_manager.add_calendar_listener(self._on_calendar_change)
+        def load():
+            # Con el bloqueo del gestor ningún cambio del calendario (que avisa con él tomado) puede colarse
+            # entre la copia de los eventos y la reconstrucción y perderse
+            with self.notes_manager.lock:
+                events = list(self.notes_manager.iter_calendar_events())
+                # Si el calendario no estaba cargado, su carga ya avisó con "reloaded"
+                if not self._reloaded:
+                    self.scheduler.rebuild(events, now_minutes()[0])
+        threading.Thread(target=load, daemon=True).start()
+        self._arm()
+
+    def stop(self):
+        self.notes_manager.remove_calendar_listener(self._on_calendar_change)
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _on_calendar_change(self, change, event):
+        now = now_minutes()[0]
+        if change == "reloaded":
+            self._reloaded = True
+            self.scheduler.rebuild(event, now)
+        elif change == "added":
+            self.scheduler.add(event, now)
+        else:
+            self.scheduler.remove(event.id)
+        # Desde otros hilos no se toca Tk: el temporizador vuelve a mirar como mucho en MAX_TIMER_MS
+        if threading.current_thread() is self._tk_thread:
+            due = self.scheduler.next_due()
+            if due is not None and (self._armed_for is None or due < self._armed_for):
+                self._arm()
+
+    def _arm(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        due = self.scheduler.next_due()
+        now, seconds = now_minutes()
+        delay = MAX_TIMER_MS
+        if due is not None:
+            delay = min(max(int(((due - now) * 60 - seconds) * 1000), 0), MAX_TIMER_MS)
+        self._armed_for = due if delay < MAX_TIMER_MS else None
+        self._after_id = self.widget.after(delay, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        # Recoge cambios hechos por otros procesos (sólo cuesta un stat si no hubo)
+        self.notes_manager.refresh_calendar()
+        for event, lead in self.scheduler.pop_due(now_minutes()[0]):
+            self._show(event, lead)
+        self._arm()
+
+    def _show(self, event, lead):
+        win = Toplevel(self.widget)
+        win.title("Recordatorio")
+        win.attributes("-topmost", True)
+        when = "Empieza ahora" if lead == 0 else f"Empieza en {lead} min"
+        ttk.Label(win, text=f"{when} ({event.start_datetime[11:]}, {event.duration_minutes} min)",
+                  font=("San Francisco", 11, "bold")).pack(padx=14, pady=(12, 4), anchor=tk.W)
+        ttk.Label(win, text=event.task_line, wraplength=360).pack(padx=14, anchor=tk.W)
+        ttk.Label(win, text=f"Nota: {event.note_title}").pack(padx=14, pady=(4, 8), anchor=tk.W)
+        buttons = ttk.Frame(win)
+        buttons.pack(pady=(0, 10))
+        if self.on_open_note:
+            def open_note():
+                win.destroy()
+                self.on_open_note(event.note_title)
+            ttk.Button(buttons, text="Abrir nota", command=open_note).pack(side=tk.LEFT, padx=4)
+        ttk.Button(buttons, text="Cerrar", command=win.destroy).pack(side=tk.LEFT, padx=4)
+        win.bell()
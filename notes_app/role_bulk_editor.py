@@ -0,0 +1,242 @@
+# Operaciones masivas sobre roles en todas las notas del vault:
+# renombrar, fusionar y cambiar color, tanto en la sección ---ROLES--- como en los prefijos [Rol] de las líneas.
+# Los nombres y colores se cambian en el registro de roles del vault; en las notas se quitan los colores
+# propios del rol cambiado para que todas usen el del registro.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from notes_manager import split_note_text, compose_note_text, iter_leading_tags
+
+
+class NoteRoleChange:
+    """Resultado de aplicar la operación a una nota."""
+    __slots__ = ("title", "path", "lines_changed", "trailer_changed", "error")
+
+    def __init__(self, title, path, lines_changed=0, trailer_changed=False, error=None):
+        self.title = title
+        self.path = path
+        self.lines_changed = lines_changed
+        self.trailer_changed = trailer_changed
+        self.error = error
+
+    @property
+    def changed(self):
+        return bool(self.lines_changed or self.trailer_changed)
+
+
+class RoleBulkReport:
+    """Informe de una operación masiva (también de un ensayo sin escritura)."""
+
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.scanned = 0
+        self.changes = []
+        self.registry_changes = []
+        self.errors = []
+        self.cancelled = False
+
+    @property
+    def notes_changed(self):
+        return len(self.changes)
+
+    @property
+    def lines_changed(self):
+        return sum(c.lines_changed for c in self.changes)
+
+    @property
+    def changed(self):
+        """Si la operación cambia (o cambiaría) alguna nota o el registro de roles."""
+        return bool(self.changes or self.registry_changes)
+
+    def summary(self):
+        verb = "se modificarían" if self.dry_run else "modificadas"
+        text = (f"{self.scanned} notas revisadas, {self.notes_changed} {verb} "
+                f"({self.lines_changed} líneas).")
+        if self.registry_changes:
+            verb = "se cambiarían" if self.dry_run else "cambiados"
+            text += f" {len(self.registry_changes)} roles del registro {verb}."
+        if self.errors:
+            text += f" {len(self.errors)} errores."
+        if self.cancelled:
+            text += " Operación cancelada."
+        return text
+
+    def details(self, limit=None):
+        lines = [f"Registro: {change}" for change in self.registry_changes]
+        for change in self.changes[:limit]:
+            trailer = ", roles" if change.trailer_changed else ""
+            lines.append(f"{change.title}: {change.lines_changed} líneas{trailer}")
+        for change in self.errors[:limit]:
+            lines.append(f"{change.title}: ERROR {change.error}")
+        return lines
+
+
+def rewrite_role_prefixes(line, renames):
+    """
+    Renombra los prefijos [Rol] del inicio de la línea según renames (viejo -> nuevo).
+    Si tras renombrar un rol queda repetido (fusión), se elimina el duplicado.
+    Devuelve la línea (la misma instancia si no hubo cambios).
+    """
+    pieces = []
+    seen = set()
+    last = 0
+    changed = False
+    for start, end, name in iter_leading_tags(line):
+        if name.startswith(("E:", "T:")):
+            break
+        new_name = renames.get(name, name)
+        if new_name in seen:
+            changed = True
+        elif new_name != name:
+            token = line[start:end]
+            bracket = token.index('[')
+            pieces.append(token[:bracket] + f"[{new_name}]")
+            changed = True
+        else:
+            pieces.append(line[start:end])
+        seen.add(new_name)
+        last = end
+    if not changed:
+        return line
+    return "".join(pieces) + line[last:]
+
+
+def rewrite_roles(roles, renames, colors):
+    """
+    Aplica renombrados y colores a un diccionario rol -> color, conservando el orden.
+    Cuando varios roles acaban con el mismo nombre prevalece el color del destino.
+    """
+    if roles is None:
+        return None
+    result = {}
+    for role, color in roles.items():
+        name = renames.get(role, role)
+        if name not in result or role == name:
+            result[name] = color
+    for name in result:
+        if name in colors:
+            result[name] = colors[name]
+    return result
+
+
+def rewrite_note_text(full_content, renames, colors):
+    """
+    Aplica la operación al texto completo de una nota.
+    Devuelve (texto nuevo o None si no cambia, líneas cambiadas, si cambió la sección de roles).
+    """
+    content, roles = split_note_text(full_content)
+    lines = content.split("\n")
+    lines_changed = 0
+    if renames:
+        for i, line in enumerate(lines):
+            new_line = rewrite_role_prefixes(line, renames)
+            if new_line is not line:
+                lines[i] = new_line
+                lines_changed += 1
+    new_roles = rewrite_roles(roles, renames, colors)
+    trailer_changed = new_roles != roles
+    if not lines_changed and not trailer_changed:
+        return None, 0, False
+    new_content = "\n".join(lines)
+    text = new_content if roles is None else compose_note_text(new_content, new_roles)
+    return text, lines_changed, trailer_changed
+
+
+class RoleBulkEditor:
+    def __init__(self, notes_manager, max_workers=8):
+        self.notes_manager = notes_manager
+        self.max_workers = max_workers
+
+    def rename(self, old_name, new_name, color=None, **kwargs):
+        colors = {new_name: color} if color else {}
+        return self.run({old_name: new_name}, colors, **kwargs)
+
+    def merge(self, sources, target, color=None, **kwargs):
+        renames = {src: target for src in sources if src != target}
+        colors = {target: color} if color else {}
+        return self.run(renames, colors, **kwargs)
+
+    def recolor(self, role, color, **kwargs):
+        return self.run({}, {role: color}, **kwargs)
+
+    def run(self, renames, colors, dry_run=False, progress=None, cancel_event=None):
+        """
+        Aplica la operación en paralelo sobre todas las notas.
+        progress(hechas, total) se llama desde los hilos de trabajo; cancel_event (threading.Event) permite abortar.
+        Devuelve un RoleBulkReport. El registro de roles sólo se cambia si el recorrido de las notas termina sin
+        cancelarse; en un ensayo se informa de lo que cambiaría.
+        """
+        report = RoleBulkReport(dry_run)
+        report.registry_changes = self._registry_changes(renames, colors)
+        registry_colors = colors
+        # En las notas el rol queda sin color propio (None): toma el del registro
+        colors = dict.fromkeys(colors)
+        notes = list(self.notes_manager.iter_notes())
+        total = len(notes)
+        cancel_event = cancel_event or threading.Event()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._apply_to_note, title, path, renames, colors, dry_run, cancel_event)
+                for title, path in notes
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                change = future.result()
+                if change is not None:
+                    report.scanned += 1
+                    if change.error:
+                        report.errors.append(change)
+                    elif change.changed:
+                        report.changes.append(change)
+                if progress:
+                    progress(done, total)
+        report.cancelled = cancel_event.is_set()
+        report.changes.sort(key=lambda c: c.title)
+        if not dry_run and not report.cancelled:
+            registry = self.notes_manager.role_registry
+            for old_name, new_name in renames.items():
+                registry.rename(old_name, new_name)
+            for name, color in registry_colors.items():
+                registry.set_color(name, color)
+        elif report.cancelled:
+            report.registry_changes = []
+        return report
+
+    def _registry_changes(self, renames, colors):
+        """Descripción de los cambios que la operación hará en el registro de roles (sin aplicarlos)."""
+        registry = self.notes_manager.role_registry
+        changes = []
+        for old_name, new_name in renames.items():
+            if old_name == new_name:
+                continue
+            if registry.id_for(new_name) is not None:
+                if registry.id_for(old_name) is not None:
+                    changes.append(f"'{old_name}' se fusiona en '{new_name}'")
+            elif registry.id_for(old_name) is not None:
+                changes.append(f"'{old_name}' pasa a llamarse '{new_name}'")
+            else:
+                changes.append(f"se registra '{new_name}'")
+        for name, color in colors.items():
+            if registry.color_for(name) != color:
+                changes.append(f"'{name}' pasa a {color}")
+        return changes
+
+    def _apply_to_note(self, title, path, renames, colors, dry_run, cancel_event):
+        if cancel_event.is_set():
+            return None
+        change = NoteRoleChange(title, path)
+
+        def rewrite(full_content):
+            text, change.lines_changed, change.trailer_changed = rewrite_note_text(full_content, renames, colors)
+            return text
+        try:
+            if dry_run:
+                with open(path, 'r', encoding="utf-8") as f:
+                    rewrite(f.read())
+            else:
+                # Con el bloqueo de la nota, su historial y el aviso "saved", como cualquier otro guardado
+                ok, msg = self.notes_manager.rewrite_note(title, rewrite)
+                if not ok:
+                    change.error = msg
+            return change
+        except Exception as e:
+            return NoteRoleChange(title, path, error=e)
@@ -0,0 +1,308 @@
+# Registro de roles compartido por todo el vault (.meta/roles.json): cada rol tiene un id estable y un color.
+# La sección ---ROLES--- de cada nota sólo nombra los roles que usa ('Nombre', con el color del registro);
+# una nota puede fijar su propio color con 'Nombre:#color'. Las secciones antiguas (todas con color) siguen
+# siendo válidas y se reducen al volver a guardarlas.
+#
+# También mantiene en memoria qué notas declaran cada rol (por id), para responder sin leer todas las notas.
+
+import os
+import json
+import zlib
+import threading
+from batch_executor import batched, map_batches
+from notes_manager import DEFAULT_ROLE_COLORS, split_note_text, note_key, write_file_atomic
+from vault_lock import FileLock
+
+BATCH_SIZE = 128
+MIN_BATCHES_FOR_PROCESSES = 32
+ROLE_PALETTE = list(dict.fromkeys(DEFAULT_ROLE_COLORS.values()))
+
+
+def role_color_for(role):
+    """Color estable para un rol sin registrar: el de la paleta por defecto o uno derivado del nombre."""
+    if role in DEFAULT_ROLE_COLORS:
+        return DEFAULT_ROLE_COLORS[role]
+    return ROLE_PALETTE[zlib.crc32(role.encode("utf-8")) % len(ROLE_PALETTE)]
+
+
+def scan_roles_batch(batch):
+    results = []
+    for title, path in batch:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with open(path, 'r', encoding="utf-8") as f:
+                _content, roles = split_note_text(f.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+        results.append((title, mtime, roles or {}))
+    return results
+
+
+class RoleRegistry:
+    def __init__(self, notes_manager, workers=None):
+        self.notes_manager = notes_manager
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.path = os.path.join(notes_manager.meta_dir, "roles.json")
+        self._data = None
+        self._version = None
+        self._ids_by_name = {}
+        self._lock = threading.RLock()
+        # Uso: clave de nota -> (titulo, mtime_ns, frozenset de ids, frozenset de nombres sin registrar),
+        # id -> {claves de nota} y nombre sin registrar -> {claves de nota}
+        self._notes = {}
+        self._users = {}
+        self._pending = {}
+        self._usage_built = False
+
+    # --- Almacenamiento ---
+
+    def _default_data(self):
+        # Un vault sin registro empieza con la paleta por defecto (se escribe al primer cambio)
+        roles = {str(i): {"name": name, "color": color}
+                 for i, (name, color) in enumerate(DEFAULT_ROLE_COLORS.items(), 1)}
+        return {"next_id": len(roles) + 1, "roles": roles}
+
+    def _load(self):
+        """Carga el registro si cambió en disco (sólo cuesta un stat si no cambió)."""
+        try:
+            st = os.stat(self.path)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        if self._data is not None and version == self._version:
+            return self._data
+        data = self._default_data()
+        if version is not None:
+            try:
+                with open(self.path, 'r', encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                pass
+        self._data, self._version = data, version
+        self._ids_by_name = {role["name"]: int(role_id) for role_id, role in data["roles"].items()}
+        self._resolve_pending()
+        return data
+
+    def _modify(self, change):
+        """Aplica change(data) sobre la última versión en disco y la guarda. Devuelve lo que devuelva change."""
+        os.makedirs(self.notes_manager.meta_dir, exist_ok=True)
+        with self._lock, FileLock(os.path.join(self.notes_manager.meta_dir, "roles.lock")):
+            self._version = None
+            data = self._load()
+            result = change(data)
+            write_file_atomic(self.path, json.dumps(data, ensure_ascii=False, indent=1))
+            self._data = None
+            self._load()
+        return result
+
+    # --- Consulta ---
+
+    def id_for(self, name):
+        with self._lock:
+            self._load()
+            return self._ids_by_name.get(name)
+
+    def name_for(self, role_id):
+        with self._lock:
+            role = self._load()["roles"].get(str(role_id))
+            return role["name"] if role else None
+
+    def color_for(self, name):
+        """Color del rol en el registro, o None si no está registrado."""
+        with self._lock:
+            data = self._load()
+            role_id = self._ids_by_name.get(name)
+            return data["roles"][str(role_id)]["color"] if role_id is not None else None
+
+    def colors(self):
+        """Todos los roles registrados (nombre -> color), en orden de alta."""
+        with self._lock:
+            roles = self._load()["roles"]
+            return {roles[k]["name"]: roles[k]["color"] for k in sorted(roles, key=int)}
+
+    def resolve(self, roles):
+        """Completa los roles sin color propio (None) con el color del registro."""
+        if roles is None:
+            return None
+        with self._lock:
+            return {name: color or self.color_for(name) or role_color_for(name) for name, color in roles.items()}
+
+    # --- Alta y cambios ---
+
+    def intern(self, roles):
+        """
+        Registra los roles que aún no existen (con el color dado o uno derivado del nombre).
+        Devuelve {nombre: id}. Sólo escribe el registro si hay roles nuevos.
+        """
+        with self._lock:
+            self._load()
+            missing = [name for name in roles if name not in self._ids_by_name]
+            if missing:
+                def add(data):
+                    for name in missing:
+                        if any(role["name"] == name for role in data["roles"].values()):
+                            continue  # Otro proceso lo registró entretanto
+                        data["roles"][str(data["next_id"])] = {"name": name, "color": roles[name] or role_color_for(name)}
+                        data["next_id"] += 1
+                self._modify(add)
+            return {name: self._ids_by_name[name] for name in roles}
+
+    def compact(self, roles):
+        """
+        Versión de roles para escribir en la nota: deja en None los que usan el color del registro, para que
+        la sección sólo guarde los colores propios de la nota. No escribe el registro (ver intern).
+        """
+        if not roles:
+            return roles
+        return {name: None if not color or color == self.color_for(name) else color
+                for name, color in roles.items()}
+
+    def set_color(self, name, color):
+        """Cambia el color del rol para todo el vault (lo registra si no existía)."""
+        role_id = self.intern({name: color})[name]
+
+        def change(data):
+            data["roles"][str(role_id)]["color"] = color
+        self._modify(change)
+
+    def rename(self, old_name, new_name):
+        """
+        Renombra el rol conservando su id. Si new_name ya existe se fusionan: las notas que usaban old_name
+        pasan a contar como usuarias de new_name. Devuelve el id resultante.
+        """
+        old_id = self.id_for(old_name)
+        if old_id is None or old_name == new_name:
+            return self.intern({new_name: None})[new_name]
+        target_id = self.id_for(new_name)
+
+        def change(data):
+            if target_id is None:
+                data["roles"][str(old_id)]["name"] = new_name
+            else:
+                data["roles"].pop(str(old_id), None)
+        self._modify(change)
+        if target_id is None:
+            return old_id
+        with self._lock:
+            for key in self._users.pop(old_id, set()):
+                title, mtime, ids, pending = self._notes[key]
+                self._notes[key] = (title, mtime, ids - {old_id} | {target_id}, pending)
+                self._users.setdefault(target_id, set()).add(key)
+        return target_id
+
+    # --- Uso por nota ---
+
+    def _set_note_roles(self, key, title, mtime, roles):
+        # Sólo lee el registro: los roles aún sin registrar se anotan por nombre hasta que se registren
+        with self._lock:
+            self._load()
+            roles = roles or {}
+            ids = frozenset(self._ids_by_name[name] for name in roles if name in self._ids_by_name)
+            pending = frozenset(name for name in roles if name not in self._ids_by_name)
+            old = self._notes.get(key)
+            old_ids, old_pending = old[2:] if old else (frozenset(), frozenset())
+            _move_users(self._users, key, old_ids - ids, ids - old_ids)
+            _move_users(self._pending, key, old_pending - pending, pending - old_pending)
+            self._notes[key] = (title, mtime, ids, pending)
+
+    def _resolve_pending(self):
+        """Pasa a contar por id las notas que usaban roles que ya están en el registro."""
+        for name in [name for name in self._pending if name in self._ids_by_name]:
+            role_id = self._ids_by_name[name]
+            for key in self._pending.pop(name):
+                title, mtime, ids, pending = self._notes[key]
+                self._notes[key] = (title, mtime, ids | {role_id}, pending - {name})
+                self._users.setdefault(role_id, set()).add(key)
+
+    def _remove_note(self, key):
+        with self._lock:
+            if key in self._notes:
+                self._set_note_roles(key, None, None, None)
+                del self._notes[key]
+
+    def build_usage(self):
+        """Lee la sección de roles de todas las notas (en paralelo si hay muchas)."""
+        with self._lock:
+            self._notes, self._users, self._pending = {}, {}, {}
+            self._usage_built = True
+        self.sync_with_disk()
+
+    def sync_with_disk(self):
+        """Vuelve a leer sólo las notas creadas, modificadas o eliminadas fuera de la aplicación (por mtime)."""
+        seen = set()
+        changed = []
+        for title, path in self.notes_manager.iter_notes():
+            key = note_key(title)
+            seen.add(key)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            known = self._notes.get(key)
+            if known is None or known[1] != mtime:
+                changed.append((title, path))
+        with self._lock:
+            removed = [key for key in self._notes if key not in seen]
+        for key in removed:
+            self._remove_note(key)
+        for results in map_batches(scan_roles_batch, batched(changed, BATCH_SIZE), self.workers,
+                                   min_batches_for_processes=MIN_BATCHES_FOR_PROCESSES):
+            for title, mtime, roles in results:
+                self._set_note_roles(note_key(title), title, mtime, roles)
+        return len(changed) + len(removed)
+
+    def _ensure_usage(self):
+        if not self._usage_built:
+            self.build_usage()
+
+    def _on_note_event(self, event, title, roles=None, old_title=None, **info):
+        if not self._usage_built:
+            return
+        if event in ("deleted", "archived"):
+            self._remove_note(note_key(title))
+            return
+        if event == "renamed":
+            self._remove_note(note_key(old_title))
+        path = self.notes_manager._get_note_path(title)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if event != "saved":
+                with open(path, 'r', encoding="utf-8") as f:
+                    _content, roles = split_note_text(f.read())
+        except (OSError, UnicodeDecodeError):
+            self._remove_note(note_key(title))
+            return
+        self._set_note_roles(note_key(title), title, mtime, roles)
+
+    def attach(self):
+        self.notes_manager.add_listener(self._on_note_event)
+
+    def detach(self):
+        self.notes_manager.remove_listener(self._on_note_event)
+
+    def notes_with_role(self, name):
+        """Títulos de las notas que declaran el rol, ordenados."""
+        self._ensure_usage()
+        role_id = self.id_for(name)
+        with self._lock:
+            keys = self._users.get(role_id, ()) if role_id is not None else self._pending.get(name, ())
+            return sorted(self._notes[key][0] for key in keys)
+
+    def usage_counts(self):
+        """Número de notas que declaran cada rol registrado (nombre -> notas)."""
+        self._ensure_usage()
+        with self._lock:
+            self._load()
+            return {name: len(self._users.get(role_id, ())) for name, role_id in self._ids_by_name.items()}
+
+
+def _move_users(users, key, removed, added):
+    """Quita la nota de los roles de removed y la añade a los de added (en un índice rol -> {claves})."""
+    for role in removed:
+        keys = users.get(role)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del users[role]
+    for role in added:
+        users.setdefault(role, set()).add(key)
@@ -0,0 +1,32 @@
+# Medición del tiempo de arranque por fases (python main_app.py --startup-profile).
+
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases = []
+
+    def record(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self, stream=None):
+        stream = stream or sys.stderr
+        total = time.perf_counter() - self.started_at
+        width = max([len(name) for name, _ in self.phases] + [len("total")])
+        stream.write("Tiempo de arranque:\n")
+        for name, seconds in self.phases:
+            stream.write(f"  {name:<{width}}  {seconds * 1000:8.1f} ms\n")
+        stream.write(f"  {'total':<{width}}  {total * 1000:8.1f} ms\n")
+        stream.flush()
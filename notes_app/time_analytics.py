@@ -0,0 +1,211 @@
+# Análisis del tiempo planificado: cruza los eventos del calendario con la clasificación de su línea
+# (roles, cuadrante de Eisenhower, tipo de tarea) y suma los minutos por semana o mes.
+#
+# Los eventos se guardan en columnas de enteros (array.array), una fila por evento, y los roles en columnas
+# aparte (una fila por evento y rol, porque una línea puede tener varios roles). Si NumPy está instalado se
+# usan esas mismas columnas sin copiarlas y cada agregado es vectorial; si no, se recorren en un bucle.
+
+from array import array
+from datetime import date
+from notes_manager import classify_line, classification_fields
+from calendar_event import MINUTES_PER_DAY, day_to_date, date_to_day
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PERIODS = ("week", "month")
+DIMENSIONS = ("role", "quadrant", "task_type")
+# Etiqueta de los eventos sin rol, cuadrante o tipo
+UNCLASSIFIED = "(sin clasificar)"
+
+
+def week_start(day):
+    """Día (desde 1970) del lunes de la semana; el 1970-01-01 fue jueves."""
+    return day - (day + 3) % 7
+
+
+def month_number(d):
+    """Meses desde enero de 1970."""
+    return (d.year - 1970) * 12 + d.month - 1
+
+
+def month_date(number):
+    return date(1970 + number // 12, number % 12 + 1, 1)
+
+
+class _Labels:
+    """Interna etiquetas como códigos enteros consecutivos."""
+
+    def __init__(self):
+        self.names = [UNCLASSIFIED]
+        self.codes = {UNCLASSIFIED: 0}
+
+    def code(self, name):
+        if name is None:
+            return 0
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+class _Columns:
+    """Columnas de una construcción del calendario; se sustituyen enteras, nunca se modifican ya publicadas."""
+
+    def __init__(self):
+        self.labels = {dimension: _Labels() for dimension in DIMENSIONS}
+        # Columnas por evento
+        self.start = array('q')
+        self.duration = array('q')
+        self.week = array('q')
+        self.month = array('q')
+        self.quadrant = array('q')
+        self.task_type = array('q')
+        # Columnas por (evento, rol)
+        self.role_event = array('q')
+        self.role = array('q')
+
+
+class TimeAnalytics:
+    def __init__(self, notes_manager):
+        self.notes_manager = notes_manager
+        self._revision = None
+        self._columns = _Columns()
+
+    def __len__(self):
+        return len(self._columns.start)
+
+    # --- Construcción ---
+
+    def _note_roles(self, title, cache, registry_roles):
+        roles = cache.get(title)
+        if roles is None:
+            _content, note_roles, _msg = self.notes_manager.get_note_content(title)
+            roles = cache[title] = {**registry_roles, **(note_roles or {})}
+        return roles
+
+    def build(self):
+        """
+        Pasa el calendario a columnas. Sólo se rehace si el calendario cambió desde la última vez.
+        Se construye en columnas nuevas que sustituyen a las anteriores al final, para que aggregate pueda
+        seguir respondiendo (con los datos anteriores) mientras tanto.
+        """
+        # La revisión se lee antes que los eventos: si cambian entretanto, la próxima llamada reconstruye
+        revision = self.notes_manager.calendar_revision
+        if revision == self._revision:
+            return False
+        events = list(self.notes_manager.iter_calendar_events())
+        columns = _Columns()
+        registry_roles = self.notes_manager.role_registry.colors()
+        note_roles = {}
+        classified = {}
+        months = {}
+        role_labels, quadrant_labels, type_labels = (columns.labels[d] for d in DIMENSIONS)
+        for index, event in enumerate(events):
+            key = (event.note_title, event.task_line)
+            fields = classified.get(key)
+            if fields is None:
+                roles = self._note_roles(event.note_title, note_roles, registry_roles)
+                line_roles, quadrant, task_type = classification_fields(classify_line(event.task_line, roles))
+                fields = classified[key] = (
+                    [role_labels.code(r) for r in line_roles] or [0],
+                    quadrant_labels.code(quadrant), type_labels.code(task_type))
+            day = event.start // MINUTES_PER_DAY
+            month = months.get(day)
+            if month is None:
+                month = months[day] = month_number(day_to_date(day))
+            columns.start.append(event.start)
+            columns.duration.append(event.duration_minutes)
+            columns.week.append(week_start(day))
+            columns.month.append(month)
+            columns.quadrant.append(fields[1])
+            columns.task_type.append(fields[2])
+            for role_code in fields[0]:
+                columns.role_event.append(index)
+                columns.role.append(role_code)
+        self._columns, self._revision = columns, revision
+        return True
+
+    # --- Agregados ---
+
+    def _rows(self, columns, period, by, start, end):
+        """Columnas de periodo y código, índice de fila -> evento (sólo roles) y límites en minutos."""
+        periods = columns.week if period == "week" else columns.month
+        if by == "role":
+            index = columns.role_event
+            codes = columns.role
+        else:
+            index = None
+            codes = columns.quadrant if by == "quadrant" else columns.task_type
+        lo = date_to_day(start) * MINUTES_PER_DAY if start else None
+        hi = date_to_day(end) * MINUTES_PER_DAY if end else None
+        return periods, codes, index, lo, hi
+
+    def aggregate(self, period="week", by="role", start=None, end=None):
+        """
+        Minutos planificados por periodo ("week" o "month") y dimensión ("role", "quadrant" o "task_type"),
+        opcionalmente sólo entre las fechas start (incluida) y end (excluida).
+        Devuelve {fecha de inicio del periodo: {etiqueta: minutos}}.
+        """
+        if period not in PERIODS or by not in DIMENSIONS:
+            raise ValueError(f"Agregado no válido: {period}/{by}")
+        # Una sola lectura de las columnas: una construcción en curso no las cambia a mitad del agregado
+        columns = self._columns
+        periods, codes, index, lo, hi = self._rows(columns, period, by, start, end)
+        names = columns.labels[by].names
+        if np is not None:
+            sums = self._aggregate_numpy(columns, periods, codes, index, lo, hi, len(names))
+        else:
+            sums = self._aggregate_python(columns, periods, codes, index, lo, hi)
+        to_date = day_to_date if period == "week" else month_date
+        result = {}
+        for (period_value, code), minutes in sums.items():
+            result.setdefault(to_date(period_value), {})[names[code]] = minutes
+        return dict(sorted(result.items()))
+
+    def _aggregate_numpy(self, columns, periods, codes, index, lo, hi, n_codes):
+        starts = np.frombuffer(columns.start, dtype=np.int64)
+        durations = np.frombuffer(columns.duration, dtype=np.int64)
+        periods = np.frombuffer(periods, dtype=np.int64)
+        codes = np.frombuffer(codes, dtype=np.int64)
+        if index is not None:
+            index = np.frombuffer(index, dtype=np.int64)
+            starts, durations, periods = starts[index], durations[index], periods[index]
+        mask = None
+        if lo is not None:
+            mask = starts >= lo
+        if hi is not None:
+            mask = starts < hi if mask is None else mask & (starts < hi)
+        if mask is not None:
+            durations, periods, codes = durations[mask], periods[mask], codes[mask]
+        if not len(codes):
+            return {}
+        # Los periodos son consecutivos: cada (periodo, código) es una casilla de un único bincount
+        first = int(periods.min())
+        totals = np.bincount((periods - first) * n_codes + codes, weights=durations)
+        keys = np.flatnonzero(totals)
+        return {(first + int(key) // n_codes, int(key) % n_codes): int(total)
+                for key, total in zip(keys, totals[keys])}
+
+    def _aggregate_python(self, columns, periods, codes, index, lo, hi):
+        sums = {}
+        starts, durations = columns.start, columns.duration
+        rows = range(len(codes))
+        for row in rows:
+            event = row if index is None else index[row]
+            if (lo is not None and starts[event] < lo) or (hi is not None and starts[event] >= hi):
+                continue
+            key = (periods[event], codes[row])
+            sums[key] = sums.get(key, 0) + durations[event]
+        return sums
+
+    def totals(self, by="role", start=None, end=None):
+        """Minutos por etiqueta en todo el intervalo: {etiqueta: minutos}, de mayor a menor."""
+        totals = {}
+        for values in self.aggregate("month", by, start, end).values():
+            for name, minutes in values.items():
+                totals[name] = totals.get(name, 0) + minutes
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
@@ -0,0 +1,171 @@
+# Índice de trigramas sobre los títulos de las notas (incluida la ruta de carpetas) para la búsqueda
+# rápida (Ctrl+P). Se construye una vez y se mantiene con los eventos de NotesManager.
+#
+# Para una consulta de n trigramas se exige compartir al menos la mitad: por el principio del palomar basta
+# con unir las listas de los trigramas menos frecuentes para obtener todos los candidatos, sin recorrer
+# las listas largas de trigramas comunes. Los candidatos se puntúan con comprobaciones de subcadena.
+
+import heapq
+import threading
+import unicodedata
+from notes_manager import note_key
+
+MIN_SHARED_FRACTION = 0.5
+# Máximo de candidatos que se puntúan por consulta (mantiene cada pulsación por debajo de ~10 ms)
+MAX_CANDIDATES = 2500
+
+
+def normalize_title(title):
+    """Minúsculas, sin acentos y con '_' como espacio: 'Reunión_Equipo' -> 'reunion equipo'."""
+    text = title.replace("_", " ").lower()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def title_grams(normalized):
+    """Trigramas del título con espacios de relleno, más ' x' por cada inicio de palabra o carpeta."""
+    padded = f" {normalized.replace('/', ' ')} "
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    grams.update(padded[i:i + 2] for i in range(len(padded) - 1) if padded[i] == " ")
+    return grams, padded
+
+
+def query_grams(normalized):
+    padded = f" {normalized.replace('/', ' ')}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    def __init__(self, notes_manager):
+        self.notes_manager = notes_manager
+        self._lock = threading.RLock()
+        # id -> (titulo, titulo normalizado con relleno, posición donde empieza el nombre tras la carpeta);
+        # los ids libres se reutilizan
+        self._entries = []
+        self._free_ids = []
+        self._ids_by_key = {}
+        self._postings = {}
+
+    def build(self):
+        # Se bloquea nota a nota, para que las búsquedas puedan ir respondiendo mientras se construye
+        with self._lock:
+            self._entries, self._free_ids, self._ids_by_key, self._postings = [], [], {}, {}
+        for title, _path in self.notes_manager.iter_notes():
+            self.add(title)
+
+    def sync_with_disk(self):
+        """Añade y quita los títulos que cambiaron fuera de la aplicación."""
+        titles = {note_key(title): title for title, _path in self.notes_manager.iter_notes()}
+        with self._lock:
+            for key in [k for k in self._ids_by_key if k not in titles]:
+                self._remove_key(key)
+            for key, title in titles.items():
+                if key not in self._ids_by_key:
+                    self.add(title)
+
+    def __len__(self):
+        return len(self._ids_by_key)
+
+    # --- Mantenimiento incremental ---
+
+    def add(self, title):
+        key = note_key(title)
+        with self._lock:
+            if key in self._ids_by_key:
+                return
+            normalized = normalize_title(title)
+            grams, padded = title_grams(normalized)
+            entry = (title, padded, normalized.rfind("/") + 1)
+            if self._free_ids:
+                note_id = self._free_ids.pop()
+                self._entries[note_id] = entry
+            else:
+                note_id = len(self._entries)
+                self._entries.append(entry)
+            self._ids_by_key[key] = note_id
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(note_id)
+
+    def remove(self, title):
+        with self._lock:
+            self._remove_key(note_key(title))
+
+    def _remove_key(self, key):
+        note_id = self._ids_by_key.pop(key, None)
+        if note_id is None:
+            return
+        grams, _ = title_grams(normalize_title(self._entries[note_id][0]))
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(note_id)
+                if not ids:
+                    del self._postings[gram]
+        self._entries[note_id] = None
+        self._free_ids.append(note_id)
+
+    def _on_note_event(self, event, title, old_title=None, **info):
+        if event in ("deleted", "archived"):
+            self.remove(title)
+        elif event == "renamed":
+            self.remove(old_title)
+            self.add(title)
+        elif event == "created":
+            self.add(title)
+
+    def attach(self):
+        self.notes_manager.add_listener(self._on_note_event)
+
+    def detach(self):
+        self.notes_manager.remove_listener(self._on_note_event)
+
+    # --- Consulta ---
+
+    def search(self, query, limit=50):
+        """Títulos que se parecen a la consulta, del más al menos parecido."""
+        q = normalize_title(query).strip()
+        if not q:
+            return []
+        with self._lock:
+            if len(q) < 3:
+                # Consultas cortas: títulos con alguna palabra (o carpeta) que empieza así
+                grams = [" " + q.replace("/", " ")]
+                exact = candidates = self._postings.get(grams[0], set())
+                needed = 1
+            else:
+                grams = sorted(query_grams(q))
+                needed = max(1, int(len(grams) * MIN_SHARED_FRACTION + 0.5))
+                # Orden estable (tamaño y trigrama) para que los candidatos no dependan del orden de los sets
+                lists = [self._postings.get(gram, set()) for gram in grams]
+                lists = [ids for _size, _gram, ids in sorted(zip(map(len, lists), grams, lists))]
+                # Un título que contiene la consulta tiene todos sus trigramas: siempre es candidato
+                exact = lists[0].intersection(*lists[1:])
+                candidates = set(exact)
+                for ids in lists[:len(grams) - needed + 1]:
+                    # Con trigramas muy comunes se puntúan sólo los títulos de las listas más raras
+                    if candidates and len(candidates) + len(ids) > MAX_CANDIDATES:
+                        break
+                    candidates |= ids
+            if len(candidates) > MAX_CANDIDATES:
+                # Primero las coincidencias exactas; el resto, por id, para que el recorte sea siempre el mismo
+                rest = sorted(candidates - exact) if len(exact) < MAX_CANDIDATES else []
+                candidates = (sorted(exact) + rest)[:MAX_CANDIDATES]
+            scored = []
+            for note_id in candidates:
+                title, padded, name_start = self._entries[note_id]
+                shared = sum(map(padded.__contains__, grams))
+                if shared < needed:
+                    continue
+                score = shared / len(grams)
+                position = padded.find(q.replace("/", " "))
+                if position >= 0:
+                    # Coincidencia exacta: mejor si empieza una palabra y si está en el nombre, no en la carpeta
+                    score += 1.0
+                    if padded[position - 1] == " ":
+                        score += 0.5
+                    if position > name_start:
+                        score += 0.25
+                scored.append((score, -len(padded), title))
+        return [title for _score, _length, title in heapq.nlargest(limit, scored)]
@@ -0,0 +1,72 @@
+# Bloqueos de archivo consultivos entre procesos (fcntl.flock en POSIX, msvcrt en Windows).
+# Sólo coordinan a quienes también los usan: la aplicación, la CLI y la API.
+
+import os
+import time
+import hashlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LockTimeout(Exception):
+    pass
+
+
+class FileLock:
+    def __init__(self, path, timeout=10.0, poll_interval=0.01):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _try_lock(self, fd):
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while not self._try_lock(fd):
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise LockTimeout(f"No se pudo obtener el bloqueo '{self.path}'.")
+            time.sleep(self.poll_interval)
+        self._fd = fd
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def note_lock(meta_dir, key, timeout=10.0):
+    """Bloqueo de una nota concreta; notas distintas no se bloquean entre sí."""
+    name = hashlib.md5(key.encode("utf-8")).hexdigest()
+    return FileLock(os.path.join(meta_dir, "locks", f"{name}.lock"), timeout)
+
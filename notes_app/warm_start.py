@@ -0,0 +1,82 @@
+# Instantánea de arranque (.meta/warm_start.json): lo que la ventana de notas necesita para pintarse sin
+# listar el vault ni clasificar la última nota abierta. Cada parte se valida con mtimes (carpeta de notas,
+# tabla de ids, archivo de la nota y registro de roles) y se descarta si algo cambió; la ventana se
+# reconcilia después con el disco en segundo plano.
+
+import os
+import json
+from notes_manager import write_file_atomic
+
+SNAPSHOT_VERSION = 1
+# Las notas más grandes no se guardan en la instantánea (se leen del disco como siempre)
+MAX_NOTE_CHARS = 512 * 1024
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class WarmStart:
+    def __init__(self, notes_manager):
+        self.notes_manager = notes_manager
+        self.path = os.path.join(notes_manager.meta_dir, "warm_start.json")
+
+    def _notes_version(self):
+        # La lista cambia si cambia la carpeta (altas, bajas, renombrados) o los títulos de la tabla de ids
+        return [_mtime(self.notes_manager.notes_dir), _mtime(self.notes_manager.note_ids.path)]
+
+    def _roles_mtime(self):
+        # Los colores de la nota salen del registro: un cambio de color en el vault invalida la nota guardada
+        return _mtime(self.notes_manager.role_registry.path)
+
+    def load(self):
+        """
+        Partes aún válidas de la instantánea: "notes" (lista de títulos), "note" (última nota abierta:
+        title, mtime, content, roles y tags por línea) y "last_title" aunque la nota ya no sea válida.
+        """
+        try:
+            with open(self.path, 'r', encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return {}
+        valid = {}
+        if data.get("notes_version") == self._notes_version():
+            valid["notes"] = data.get("notes", [])
+        note = data.get("note")
+        if note:
+            valid["last_title"] = note["title"]
+            if (note.get("content") is not None
+                    and note["mtime"] == _mtime(self.notes_manager._get_note_path(note["title"]))
+                    and note.get("roles_mtime") == self._roles_mtime()):
+                valid["note"] = note
+        return valid
+
+    def save(self, note_title=None, line_tag=None):
+        """
+        Guarda la lista de notas actual y la nota note_title tal como está en disco, con la etiqueta de
+        cada línea calculada por line_tag(linea, roles). Las versiones se toman antes de leer, para que un
+        cambio simultáneo invalide la instantánea en vez de quedar oculto.
+        """
+        notes_version = self._notes_version()
+        notes = self.notes_manager.list_notes()
+        if self._notes_version() != notes_version:
+            # La carpeta o la tabla de ids cambiaron mientras se listaba: la lista no se da por válida
+            notes_version = None
+        data = {"version": SNAPSHOT_VERSION, "notes_version": notes_version, "notes": notes}
+        if note_title:
+            mtime = _mtime(self.notes_manager._get_note_path(note_title))
+            note = {"title": note_title, "mtime": mtime, "roles_mtime": self._roles_mtime(), "content": None}
+            content, roles, _msg = self.notes_manager.get_note_content(note_title)
+            if content is not None and mtime is not None and len(content) <= MAX_NOTE_CHARS:
+                if roles is None:
+                    roles = self.notes_manager.default_role_colors()
+                note.update(content=content, roles=roles,
+                            tags=[line_tag(line, roles) for line in content.split("\n")] if line_tag else None)
+            data["note"] = note
+        os.makedirs(self.notes_manager.meta_dir, exist_ok=True)
+        write_file_atomic(self.path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
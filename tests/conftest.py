@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# Los módulos de la aplicación se importan sin paquete, como al ejecutar notes_app/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "notes_app"))
+
+from notes_manager import NotesManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return NotesManager(str(tmp_path / "notes"), str(tmp_path / "calendar_events.json"))
+
+
+@pytest.fixture
+def write_note(manager):
+    """Escribe una nota directamente en el vault (como un editor externo). Devuelve su ruta."""
+    def write(title, text):
+        path = manager._get_note_path(title, create_dirs=True)
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+        return path
+    return write
@@ -0,0 +1,101 @@
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+from calendar_event import MINUTES_PER_DAY, datetime_to_start, parse_start
+from calendar_ics import (
+    DEFAULT_DURATION_MINUTES, event_from_vevent, import_ics, iter_unfolded_lines, iter_vevents,
+    parse_ics_datetime, parse_ics_duration,
+)
+
+
+def ics(*lines):
+    return io.BytesIO(("\r\n".join(lines) + "\r\n").encode("utf-8"))
+
+
+def vevents(*lines):
+    return [props for props, _read in iter_vevents(ics("BEGIN:VCALENDAR", *lines, "END:VCALENDAR"))]
+
+
+def test_folded_lines_are_joined():
+    lines = [line for line, _read in iter_unfolded_lines(ics("SUMMARY:Reunión de", "  equipo", "\t semanal", "END:X"))]
+    assert lines == ["SUMMARY:Reunión de equipo semanal", "END:X"]
+
+
+def test_tzid_and_utc_are_converted_to_local_time():
+    zoneinfo = pytest.importorskip("zoneinfo")
+    madrid = datetime(2026, 7, 1, 10, 0, tzinfo=zoneinfo.ZoneInfo("Europe/Madrid"))
+    expected = datetime_to_start(madrid.astimezone().replace(tzinfo=None))
+    assert parse_ics_datetime("20260701T100000", {"TZID": "Europe/Madrid"}) == (expected, False)
+    utc = datetime(2026, 7, 1, 8, 0, tzinfo=timezone.utc)
+    assert parse_ics_datetime("20260701T080000Z", {}) == (expected, False)
+    assert datetime_to_start(utc.astimezone().replace(tzinfo=None)) == expected
+
+
+def test_floating_and_all_day_dates():
+    assert parse_ics_datetime("20261019T093000", {}) == (parse_start("2026-10-19 09:30"), False)
+    assert parse_ics_datetime("20261019", {"VALUE": "DATE"}) == (parse_start("2026-10-19 00:00"), True)
+
+
+@pytest.mark.parametrize("value, minutes", [
+    ("PT1H30M", 90), ("P1D", MINUTES_PER_DAY), ("P1W", 7 * MINUTES_PER_DAY), ("-PT15M", -15), ("P1DT2H", 1560),
+])
+def test_duration(value, minutes):
+    assert parse_ics_duration(value) == minutes
+
+
+def test_event_durations():
+    (dtend, duration, open_ended, all_day) = vevents(
+        "BEGIN:VEVENT", "DTSTART:20261019T100000", "DTEND:20261019T111500", "SUMMARY:a", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20261019T100000", "DURATION:PT45M", "SUMMARY:b", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20261019T100000", "SUMMARY:c", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART;VALUE=DATE:20261019", "SUMMARY:d", "END:VEVENT",
+    )
+    assert event_from_vevent(dtend, "n").duration_minutes == 75
+    assert event_from_vevent(duration, "n").duration_minutes == 45
+    assert event_from_vevent(open_ended, "n").duration_minutes == DEFAULT_DURATION_MINUTES
+    assert event_from_vevent(all_day, "n").duration_minutes == MINUTES_PER_DAY
+
+
+def test_note_properties_and_escaped_summary():
+    (props,) = vevents("BEGIN:VEVENT", "DTSTART:20261019T100000", "SUMMARY:uno\\, dos\\ntres",
+                       "X-NOTES-APP-NOTE-TITLE:Trabajo/Plan", "END:VEVENT")
+    event = event_from_vevent(props, "defecto")
+    assert (event.note_title, event.task_line) == ("Trabajo/Plan", "uno, dos tres")
+
+
+def test_nested_components_are_ignored():
+    (props,) = vevents("BEGIN:VEVENT", "DTSTART:20261019T100000", "SUMMARY:evento",
+                       "BEGIN:VALARM", "SUMMARY:alarma", "END:VALARM", "END:VEVENT")
+    assert event_from_vevent(props, "n").task_line == "evento"
+
+
+@pytest.mark.parametrize("lines", [
+    ['SUMMARY;X-PARAM="sin cerrar:texto'],
+    ["DTEND:20261019T090000"],
+    ["DURATION:-PT10M"],
+    [],
+])
+def test_malformed_vevents_raise(lines):
+    start = [] if not lines else ["DTSTART:20261019T100000"]
+    (props,) = vevents("BEGIN:VEVENT", *start, *lines, "END:VEVENT")
+    with pytest.raises(ValueError):
+        event_from_vevent(props, "n")
+
+
+def test_import_skips_malformed_vevents(manager, tmp_path):
+    path = tmp_path / "agenda.ics"
+    path.write_bytes(ics(
+        "BEGIN:VCALENDAR",
+        "BEGIN:VEVENT", "DTSTART:20261019T100000", "SUMMARY:buena", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20261019T110000", "SUMMARY;X-PARAM=\"rota", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20261019T120000", "DTEND:20261019T113000", "SUMMARY:al revés", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20261020T100000", "SUMMARY:otra", "END:VEVENT",
+        "END:VCALENDAR").getvalue())
+    ok, _msg, report = import_ics(manager, str(path))
+    assert ok
+    assert report.imported == 2
+    assert len(report.errors) == 2
+    assert sorted(e.task_line for e in manager.calendar_events) == ["buena", "otra"]
+    assert {e.note_title for e in manager.calendar_events} == {"agenda"}
@@ -0,0 +1,39 @@
+from notes_manager import merge_calendar_events
+
+
+def ev(event_id, **fields):
+    return {"id": event_id, "task_line": "tarea", "duration_minutes": 30, **fields}
+
+
+def test_one_sided_changes_are_kept():
+    base = [ev("a"), ev("b")]
+    ours = [ev("a", duration_minutes=60), ev("b")]
+    theirs = [ev("a"), ev("b", task_line="otra")]
+    merged = merge_calendar_events(base, ours, theirs)
+    assert merged == [ev("a", duration_minutes=60), ev("b", task_line="otra")]
+
+
+def test_additions_from_both_sides():
+    base = [ev("a")]
+    merged = merge_calendar_events(base, [ev("a"), ev("ours")], [ev("a"), ev("theirs")])
+    assert [e["id"] for e in merged] == ["a", "theirs", "ours"]
+
+
+def test_unchanged_deletion_wins():
+    base = [ev("a"), ev("b")]
+    assert merge_calendar_events(base, [ev("a")], base) == [ev("a")]
+    assert merge_calendar_events(base, base, [ev("b")]) == [ev("b")]
+
+
+def test_modification_wins_over_deletion():
+    base = [ev("a")]
+    assert merge_calendar_events(base, [ev("a", duration_minutes=90)], []) == [ev("a", duration_minutes=90)]
+    assert merge_calendar_events(base, [], [ev("a", task_line="otra")]) == [ev("a", task_line="otra")]
+
+
+def test_concurrent_edits_merge_field_by_field_with_ours_winning_conflicts():
+    base = [ev("a")]
+    ours = [ev("a", duration_minutes=45, task_line="nuestra")]
+    theirs = [ev("a", task_line="suya", note_id="n1")]
+    assert merge_calendar_events(base, ours, theirs) == [
+        ev("a", duration_minutes=45, task_line="nuestra", note_id="n1")]
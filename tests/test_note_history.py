@@ -0,0 +1,64 @@
+import pytest
+
+import note_history
+from note_history import NoteHistory, apply_delta, make_delta
+
+
+@pytest.mark.parametrize("base, text", [
+    ("", "nuevo\n"),
+    ("a\nb\nc\n", "a\nb\nc\n"),
+    ("a\nb\nc\n", "a\nB\nc\nd"),
+    ("uno\ndos\ntres\n", "cero\nuno\ntres\n"),
+    ("sin salto final", "sin salto final\ny otra"),
+])
+def test_delta_round_trip(base, text):
+    assert apply_delta(base, make_delta(base, text)) == text
+
+
+def test_delta_copies_unchanged_lines():
+    base = "".join(f"línea {i}\n" for i in range(100))
+    ops = make_delta(base, base.replace("línea 50\n", "cambiada\n"))
+    assert ops == [[0, 50], "cambiada\n", [51, 100]]
+
+
+def test_versions_are_read_back_through_delta_chains(tmp_path, monkeypatch):
+    monkeypatch.setattr(note_history, "MAX_DELTA_DEPTH", 3)
+    history = NoteHistory(str(tmp_path), compress=True)
+    body = "".join(f"línea {i}\n" for i in range(200))
+    texts = [body + f"versión {i}\n" for i in range(8)]
+    digests = [history.record("Nota", text) for text in texts]
+    for digest, text in zip(digests, texts):
+        assert history.read(digest) == text
+    versions = history.versions("Nota")
+    assert [v["hash"] for v in versions] == list(reversed(digests))
+    # La cadena de deltas se corta cada MAX_DELTA_DEPTH versiones con un texto completo
+    assert max(v["depth"] for v in versions) == 3
+    assert [v["depth"] for v in reversed(versions)][:5] == [0, 1, 2, 3, 0]
+
+
+def test_outside_edit_is_recorded_before_the_new_version(tmp_path):
+    history = NoteHistory(str(tmp_path))
+    history.record("Nota", "v1\n")
+    history.record("Nota", "v3\n", previous="v2 editada fuera\n")
+    assert [history.read(v["hash"]) for v in history.versions("Nota")] == ["v3\n", "v2 editada fuera\n", "v1\n"]
+
+
+def test_identical_text_is_not_recorded_twice(tmp_path):
+    history = NoteHistory(str(tmp_path))
+    history.record("Nota", "igual\n")
+    history.record("Nota", "igual\n", previous="igual\n")
+    assert len(history.versions("Nota")) == 1
+
+
+def test_restore_round_trip(manager):
+    manager.create_note("Plan")
+    manager.save_note_content("Plan", "primera\n[Trabajo] tarea\n", roles={"Trabajo": None})
+    manager.save_note_content("Plan", "segunda\n", roles=None)
+    # Las versiones: creada, primera y segunda (de la más reciente a la más antigua)
+    first = manager.list_note_versions("Plan")[1]["hash"]
+    assert manager.restore_note_version("Plan", first)[0]
+    content, roles, _msg = manager.get_note_content("Plan")
+    assert content.rstrip("\n") == "primera\n[Trabajo] tarea"
+    assert "Trabajo" in roles
+    assert manager.get_note_version_text(manager.list_note_versions("Plan")[0]["hash"]) == \
+        manager.get_note_version_text(first)
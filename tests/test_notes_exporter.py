@@ -0,0 +1,30 @@
+from notes_exporter import NotesExporter, parse_note_file
+
+
+def test_trailerless_note_uses_registry_roles_and_quadrant(manager, write_note):
+    path = write_note("plan", "[Programador] [E:HA] fix bug\n")
+    _title, roles, records = parse_note_file("plan", path, manager.role_registry.colors())
+    assert roles == {}
+    assert records[0]["roles"] == ["Programador"]
+    assert records[0]["eisenhower"] == "HACER_AHORA"
+
+
+def test_quadrant_does_not_depend_on_declared_roles(manager, write_note):
+    path = write_note("plan", "[Desconocido] [E:P] algo\n")
+    _title, _roles, records = parse_note_file("plan", path)
+    assert records[0]["roles"] == []
+    assert records[0]["eisenhower"] == "PLANIFICAR"
+
+
+def test_note_roles_extend_registry_roles(manager, write_note):
+    write_note("plan", "[Propio] [E:HA] uno\n[Programador] dos\n\n---ROLES---\nPropio:#123456\n")
+    records = list(NotesExporter(manager, workers=1).iter_records())
+    assert [r["roles"] for r in records] == [["Propio"], ["Programador"]]
+    assert records[0]["eisenhower"] == "HACER_AHORA"
+
+
+def test_vault_wide_filter_finds_trailerless_notes(manager, write_note):
+    write_note("plan", "[Programador] [E:HA] fix bug\n")
+    write_note("other", "[E:HA] otra\n")
+    notes = {r["note"] for r in NotesExporter(manager, workers=1).iter_records() if r["eisenhower"] == "HACER_AHORA"}
+    assert notes == {"plan", "other"}
@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("tkinter")
+
+import reminders  # noqa: E402
+from calendar_event import CalendarEvent  # noqa: E402
+from reminders import ReminderScheduler  # noqa: E402
+
+NOW = 1000
+
+
+def event(event_id, start):
+    return CalendarEvent(event_id, "Plan", f"tarea {event_id}", start, 30)
+
+
+def test_rebuild_skips_past_reminders():
+    scheduler = ReminderScheduler(lead_minutes=(10, 0))
+    scheduler.rebuild([event("a", NOW + 5), event("b", NOW + 60), event("c", NOW - 1)], NOW)
+    # 'a' sólo conserva el aviso de la hora de inicio; 'c' ya empezó
+    assert len(scheduler) == 3
+    assert scheduler.next_due() == NOW + 5
+
+
+def test_pop_due_in_order_with_lead():
+    scheduler = ReminderScheduler(lead_minutes=(0, 10))
+    scheduler.add(event("a", NOW + 30), NOW)
+    scheduler.add(event("b", NOW + 15), NOW)
+    assert scheduler.pop_due(NOW + 4) == []
+    due = scheduler.pop_due(NOW + 20)
+    assert [(e.id, lead) for e, lead in due] == [("b", 10), ("b", 0), ("a", 10)]
+    assert scheduler.next_due() == NOW + 30
+
+
+def test_rescheduling_replaces_the_old_reminders():
+    scheduler = ReminderScheduler(lead_minutes=(0,))
+    scheduler.add(event("a", NOW + 10), NOW)
+    scheduler.add(event("a", NOW + 50), NOW)
+    assert len(scheduler) == 1
+    assert scheduler.next_due() == NOW + 50
+    assert scheduler.pop_due(NOW + 20) == []
+
+
+def test_removed_events_are_never_shown():
+    scheduler = ReminderScheduler(lead_minutes=(10, 0))
+    scheduler.add(event("a", NOW + 20), NOW)
+    scheduler.add(event("b", NOW + 40), NOW)
+    scheduler.remove("a")
+    scheduler.remove("desconocido")
+    assert len(scheduler) == 2
+    assert scheduler.next_due() == NOW + 30
+    assert [e.id for e, _lead in scheduler.pop_due(NOW + 100)] == ["b", "b"]
+    assert scheduler.next_due() is None
+
+
+def test_stale_entries_are_compacted(monkeypatch):
+    monkeypatch.setattr(reminders, "MIN_STALE_TO_COMPACT", 4)
+    scheduler = ReminderScheduler(lead_minutes=(0,))
+    for i in range(10):
+        scheduler.add(event(str(i), NOW + 10 + i), NOW)
+    for i in range(6):
+        scheduler.remove(str(i))
+    # Al superar la mitad del montículo los avisos caducados se descartan de una vez
+    assert len(scheduler._heap) == 4
+    assert scheduler._stale == 0
+    assert len(scheduler) == 4
+    assert [e.id for e, _lead in scheduler.pop_due(NOW + 100)] == ["6", "7", "8", "9"]
@@ -0,0 +1,69 @@
+import os
+
+from notes_manager import DEFAULT_ROLE_COLORS
+from role_registry import role_color_for
+
+
+def test_default_palette_until_first_change(manager):
+    registry = manager.role_registry
+    assert registry.colors() == DEFAULT_ROLE_COLORS
+    assert not os.path.exists(registry.path)
+
+
+def test_intern_assigns_new_ids_and_keeps_existing(manager):
+    registry = manager.role_registry
+    programador = registry.id_for("Programador")
+    ids = registry.intern({"Programador": None, "Nuevo": "#123456", "Otro": None})
+    assert ids["Programador"] == programador
+    assert ids["Nuevo"] != ids["Otro"]
+    assert registry.color_for("Nuevo") == "#123456"
+    assert registry.color_for("Otro") == role_color_for("Otro")
+    mtime = os.stat(registry.path).st_mtime_ns
+    assert registry.intern({"Nuevo": "#FFFFFF"}) == {"Nuevo": ids["Nuevo"]}
+    assert os.stat(registry.path).st_mtime_ns == mtime
+
+
+def test_rename_keeps_the_id(manager):
+    registry = manager.role_registry
+    role_id = registry.id_for("Social")
+    assert registry.rename("Social", "Amigos") == role_id
+    assert registry.id_for("Social") is None
+    assert registry.name_for(role_id) == "Amigos"
+
+
+def test_usage_counts_and_merge(manager, write_note):
+    write_note("a", "x\n\n---ROLES---\nProgramador\nSocial\n")
+    write_note("b", "y\n\n---ROLES---\nSocial:#000000\n")
+    write_note("c", "z\n")
+    registry = manager.role_registry
+    counts = registry.usage_counts()
+    assert (counts["Programador"], counts["Social"], counts["General"]) == (1, 2, 0)
+    target = registry.id_for("Programador")
+    assert registry.rename("Social", "Programador") == target
+    assert registry.usage_counts()["Programador"] == 2
+    assert "Social" not in registry.colors()
+    assert registry.notes_with_role("Programador") == ["a", "b"]
+
+
+def test_scans_do_not_write_the_registry(manager, write_note):
+    write_note("a", "x\n\n---ROLES---\nSin registrar\n")
+    registry = manager.role_registry
+    assert registry.notes_with_role("Sin registrar") == ["a"]
+    registry.sync_with_disk()
+    assert registry.id_for("Sin registrar") is None
+    assert not os.path.exists(registry.path)
+    # Al registrarse el rol, las notas que ya lo usaban cuentan con su id
+    registry.intern({"Sin registrar": None})
+    assert registry.usage_counts()["Sin registrar"] == 1
+
+
+def test_saving_a_note_registers_its_roles_and_tracks_usage(manager):
+    registry = manager.role_registry
+    registry.build_usage()
+    manager.create_note("Plan")
+    manager.save_note_content("Plan", "[Nuevo] algo\n", roles={"Nuevo": "#ABCDEF", "Programador": None})
+    assert registry.color_for("Nuevo") == "#ABCDEF"
+    assert registry.notes_with_role("Nuevo") == ["Plan"]
+    # La sección de la nota no repite el color del registro
+    with open(manager._get_note_path("Plan"), encoding="utf-8") as f:
+        assert f.read().endswith("---ROLES---\nNuevo\nProgramador\n")
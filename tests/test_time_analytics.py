@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+import time_analytics
+from time_analytics import UNCLASSIFIED, TimeAnalytics, month_date, month_number, week_start
+from calendar_event import date_to_day
+
+
+@pytest.fixture
+def analytics(manager, monkeypatch):
+    # Se comprueba el recorrido en Python, con o sin NumPy instalado
+    monkeypatch.setattr(time_analytics, "np", None)
+    manager.create_note("Plan")
+    manager.save_note_content("Plan", "x\n", roles=None)
+    for line, start, minutes in [
+        ("[Programador] [E:HA] [T:TAREA] a", "2026-10-19 09:00", 60),
+        ("[Programador] [Social] b", "2026-10-21 18:00", 30),
+        ("sin prefijos", "2026-10-27 10:00", 15),
+        ("[Social] [E:P] c", "2026-11-02 12:00", 45),
+    ]:
+        assert manager.add_calendar_event("Plan", line, start, minutes)[0]
+    analytics = TimeAnalytics(manager)
+    assert analytics.build()
+    return analytics
+
+
+def day_of(day):
+    return date.fromordinal(date(1970, 1, 1).toordinal() + day)
+
+
+def test_week_and_month_helpers():
+    assert day_of(week_start(date_to_day(date(2026, 10, 22)))) == date(2026, 10, 19)
+    assert month_date(month_number(date(2026, 10, 22))) == date(2026, 10, 1)
+
+
+def test_weekly_minutes_by_role(analytics):
+    assert analytics.aggregate("week", "role") == {
+        date(2026, 10, 19): {"Programador": 90, "Social": 30},
+        date(2026, 10, 26): {UNCLASSIFIED: 15},
+        date(2026, 11, 2): {"Social": 45},
+    }
+
+
+def test_monthly_minutes_by_quadrant_and_type(analytics):
+    assert analytics.aggregate("month", "quadrant") == {
+        date(2026, 10, 1): {"HACER_AHORA": 60, UNCLASSIFIED: 45},
+        date(2026, 11, 1): {"PLANIFICAR": 45},
+    }
+    assert analytics.aggregate("month", "task_type") == {
+        date(2026, 10, 1): {"Tarea": 60, UNCLASSIFIED: 45},
+        date(2026, 11, 1): {UNCLASSIFIED: 45},
+    }
+
+
+def test_date_range_and_totals(analytics):
+    assert analytics.totals("role", start=date(2026, 10, 20), end=date(2026, 11, 2)) == {
+        "Programador": 30, "Social": 30, UNCLASSIFIED: 15}
+    assert analytics.totals("quadrant") == {"HACER_AHORA": 60, UNCLASSIFIED: 45, "PLANIFICAR": 45}
+
+
+def test_rebuilds_only_when_the_calendar_changes(analytics, manager):
+    assert not analytics.build()
+    manager.add_calendar_event("Plan", "[Social] d", "2026-11-03 08:00", 10)
+    assert analytics.build()
+    assert analytics.aggregate("week", "role")[date(2026, 11, 2)] == {"Social": 55}
+
+
+def test_invalid_aggregate(analytics):
+    with pytest.raises(ValueError):
+        analytics.aggregate("day", "role")
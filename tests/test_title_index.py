@@ -0,0 +1,66 @@
+import pytest
+
+import title_index
+from title_index import TitleIndex, normalize_title
+
+
+class FakeNotes:
+    def __init__(self, titles):
+        self.titles = list(titles)
+
+    def iter_notes(self):
+        return [(title, None) for title in self.titles]
+
+
+def build(titles):
+    index = TitleIndex(FakeNotes(titles))
+    index.build()
+    return index
+
+
+def test_normalize_title():
+    assert normalize_title("Reunión_Equipo") == "reunion equipo"
+
+
+def test_word_start_beats_mid_word_and_shorter_titles_break_ties():
+    index = build(["Proyectos/Reunión equipo", "Preunion", "Notas de reuniones", "Compra"])
+    assert index.search("reunion") == ["Notas de reuniones", "Proyectos/Reunión equipo", "Preunion"]
+
+
+def test_name_match_beats_folder_match():
+    index = build(["Plan/Otra cosa", "Trabajo/Plan"])
+    assert index.search("plan") == ["Trabajo/Plan", "Plan/Otra cosa"]
+
+
+def test_typo_still_matches():
+    assert build(["Presupuesto anual", "Otra nota"]).search("presupusto") == ["Presupuesto anual"]
+
+
+def test_short_queries_match_word_starts():
+    index = build(["Diario", "Lista de compra", "Idea"])
+    assert index.search("di") == ["Diario"]
+
+
+def test_exact_match_survives_candidate_limit(monkeypatch):
+    monkeypatch.setattr(title_index, "MAX_CANDIDATES", 5)
+    titles = [f"reunion {i}" for i in range(50)] + ["zz reunion"]
+    index = build(titles)
+    assert index.search("zz reu") == ["zz reunion"]
+    # El recorte es determinista: la misma consulta da siempre el mismo resultado
+    assert len({tuple(build(titles).search("reunion", limit=5)) for _ in range(5)}) == 1
+
+
+def test_incremental_updates():
+    index = build(["Uno", "Dos"])
+    index._on_note_event("renamed", "Tres", old_title="Dos")
+    index._on_note_event("created", "Cuatro")
+    index._on_note_event("deleted", "Uno")
+    assert len(index) == 2
+    assert index.search("tres") == ["Tres"]
+    assert index.search("dos") == []
+    assert index.search("uno") == []
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_empty_query(query):
+    assert build(["Uno"]).search(query) == []